@@ -3,17 +3,256 @@ FastAPI server to bridge Minecraft plugin and Discord Ollama Bot.
 """
 
 import asyncio
+import json
 import logging
-from typing import Dict, List, Optional
+import time
+from contextlib import aclosing, asynccontextmanager
+from functools import partial
+from typing import AsyncIterator, Dict, Optional, Tuple
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import Depends, FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.requests import HTTPConnection
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from bot.async_ollama_client import AsyncOllamaClient
+from bot.memory import ConversationMemory
+from bot.overload import create_overload_controller
+from bot.quota import QuotaExceededError, QuotaManager, create_quota_manager
+from bot.router import create_model_router
+from bridge.protocol import Frame, JSONCodec, negotiate
+from bridge.state import create_state_backend
+from bridge.telemetry import FRAME_MAGIC, PlayerTable
+from config import Config
+from utils.streaming import coalesce_chunks
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Minecraft-Ollama Bridge API")
+
+# ===== App-scoped services =====
+class ChatScheduler:
+    """Caps concurrent generations so bursts queue here instead of piling onto Ollama."""
+
+    def __init__(self, max_concurrent: int):
+        self.max_concurrent = max_concurrent
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.closed = False
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold a generation slot for the duration of the block."""
+        if self.closed:
+            raise RuntimeError("Chat scheduler is shut down")
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._slots.release()
+
+    async def run(self, func, *args):
+        """Await func(*args) once a generation slot is free."""
+        async with self.slot():
+            return await func(*args)
+
+    def close(self):
+        self.closed = True
+
+    def get_stats(self) -> Dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "completed": self.completed,
+        }
+
+
+class BridgeServices:
+    """Clients shared by every request, created once in the app lifespan."""
+
+    def __init__(self):
+        self.ollama = AsyncOllamaClient(
+            host=Config.OLLAMA_HOST,
+            model=Config.OLLAMA_MODEL,
+            timeout=Config.REQUEST_TIMEOUT,
+            max_connections=Config.BRIDGE_MAX_CONCURRENT_CHATS,
+        )
+        # Same memory engine (and, with MEMORY_DB_PATH, the same store) as the Discord bot
+        self.memory = ConversationMemory()
+        self.scheduler = ChatScheduler(Config.BRIDGE_MAX_CONCURRENT_CHATS)
+        self.quota = create_quota_manager()
+        self.overload = create_overload_controller()
+        self.router = create_model_router()
+
+    def check_quota(self, player: str):
+        """
+        Refuse a chat early, before a response has started, if the player is over quota.
+
+        Raises:
+            QuotaExceededError: If the player, Minecraft or global quota is exhausted
+        """
+        self.quota.check(QuotaManager.minecraft_scopes(player))
+
+    async def prepare(self, player: str, message: str, use_memory: bool) -> Tuple[str, int]:
+        """
+        Build the prompt for a chat.
+
+        Returns:
+            (prompt, stored messages in the player's conversation for routing)
+        """
+        if not use_memory:
+            return message, 0
+        return await self.memory.build_prompt(ConversationMemory.minecraft_key(player), message)
+
+    async def remember(self, player: str, message: str, response: str):
+        await self.memory.record_exchange(
+            ConversationMemory.minecraft_key(player), message, response
+        )
+
+    async def chat(self, player: str, message: str, use_memory: bool) -> Tuple[str, str]:
+        """
+        Generate a reply for a player, using and updating their memory if requested.
+
+        The chat is charged to the player's quotas with the tokens generated.
+
+        Returns:
+            (reply, overload tier that served it)
+
+        Raises:
+            QuotaExceededError: If the player, Minecraft or global quota is exhausted
+        """
+        reservation = self.quota.reserve(QuotaManager.minecraft_scopes(player))
+        stats: Dict = {}
+        try:
+            prompt, depth = await self.prepare(player, message, use_memory)
+            with self.overload.admit(message) as plan:
+                response = plan.canned or await self.router.generate(
+                    partial(self.scheduler.run, self.ollama.generate, prompt),
+                    stats,
+                    message,
+                    depth=depth,
+                    model=plan.model,
+                    options=plan.options,
+                )
+        finally:
+            reservation.settle(stats.get("eval_count", 0))
+        if use_memory:
+            await self.remember(player, message, response)
+        return response, plan.tier
+
+    async def chat_stream(
+        self,
+        player: str,
+        message: str,
+        use_memory: bool,
+        metrics: Dict,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a reply for a player in coalesced pieces.
+
+        The chat is charged to the player's quotas when the stream ends or is closed;
+        iterate it inside contextlib.aclosing() so an abandoned stream settles at once.
+
+        Args:
+            player: Player name
+            message: Chat message
+            use_memory: Whether to use and update the player's memory
+            metrics: Dict filled with token metrics and the overload tier once the stream ends
+
+        Yields:
+            Pieces of the reply
+
+        Raises:
+            QuotaExceededError: Before the first piece, if the player is over quota
+        """
+        reservation = self.quota.reserve(QuotaManager.minecraft_scopes(player))
+        stats: Dict = {}
+        pieces = []
+        started = time.perf_counter()
+        first_piece = None
+
+        try:
+            prompt, depth = await self.prepare(player, message, use_memory)
+            with self.overload.admit(message) as plan:
+                if plan.canned:
+                    first_piece = time.perf_counter()
+                    pieces.append(plan.canned)
+                    yield plan.canned
+                else:
+                    # Streamed pieces cannot be taken back, so route without escalation
+                    route = self.router.route(message, depth=depth, model=plan.model)
+                    async with self.scheduler.slot():
+                        async for piece in coalesce_chunks(
+                            self.ollama.generate_stream(prompt, stats, route.model, plan.options),
+                            interval=Config.BRIDGE_STREAM_INTERVAL,
+                            flush_chars=Config.BRIDGE_STREAM_FLUSH_CHARS,
+                        ):
+                            if first_piece is None:
+                                first_piece = time.perf_counter()
+                            pieces.append(piece)
+                            yield piece
+                    self.router.record(
+                        route, time.perf_counter() - started, stats.get("eval_count", 0)
+                    )
+        finally:
+            reservation.settle(stats.get("eval_count", 0))
+
+        response = "".join(pieces)
+        if use_memory:
+            await self.remember(player, message, response)
+
+        eval_count = stats.get("eval_count", 0)
+        eval_seconds = stats.get("eval_duration", 0) / 1e9
+        metrics.update(
+            {
+                "response": response,
+                "tokens": eval_count,
+                "prompt_tokens": stats.get("prompt_eval_count", 0),
+                "tokens_per_second": round(eval_count / eval_seconds, 1) if eval_seconds else 0.0,
+                "first_token_ms": round((first_piece - started) * 1000) if first_piece else None,
+                "total_ms": round((time.perf_counter() - started) * 1000),
+                "tier": plan.tier,
+            }
+        )
+
+    async def close(self):
+        self.scheduler.close()
+        await self.ollama.close()
+        self.memory.store.close()
+        self.quota.close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    services = BridgeServices()
+    app.state.services = services
+    await state.start()
+    logger.info(f"Bridge services started (Ollama: {Config.OLLAMA_HOST})")
+    try:
+        yield
+    finally:
+        await services.close()
+        await state.close()
+        logger.info("Bridge services stopped")
+
+
+def get_services(connection: HTTPConnection) -> BridgeServices:
+    """Dependency returning the app-scoped services (works for HTTP and WebSocket)."""
+    return connection.app.state.services
+
+
+app = FastAPI(title="Minecraft-Ollama Bridge API", lifespan=lifespan)
 
 # CORS設定
 app.add_middleware(
@@ -36,6 +275,7 @@ class ChatResponse(BaseModel):
     player: str
     response: str
     success: bool
+    tier: str = "full"  # Overload tier that served the reply
 
 
 class BroadcastRequest(BaseModel):
@@ -43,6 +283,11 @@ class BroadcastRequest(BaseModel):
     channel_id: Optional[int] = None
 
 
+class LinkRequest(BaseModel):
+    player: str
+    discord_user_id: int
+
+
 class PlayerInfo(BaseModel):
     name: str
     uuid: str
@@ -52,35 +297,133 @@ class PlayerInfo(BaseModel):
 
 
 # ===== In-memory storage =====
+class Connection:
+    """
+    A connected Minecraft server.
+
+    All outbound frames go through a bounded queue drained by one writer task, so a
+    stalled server only ever blocks its own writer. Frames are encoded with the codec
+    negotiated for the connection (JSON unless the client asked for MessagePack).
+    """
+
+    def __init__(self, websocket: WebSocket, max_queue: int, codec=JSONCodec):
+        self.websocket = websocket
+        self.codec = codec
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self.closed = False
+        self._writer = asyncio.create_task(self._write())
+
+    def offer(self, frame: Frame) -> bool:
+        """Queue an encoded frame without waiting. Returns False if the queue is full."""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def send(self, message: dict):
+        """Queue a reply for this server, waiting for room in the queue."""
+        if not self.closed:
+            await self.queue.put(self.codec.encode(message))
+
+    async def _write(self):
+        try:
+            while True:
+                frame = await self.queue.get()
+                if isinstance(frame, bytes):
+                    await self.websocket.send_bytes(frame)
+                else:
+                    await self.websocket.send_text(frame)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to send to WebSocket: {e}")
+            self.closed = True
+
+    def close(self):
+        """Stop the writer, dropping anything still queued."""
+        self.closed = True
+        self._writer.cancel()
+
+    async def evict(self):
+        """Stop the writer and close the socket so the server reconnects."""
+        self.close()
+        try:
+            await self.websocket.close(code=1013)  # Try again later
+        except Exception:
+            pass
+
+
+def _dumps(message: dict) -> str:
+    # Same encoding as WebSocket.send_json
+    return JSONCodec.encode(message)
+
+
 class BridgeState:
     def __init__(self):
         self.discord_bot = None  # Will be injected
-        self.active_connections: List[WebSocket] = []
-        self.player_contexts: Dict[str, List[Dict]] = {}  # player -> conversation
-        self.minecraft_players: Dict[str, PlayerInfo] = {}  # player -> info
+        self.active_connections: Dict[WebSocket, Connection] = {}
+        # Latest state per player, forgetting the least recently updated players
+        self.minecraft_players = PlayerTable(
+            max_players=Config.BRIDGE_MAX_TRACKED_PLAYERS,
+            log_interval=Config.BRIDGE_TELEMETRY_LOG_INTERVAL,
+            track_changes=Config.BRIDGE_STATE_BACKEND != "local",
+        )
+        # Shares broadcasts and player state with other workers (if configured)
+        self.backend = create_state_backend(self.minecraft_players)
+        self.evicted = 0
+        self._tasks: set = set()
 
-    def add_connection(self, websocket: WebSocket):
-        self.active_connections.append(websocket)
+    async def start(self):
+        await self.backend.start(self._deliver, lambda: len(self.active_connections))
+
+    async def close(self):
+        await self.backend.close()
+
+    def add_connection(self, websocket: WebSocket, codec=JSONCodec) -> Connection:
+        connection = Connection(websocket, Config.BRIDGE_SEND_QUEUE_SIZE, codec)
+        self.active_connections[websocket] = connection
         logger.info(f"WebSocket connected. Total: {len(self.active_connections)}")
+        return connection
 
     def remove_connection(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        connection = self.active_connections.pop(websocket, None)
+        if connection is not None:
+            connection.close()
         logger.info(f"WebSocket disconnected. Total: {len(self.active_connections)}")
 
     async def broadcast_to_minecraft(self, message: dict):
-        """Send message to all connected Minecraft servers."""
-        dead_connections = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Failed to send to WebSocket: {e}")
-                dead_connections.append(connection)
-
-        # Clean up dead connections
-        for conn in dead_connections:
-            self.remove_connection(conn)
+        """Send message to all connected Minecraft servers, on every worker."""
+        await self.backend.publish(_dumps(message))
+
+    def _deliver(self, text: str):
+        """
+        Queue a serialized message on every connection of this worker.
+
+        The message is encoded at most once per codec and nothing waits on a socket.
+        Servers whose queue is full (or whose writer failed) are evicted.
+        """
+        frames = {JSONCodec.name: text}
+        message = None
+        slow = []
+        for conn in self.active_connections.values():
+            frame = frames.get(conn.codec.name)
+            if frame is None:
+                if message is None:
+                    message = json.loads(text)
+                frame = frames[conn.codec.name] = conn.codec.encode(message)
+            if not conn.offer(frame):
+                slow.append(conn)
+
+        for conn in slow:
+            logger.warning("Evicting slow or dead Minecraft connection")
+            self.evicted += 1
+            self.active_connections.pop(conn.websocket, None)
+            task = asyncio.create_task(conn.evict())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
 
 
 state = BridgeState()
@@ -88,62 +431,78 @@ state = BridgeState()
 
 # ===== REST Endpoints =====
 @app.get("/")
-async def root():
+async def root(services: BridgeServices = Depends(get_services)):
     return {
         "service": "Minecraft-Ollama Bridge",
         "version": "1.0.0",
-        "connected_servers": len(state.active_connections),
-        "tracked_players": len(state.minecraft_players),
+        "connected_servers": await state.backend.connection_count(),
+        "tracked_players": await state.backend.player_count(),
+        "chat_scheduler": services.scheduler.get_stats(),
+        "quota": services.quota.get_stats(),
+        "overload": services.overload.get_stats(),
+        "router": services.router.get_stats(),
     }
 
 
+def _quota_429(e: QuotaExceededError) -> HTTPException:
+    return HTTPException(
+        status_code=429, detail=e.message, headers={"Retry-After": str(e.retry_after)}
+    )
+
+
 @app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, services: BridgeServices = Depends(get_services)):
     """
     Handle chat from Minecraft player.
     """
     try:
-        # This would integrate with your Ollama Bot
-        # For now, we'll use a direct Ollama client
-        from bot.ollama_client import OllamaClient
-        from config import Config
-
-        ollama = OllamaClient(
-            host=Config.OLLAMA_HOST, model=Config.OLLAMA_MODEL, timeout=Config.REQUEST_TIMEOUT
-        )
-
-        # Add context if memory enabled
-        if request.use_memory and request.player in state.player_contexts:
-            context = state.player_contexts[request.player][-3:]  # Last 3 messages
-            context_str = "\n".join([f"{msg['role']}: {msg['content']}" for msg in context])
-            prompt = f"過去の会話:\n{context_str}\n\n新しい質問: {request.message}"
-        else:
-            prompt = request.message
-
-        # Generate response
-        response = await asyncio.to_thread(ollama.generate, prompt)
-
-        # Save to memory
-        if request.use_memory:
-            if request.player not in state.player_contexts:
-                state.player_contexts[request.player] = []
-
-            state.player_contexts[request.player].append(
-                {"role": "user", "content": request.message}
-            )
-            state.player_contexts[request.player].append({"role": "assistant", "content": response})
-
-            # Keep only last 10 messages
-            if len(state.player_contexts[request.player]) > 10:
-                state.player_contexts[request.player] = state.player_contexts[request.player][-10:]
-
-        return ChatResponse(player=request.player, response=response, success=True)
+        response, tier = await services.chat(request.player, request.message, request.use_memory)
+        return ChatResponse(player=request.player, response=response, success=True, tier=tier)
 
+    except QuotaExceededError as e:
+        raise _quota_429(e)
     except Exception as e:
         logger.error(f"Chat error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest, services: BridgeServices = Depends(get_services)):
+    """
+    Stream a chat reply as Server-Sent Events.
+
+    Sends "delta" events with pieces of text and a final "done" event with the full
+    response and token metrics.
+    """
+    # Answer 429 while that is still possible; the stream itself reserves the tokens
+    try:
+        services.check_quota(request.player)
+    except QuotaExceededError as e:
+        raise _quota_429(e)
+
+    async def events():
+        metrics: Dict = {}
+        try:
+            async with aclosing(
+                services.chat_stream(request.player, request.message, request.use_memory, metrics)
+            ) as stream:
+                async for piece in stream:
+                    yield f"event: delta\ndata: {_dumps({'text': piece})}\n\n"
+            yield f"event: done\ndata: {_dumps({'player': request.player, **metrics})}\n\n"
+        except QuotaExceededError as e:
+            detail = {"detail": e.message, "retry_after": e.retry_after}
+            yield f"event: error\ndata: {_dumps(detail)}\n\n"
+        except Exception as e:
+            logger.error(f"Chat stream error: {e}")
+            yield f"event: error\ndata: {_dumps({'detail': str(e)})}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post("/broadcast")
 async def broadcast_to_discord(request: BroadcastRequest):
     """
@@ -163,80 +522,254 @@ async def update_player_info(player_info: PlayerInfo):
     """
     Update player information from Minecraft.
     """
-    state.minecraft_players[player_info.name] = player_info
-    logger.info(f"Updated player info: {player_info.name}")
+    state.minecraft_players.update(
+        player_info.name,
+        player_info.uuid,
+        player_info.location,
+        player_info.health,
+        player_info.gamemode,
+    )
     return {"success": True}
 
 
+@app.post("/player/update/bulk")
+async def update_players_bulk(request: Request):
+    """
+    Update many players at once from a JSON array of PlayerInfo objects.
+
+    Entries are checked field by field rather than through pydantic, and only the
+    latest entry per player is kept. Invalid entries are counted and skipped.
+    """
+    try:
+        players = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON")
+    if not isinstance(players, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of players")
+
+    accepted, rejected = state.minecraft_players.update_many(players)
+    return {"success": True, "accepted": accepted, "rejected": rejected}
+
+
 @app.get("/player/{player_name}")
 async def get_player_info(player_name: str):
     """
     Get player information.
     """
-    if player_name not in state.minecraft_players:
+    player_info = await state.backend.get_player(player_name)
+    if player_info is None:
         raise HTTPException(status_code=404, detail="Player not found")
 
-    return state.minecraft_players[player_name]
+    return player_info
 
 
 @app.delete("/memory/{player_name}")
-async def clear_player_memory(player_name: str):
+async def clear_player_memory(player_name: str, services: BridgeServices = Depends(get_services)):
     """
     Clear conversation memory for a player.
     """
-    if player_name in state.player_contexts:
-        del state.player_contexts[player_name]
+    await services.memory.run(
+        services.memory.clear_context, ConversationMemory.minecraft_key(player_name)
+    )
 
     return {"success": True, "message": f"Memory cleared for {player_name}"}
 
 
+@app.post("/memory/link")
+async def link_player_memory(
+    request: LinkRequest, services: BridgeServices = Depends(get_services)
+):
+    """
+    Share a Minecraft player's conversation history with their Discord account.
+    """
+    await services.memory.run(
+        services.memory.link_identity,
+        ConversationMemory.minecraft_key(request.player),
+        request.discord_user_id,
+    )
+    return {"success": True}
+
+
+@app.delete("/memory/link/{player_name}")
+async def unlink_player_memory(player_name: str, services: BridgeServices = Depends(get_services)):
+    """
+    Give a Minecraft player their own conversation history again.
+    """
+    await services.memory.run(
+        services.memory.unlink_identity, ConversationMemory.minecraft_key(player_name)
+    )
+    return {"success": True}
+
+
 # ===== WebSocket for real-time communication =====
-@app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
+class ConnectionDispatcher:
     """
-    WebSocket endpoint for Minecraft plugin.
+    Runs one connection's events as concurrent tasks.
+
+    Events with the same key (the player) are chained so each player's events are
+    handled in arrival order, while different players proceed independently. Once
+    max_tasks events are pending, submit() waits, which stops reading from the socket.
+    A key with max_per_key events pending has further events refused instead, so one
+    flooding player cannot take every slot and stall the reader for everyone else.
     """
-    await websocket.accept()
-    state.add_connection(websocket)
 
-    try:
-        while True:
-            data = await websocket.receive_json()
-            event_type = data.get("type")
-
-            if event_type == "chat":
-                # Handle chat message
-                player = data.get("player")
-                message = data.get("message")
-
-                # Generate response (same as REST)
-                from bot.ollama_client import OllamaClient
-                from config import Config
-
-                ollama = OllamaClient(
-                    host=Config.OLLAMA_HOST,
-                    model=Config.OLLAMA_MODEL,
-                    timeout=Config.REQUEST_TIMEOUT,
+    def __init__(self, max_tasks: int, max_per_key: int = 8):
+        self._slots = asyncio.Semaphore(max_tasks)
+        self.max_per_key = max_per_key
+        self._lanes: Dict[str, asyncio.Task] = {}  # key -> latest task for that key
+        self._pending: Dict[str, int] = {}  # key -> events queued or running
+        self._tasks: set = set()
+
+    async def submit(self, key: str, func, *args) -> bool:
+        """
+        Schedule func(*args) after the key's previous event.
+
+        Returns:
+            False if the event was refused because the key has too many pending
+        """
+        if self.max_per_key and self._pending.get(key, 0) >= self.max_per_key:
+            return False
+        self._pending[key] = self._pending.get(key, 0) + 1
+        await self._slots.acquire()
+        task = asyncio.create_task(self._run(self._lanes.get(key), func, *args))
+        self._lanes[key] = task
+        self._tasks.add(task)
+        task.add_done_callback(lambda t: self._finish(key, t))
+        return True
+
+    def _finish(self, key: str, task: asyncio.Task):
+        self._tasks.discard(task)
+        if self._lanes.get(key) is task:
+            del self._lanes[key]
+        self._pending[key] -= 1
+        if not self._pending[key]:
+            del self._pending[key]
+        self._slots.release()
+
+    @staticmethod
+    async def _run(previous: Optional[asyncio.Task], func, *args):
+        if previous is not None:
+            await asyncio.wait([previous])
+        try:
+            await func(*args)
+        except Exception as e:
+            logger.error(f"WebSocket event failed: {e}")
+
+    async def close(self):
+        """Cancel pending events (e.g. after the connection dropped)."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+async def reject_ws_event(connection: Connection, data: dict):
+    """Answer an event refused because its player has too many events pending."""
+    if data.get("type") != "chat":
+        return
+    # Answer in the shape the client waits for, so the player is not left hanging
+    await connection.send(
+        {
+            "type": "chat_done" if data.get("stream") else "chat_response",
+            "player": data.get("player"),
+            "response": "⏳ 処理待ちのメッセージが多すぎます。少し待ってから話しかけてください。",
+        }
+    )
+
+
+async def handle_ws_event(connection: Connection, services: BridgeServices, data: dict):
+    """Handle one event from a Minecraft server."""
+    event_type = data.get("type")
+
+    if event_type == "chat":
+        player = data.get("player")
+        try:
+            if data.get("stream"):
+                # Streamed reply: chat_delta frames, then chat_done with token metrics
+                metrics: Dict = {}
+                async with aclosing(
+                    services.chat_stream(player, data.get("message"), False, metrics)
+                ) as stream:
+                    async for piece in stream:
+                        await connection.send(
+                            {"type": "chat_delta", "player": player, "text": piece}
+                        )
+                await connection.send({"type": "chat_done", "player": player, **metrics})
+            else:
+                # Generate response (same as REST, without memory)
+                response, tier = await services.chat(player, data.get("message"), False)
+                await connection.send(
+                    {"type": "chat_response", "player": player, "response": response, "tier": tier}
                 )
+        except QuotaExceededError as e:
+            # Answer in the shape the client waits for, with the time until it may retry
+            reply_type = "chat_done" if data.get("stream") else "chat_response"
+            await connection.send(
+                {
+                    "type": reply_type,
+                    "player": player,
+                    "response": e.message,
+                    "retry_after": e.retry_after,
+                }
+            )
 
-                response = await asyncio.to_thread(ollama.generate, message)
+    elif event_type == "player_join":
+        logger.info(f"Player joined: {data.get('player')}")
+        await state.broadcast_to_minecraft(
+            {"type": "player_event", "event": "join", "player": data.get("player")}
+        )
 
-                # Send back response
-                await websocket.send_json(
-                    {"type": "chat_response", "player": player, "response": response}
-                )
+    elif event_type == "player_leave":
+        logger.info(f"Player left: {data.get('player')}")
+        await state.broadcast_to_minecraft(
+            {"type": "player_event", "event": "leave", "player": data.get("player")}
+        )
 
-            elif event_type == "player_join":
-                logger.info(f"Player joined: {data.get('player')}")
-                await state.broadcast_to_minecraft(
-                    {"type": "player_event", "event": "join", "player": data.get("player")}
-                )
 
-            elif event_type == "player_leave":
-                logger.info(f"Player left: {data.get('player')}")
-                await state.broadcast_to_minecraft(
-                    {"type": "player_event", "event": "leave", "player": data.get("player")}
-                )
+@app.websocket("/ws")
+async def websocket_endpoint(
+    websocket: WebSocket, services: BridgeServices = Depends(get_services)
+):
+    """
+    WebSocket endpoint for Minecraft plugin.
+
+    Events are dispatched to tasks so a slow answer for one player does not hold up
+    other players' chats or join/leave events from the same server.
+    """
+    codec, subprotocol = negotiate(websocket.scope.get("subprotocols", []))
+    await websocket.accept(subprotocol=subprotocol)
+    connection = state.add_connection(websocket, codec)
+    dispatcher = ConnectionDispatcher(
+        Config.BRIDGE_MAX_TASKS_PER_CONNECTION, Config.BRIDGE_MAX_TASKS_PER_PLAYER
+    )
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+
+            frame = message.get("bytes")
+            if frame is not None and (frame.startswith(FRAME_MAGIC) or not codec.binary):
+                # Player telemetry (see bridge.telemetry.encode_frame)
+                try:
+                    state.minecraft_players.apply_frame(frame)
+                except ValueError as e:
+                    logger.warning(f"Dropped telemetry frame: {e}")
+                continue
+
+            # Events may always be sent as JSON text, or in the negotiated encoding
+            if frame is None:
+                data = json.loads(message["text"])
+            else:
+                try:
+                    data = codec.decode(frame)
+                except ValueError as e:
+                    logger.warning(f"Dropped {codec.name} frame: {e!r}")
+                    continue
+            player = str(data.get("player") or "")
+            if not await dispatcher.submit(player, handle_ws_event, connection, services, data):
+                logger.debug(f"Refused event from {player}: too many pending")
+                await reject_ws_event(connection, data)
 
     except WebSocketDisconnect:
         state.remove_connection(websocket)
@@ -244,9 +777,16 @@ async def websocket_endpoint(websocket: WebSocket):
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
         state.remove_connection(websocket)
+    finally:
+        await dispatcher.close()
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    if Config.BRIDGE_WORKERS > 1 and Config.BRIDGE_STATE_BACKEND == "local":
+        logger.warning(
+            "BRIDGE_WORKERS > 1 with the local state backend: broadcasts and player "
+            "lookups will not cross workers. Set BRIDGE_STATE_BACKEND=sqlite."
+        )
+    uvicorn.run("api_server:app", host="0.0.0.0", port=8000, workers=Config.BRIDGE_WORKERS)
@@ -0,0 +1,115 @@
+"""
+Benchmark bridge broadcasts: sequential sends vs per-connection send queues.
+
+Uses fake WebSockets with a small per-frame send cost, one of which stalls, so no
+network is needed. The sequential variant reproduces the old broadcast loop.
+
+Usage:
+    python -m benchmarks.bridge_broadcast [--connections 300] [--send-ms 0.2] [--stall-s 1]
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+import api_server
+from api_server import BridgeState
+from config import Config
+
+
+class FakeWebSocket:
+    """Records when each frame arrives; a stalled socket blocks on send."""
+
+    def __init__(self, send_cost: float, stall: float = 0.0):
+        self.send_cost = send_cost
+        self.stall = stall
+        self.received_at = []
+
+    async def send_json(self, message: dict):
+        await self.send_text(api_server._dumps(message))
+
+    async def send_text(self, text: str):
+        await asyncio.sleep(self.stall or self.send_cost)
+        self.received_at.append(time.perf_counter())
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+async def sequential_broadcast(sockets, message: dict):
+    for websocket in sockets:
+        await websocket.send_json(message)
+
+
+async def _wait_delivered(sockets, count: int):
+    while any(len(ws.received_at) < count for ws in sockets):
+        await asyncio.sleep(0.001)
+
+
+def _report(label: str, returned: float, delivered: float):
+    print(
+        f"{label:<14} returns {returned * 1000:>8.1f} ms"
+        f"  healthy delivered {delivered * 1000:>8.1f} ms"
+    )
+
+
+async def run(args):
+    message = {"type": "server_broadcast", "message": "サーバーを再起動します"}
+    print(
+        f"{args.connections} connections, {args.send_ms} ms per send, "
+        f"1 connection stalled for {args.stall_s} s\n"
+    )
+
+    def make_sockets():
+        healthy = [FakeWebSocket(args.send_ms / 1000) for _ in range(args.connections - 1)]
+        return healthy, [FakeWebSocket(0, stall=args.stall_s)] + healthy
+
+    # Old behaviour: one send after another, the stalled server first in line
+    healthy, sockets = make_sockets()
+    start = time.perf_counter()
+    await sequential_broadcast(sockets, message)
+    returned = time.perf_counter() - start
+    delivered = max(ws.received_at[0] for ws in healthy) - start
+    _report("sequential", returned, delivered)
+
+    # New behaviour: serialize once, queue everywhere, writers drain concurrently
+    healthy, sockets = make_sockets()
+    state = BridgeState()
+    await state.start()
+    for websocket in sockets:
+        state.add_connection(websocket)
+    start = time.perf_counter()
+    await state.broadcast_to_minecraft(message)
+    returned = time.perf_counter() - start
+    await _wait_delivered(healthy, 1)
+    delivered = max(ws.received_at[0] for ws in healthy) - start
+    _report("send queues", returned, delivered)
+
+    # Keep broadcasting until the stalled server's queue overflows
+    sent = 1
+    while state.evicted == 0:
+        await state.broadcast_to_minecraft(message)
+        sent += 1
+    print(f"\nstalled connection evicted after {sent} broadcasts (queue size {args.queue_size})")
+
+    for websocket in list(state.active_connections):
+        state.remove_connection(websocket)
+    await state.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--connections", type=int, default=300)
+    parser.add_argument("--send-ms", type=float, default=0.2)
+    parser.add_argument("--stall-s", type=float, default=1.0)
+    parser.add_argument("--queue-size", type=int, default=Config.BRIDGE_SEND_QUEUE_SIZE)
+    args = parser.parse_args()
+
+    Config.BRIDGE_SEND_QUEUE_SIZE = args.queue_size
+    logging.getLogger().setLevel(logging.ERROR)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
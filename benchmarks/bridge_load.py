@@ -0,0 +1,139 @@
+"""
+Load test the bridge API's /chat endpoint: per-request clients vs app-scoped ones.
+
+Runs the FastAPI app under uvicorn against an in-process stub Ollama, so no model is
+needed. "/legacy_chat" reproduces the old handler, which built an OllamaClient per
+request and ran the blocking call in a thread.
+
+Usage:
+    python -m benchmarks.bridge_load [--requests 400] [--concurrency 16] [--latency-ms 5]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import aiohttp
+import uvicorn
+
+import api_server
+from bot.ollama_client import OllamaClient
+from config import Config
+
+
+class StubOllama:
+    """Minimal /api/generate lookalike with keep-alive and a fixed latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.connections = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                stub.connections += 1
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                time.sleep(stub.latency)
+                data = json.dumps({"response": "こんにちは！", "done": True}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.host = f"http://127.0.0.1:{self.server.server_port}"
+
+
+async def legacy_chat(request: api_server.ChatRequest):
+    ollama = OllamaClient(
+        host=Config.OLLAMA_HOST, model=Config.OLLAMA_MODEL, timeout=Config.REQUEST_TIMEOUT
+    )
+    response = await asyncio.to_thread(ollama.generate, request.message)
+    return api_server.ChatResponse(player=request.player, response=response, success=True)
+
+
+async def _load(stub: StubOllama, url: str, requests: int, concurrency: int) -> float:
+    remaining = iter(range(requests))
+    payload = {"player": "Steve", "message": "やあ", "use_memory": False}
+
+    async def worker(session: aiohttp.ClientSession):
+        for _ in remaining:
+            async with session.post(url, json=payload) as response:
+                response.raise_for_status()
+                await response.read()
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        # Warm up connections and the app before timing
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+        remaining = iter(range(requests))
+        stub.connections = 0
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+        return requests / (time.perf_counter() - start)
+
+
+async def run(args):
+    stub = StubOllama(args.latency_ms / 1000)
+    Config.OLLAMA_HOST = stub.host
+    Config.BRIDGE_MAX_CONCURRENT_CHATS = args.concurrency
+    # Every request comes from one player; keep quotas out of the measurement, and
+    # overload degradation too, since the load is the point
+    Config.QUOTA_USER_TOKENS_PER_HOUR = Config.QUOTA_GUILD_TOKENS_PER_HOUR = 0
+    Config.QUOTA_DB_PATH = ""
+    Config.OVERLOAD_QUEUE_DEPTH = 0
+    Config.OVERLOAD_SLO_MS = 0
+
+    api_server.app.add_api_route(
+        "/legacy_chat", legacy_chat, methods=["POST"], response_model=api_server.ChatResponse
+    )
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(api_server.app, log_level="warning"))
+    serving = asyncio.create_task(server.serve(sockets=[sock]))
+    while not server.started:
+        await asyncio.sleep(0.01)
+    base = f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+    print(
+        f"{args.requests} requests, concurrency {args.concurrency}, "
+        f"{args.latency_ms:.0f} ms stub latency\n"
+    )
+    for label, path in (("per-request client", "/legacy_chat"), ("app-scoped client", "/chat")):
+        rps = await _load(stub, base + path, args.requests, args.concurrency)
+        print(f"{label:<20} {rps:>8.1f} req/s  {stub.connections:>5} Ollama connections")
+
+    server.should_exit = True
+    await serving
+    stub.server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
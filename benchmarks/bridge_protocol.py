@@ -0,0 +1,76 @@
+"""
+Benchmark the bridge WebSocket encodings per frame on one core.
+
+Compares JSON text frames with the MessagePack subprotocol (integer type and field
+tags) for the frames the bridge exchanges: encode and decode cost, and bytes on the
+wire. Telemetry also shows the dedicated binary frame for reference.
+
+Usage:
+    python -m benchmarks.bridge_protocol [--iterations 20000]
+"""
+
+import argparse
+import time
+import uuid
+
+from bridge.protocol import JSONCodec, MsgPackCodec, msgpack
+from bridge.telemetry import encode_frame
+
+PLAYER = {
+    "name": "Steve",
+    "uuid": str(uuid.UUID(int=1)),
+    "location": {"x": 128.5, "y": 64.0, "z": -233.25, "yaw": 90.0, "pitch": 12.5},
+    "health": 20.0,
+    "gamemode": "SURVIVAL",
+}
+
+FRAMES = {
+    "chat": {"type": "chat", "player": "Steve", "message": "ダイヤはどこで見つかる？"},
+    "chat_delta": {"type": "chat_delta", "player": "Steve", "text": "Y座標-59付近を"},
+    "chat_done": {
+        "type": "chat_done",
+        "player": "Steve",
+        "response": "ダイヤモンドはY座標-59付近で最もよく見つかります。" * 3,
+        "tokens": 96,
+        "prompt_tokens": 412,
+        "tokens_per_second": 41.7,
+        "first_token_ms": 182.4,
+        "total_ms": 2480.9,
+    },
+    "server_broadcast": {"type": "server_broadcast", "message": "サーバーを再起動します"},
+    "player_event": {"type": "player_event", "event": "join", "player": "Steve"},
+    "telemetry": {"type": "player_update", **PLAYER},
+}
+
+
+def _per_frame(iterations: int, func, arg) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(arg)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    if msgpack is None:
+        raise SystemExit("msgpack is not installed (pip install msgpack)")
+
+    print(f"{'frame':<18} {'codec':<8} {'bytes':>6} {'encode µs':>10} {'decode µs':>10}")
+    for label, message in FRAMES.items():
+        for codec in (JSONCodec, MsgPackCodec):
+            frame = codec.encode(message)
+            size = len(frame.encode("utf-8") if isinstance(frame, str) else frame)
+            encode = _per_frame(args.iterations, codec.encode, message)
+            decode = _per_frame(args.iterations, codec.decode, frame)
+            print(f"{label:<18} {codec.name:<8} {size:>6} {encode:>10.2f} {decode:>10.2f}")
+
+    frame = encode_frame([PLAYER])
+    encode = _per_frame(args.iterations, lambda player: encode_frame([player]), PLAYER)
+    print(f"{'telemetry':<18} {'binary':<8} {len(frame):>6} {encode:>10.2f} {'-':>10}")
+
+
+if __name__ == "__main__":
+    main()
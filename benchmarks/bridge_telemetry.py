@@ -0,0 +1,95 @@
+"""
+Benchmark player telemetry ingestion on one core.
+
+Compares the per-update path (pydantic validation, INFO log line, dict store) with the
+bulk JSON path and binary frames feeding PlayerTable.
+
+Usage:
+    python -m benchmarks.bridge_telemetry [--players 200] [--ticks 50]
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import time
+import uuid
+
+from api_server import PlayerInfo
+from bridge.telemetry import PlayerTable, encode_frame
+
+logger = logging.getLogger("benchmarks.bridge_telemetry")
+
+
+def _updates(players: int, ticks: int):
+    names = [f"Player{i}" for i in range(players)]
+    ids = {name: str(uuid.uuid4()) for name in names}
+    rng = random.Random(0)
+    return [
+        [
+            {
+                "name": name,
+                "uuid": ids[name],
+                "location": {
+                    "x": rng.uniform(-1000, 1000),
+                    "y": rng.uniform(60, 120),
+                    "z": rng.uniform(-1000, 1000),
+                    "yaw": rng.uniform(-180, 180),
+                    "pitch": rng.uniform(-90, 90),
+                },
+                "health": 20.0,
+                "gamemode": "SURVIVAL",
+            }
+            for name in names
+        ]
+        for _ in range(ticks)
+    ]
+
+
+def _measure(label: str, total: int, run):
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<30} {total / elapsed:>12,.0f} updates/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--players", type=int, default=200)
+    parser.add_argument("--ticks", type=int, default=50)
+    args = parser.parse_args()
+
+    # Log to /dev/null so the per-update path pays for formatting and I/O, not a terminal
+    handler = logging.StreamHandler(open(os.devnull, "w"))
+    logging.basicConfig(level=logging.INFO, handlers=[handler], force=True)
+
+    ticks = _updates(args.players, args.ticks)
+    total = args.players * args.ticks
+    bodies = [json.dumps(tick).encode() for tick in ticks]
+    frames = [encode_frame(tick) for tick in ticks]
+    print(
+        f"{args.players} players x {args.ticks} ticks; one tick is "
+        f"{len(bodies[0]):,} bytes JSON / {len(frames[0]):,} bytes binary\n"
+    )
+
+    def per_update():
+        players = {}
+        for tick in ticks:
+            for update in tick:
+                info = PlayerInfo.model_validate_json(json.dumps(update))
+                players[info.name] = info
+                logger.info(f"Updated player info: {info.name}")
+
+    table = PlayerTable(max_players=args.players)
+    _measure("per-update (old /player/update)", total, per_update)
+    _measure(
+        "bulk JSON -> PlayerTable",
+        total,
+        lambda: [table.update_many(json.loads(b)) for b in bodies],
+    )
+    _measure("binary frame -> PlayerTable", total, lambda: [table.apply_frame(f) for f in frames])
+
+
+if __name__ == "__main__":
+    main()
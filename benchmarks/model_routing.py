@@ -0,0 +1,123 @@
+"""
+Compare always using the large model with the small-model-first cascade.
+
+Replays a mixed Discord-like workload (greetings, short questions, coding and long
+requests) against a stub Ollama in which the small model decodes faster and answers
+"わかりません" to some requests it cannot handle. Reports average latency, stub GPU
+time per request and how often each route was taken.
+
+Usage:
+    python -m benchmarks.model_routing [--requests 200]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import socket
+import time
+from functools import partial
+
+from aiohttp import web
+
+from bot.async_ollama_client import AsyncOllamaClient
+from bot.router import ModelRouter
+
+WORKLOAD = [
+    # (weight, message, template)
+    (25, "こんにちは！", None),
+    (10, "ありがとう、助かった", None),
+    (10, "おすすめの朝ごはんは？", None),
+    (10, "東京の人口はどれくらい？", None),
+    (10, "この単語の読み方は？「蹲る」", None),
+    (10, "Pythonのリスト内包表記とは何か、なぜ速いのかを説明して", None),
+    (10, "```python\nfor i in range(10) print(i)\n```\nどこが間違ってる？", "debug"),
+    (5, "REST APIの認証をJWTで実装したい", "coding"),
+    (
+        10,
+        "来週の会議の議事録を要約して。" + "議題は予算と採用と新製品の発表日程について。" * 4,
+        None,
+    ),
+]
+
+SPEED = {"large": 0.004, "small": 0.001}  # Seconds per generated token
+PREFILL = {"large": 0.05, "small": 0.015}
+REPLY_TOKENS = 120
+
+
+class StubOllama:
+    """/api/generate lookalike with per-model speed; the small model gives up on some inputs."""
+
+    def __init__(self):
+        self.gpu_seconds = 0.0
+
+    async def generate(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        model = body["model"]
+        unsure = model == "small" and "蹲" in body["prompt"]
+        tokens = 12 if unsure else REPLY_TOKENS
+        seconds = PREFILL[model] + tokens * SPEED[model]
+        self.gpu_seconds += seconds
+        await asyncio.sleep(seconds)
+        reply = "すみません、わかりません。" if unsure else "はい、お答えします。"
+        return web.Response(
+            text=json.dumps({"response": reply, "done": True, "eval_count": tokens}),
+            content_type="application/json",
+        )
+
+
+async def _replay(client: AsyncOllamaClient, router: ModelRouter, stub: StubOllama, workload):
+    stub.gpu_seconds = 0.0
+    started = time.perf_counter()
+    for message, template in workload:
+        await router.generate(partial(client.generate, message), {}, message, template=template)
+    elapsed = time.perf_counter() - started
+    return elapsed / len(workload), stub.gpu_seconds / len(workload)
+
+
+async def run(args):
+    stub = StubOllama()
+    app = web.Application()
+    app.router.add_post("/api/generate", stub.generate)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    await web.SockSite(runner, sock).start()
+    client = AsyncOllamaClient(host=f"http://127.0.0.1:{sock.getsockname()[1]}", model="large")
+
+    rng = random.Random(0)
+    weights = [weight for weight, _, _ in WORKLOAD]
+    workload = [
+        (message, template)
+        for _, message, template in rng.choices(WORKLOAD, weights=weights, k=args.requests)
+    ]
+    print(f"{args.requests} requests, mixed workload\n")
+
+    for label, router in (
+        ("large only", ModelRouter(small_model="", large_model="large")),
+        ("cascade", ModelRouter(small_model="small", large_model="large")),
+    ):
+        latency, gpu = await _replay(client, router, stub, workload)
+        routes = ", ".join(f"{name} {r['requests']}" for name, r in router.get_stats().items())
+        print(
+            f"{label:<12} avg latency {latency * 1000:>6.0f} ms  "
+            f"GPU time {gpu * 1000:>6.0f} ms/request  [{routes}]"
+        )
+
+    await client.close()
+    await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
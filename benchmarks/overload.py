@@ -0,0 +1,162 @@
+"""
+Simulate a traffic spike against a single-GPU stub Ollama, with and without degradation.
+
+The stub serves one request at a time; its service time grows with num_predict and
+num_ctx and shrinks on the fallback model, like a real GPU. Traffic runs at a steady
+rate, spikes above capacity, then returns to normal. Timings are scaled down so one
+run takes about a minute.
+
+Usage:
+    python -m benchmarks.overload [--rate 3] [--spike 3] [--phase 8] [--slo-ms 1500]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import socket
+import statistics
+import time
+from collections import Counter
+
+from aiohttp import web
+
+from bot.async_ollama_client import AsyncOllamaClient
+from bot.overload import OverloadController
+
+MESSAGES = [
+    "こんにちは",
+    "ありがとう",
+    "Pythonのデコレータを例つきで説明して",
+    "明日の予定を整理して",
+]
+
+FULL_TOKENS = 400  # Reply length when num_predict is not capped
+TOKEN_SECONDS = 0.0005
+PREFILL_SECONDS = 0.03
+FALLBACK_SPEEDUP = 3
+
+
+class StubGPU:
+    """/api/generate lookalike serving one request at a time."""
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+
+    async def generate(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        options = body.get("options", {})
+        tokens = min(FULL_TOKENS, options.get("num_predict", FULL_TOKENS))
+        seconds = tokens * TOKEN_SECONDS
+        seconds += PREFILL_SECONDS / 2 if options.get("num_ctx", 8192) <= 2048 else PREFILL_SECONDS
+        if body["model"] == "small":
+            seconds /= FALLBACK_SPEEDUP
+        async with self.lock:
+            await asyncio.sleep(seconds)
+        return web.Response(
+            text=json.dumps({"response": "…", "done": True, "eval_count": tokens}),
+            content_type="application/json",
+        )
+
+
+async def _run(host: str, controller: OverloadController, schedule) -> tuple:
+    client = AsyncOllamaClient(host=host, model="large", max_connections=256)
+    latencies = []
+
+    async def one(message: str):
+        started = time.perf_counter()
+        with controller.admit(message) as plan:
+            if plan.canned is None:
+                await client.generate(message, None, plan.model, plan.options)
+        latencies.append(time.perf_counter() - started)
+
+    tasks = []
+    start = time.perf_counter()
+    for offset, message in schedule:
+        await asyncio.sleep(max(0.0, start + offset - time.perf_counter()))
+        tasks.append(asyncio.create_task(one(message)))
+    await asyncio.gather(*tasks)
+    await client.close()
+    return latencies, controller.served
+
+
+def _schedule(rate: float, spike: float, phase: float):
+    """Poisson arrivals: steady, spike (rate * spike), steady."""
+    rng = random.Random(0)
+    schedule, now = [], 0.0
+    for duration, phase_rate in ((phase, rate), (phase, rate * spike), (phase, rate)):
+        end = now + duration
+        while True:
+            now += rng.expovariate(phase_rate)
+            if now >= end:
+                now = end
+                break
+            schedule.append((now, rng.choice(MESSAGES)))
+    return schedule
+
+
+def _report(label: str, latencies, served: Counter, slo: float):
+    latencies = sorted(latencies)
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    p99 = latencies[int(0.99 * (len(latencies) - 1))]
+    within = sum(latency <= slo for latency in latencies) / len(latencies)
+    tiers = ", ".join(f"{tier} {count}" for tier, count in served.most_common())
+    print(
+        f"{label:<12} p50 {statistics.median(latencies) * 1000:>6.0f} ms  "
+        f"p95 {p95 * 1000:>6.0f} ms  p99 {p99 * 1000:>6.0f} ms  "
+        f"within SLO {within:>6.1%}  [{tiers}]"
+    )
+
+
+async def run(args):
+    stub = StubGPU()
+    app = web.Application()
+    app.router.add_post("/api/generate", stub.generate)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    await web.SockSite(runner, sock).start()
+    host = f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+    schedule = _schedule(args.rate, args.spike, args.phase)
+    capacity = 1 / (FULL_TOKENS * TOKEN_SECONDS + PREFILL_SECONDS)
+    print(
+        f"{len(schedule)} requests; {args.rate}/s, spike to {args.rate * args.spike}/s "
+        f"(full-tier capacity {capacity:.1f}/s), SLO {args.slo_ms:.0f} ms\n"
+    )
+
+    controllers = {
+        "no control": OverloadController(slo_ms=0, queue_depth=0),
+        "degradation": OverloadController(
+            slo_ms=args.slo_ms,
+            queue_depth=4,
+            num_predict=96,
+            fallback_model="small",
+            window=args.phase,
+            step_interval=0.5,
+            cooldown=args.phase / 3,
+        ),
+    }
+    for label, controller in controllers.items():
+        latencies, served = await _run(host, controller, schedule)
+        _report(label, latencies, served, args.slo_ms / 1000)
+
+    await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rate", type=float, default=3.0)
+    parser.add_argument("--spike", type=float, default=3.0)
+    parser.add_argument("--phase", type=float, default=8.0)
+    parser.add_argument("--slo-ms", type=float, default=1500)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
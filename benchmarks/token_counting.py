@@ -0,0 +1,87 @@
+"""
+Benchmark token counting and budgeted prompt assembly on one core.
+
+Counts a corpus of Japanese, English and mixed chat messages with the old
+character heuristic (len // 4), the per-script estimate uncached and cached, and the
+model's tokenizer when --tokenizer points at its tokenizer.json (needs the optional
+tokenizers package). Also times get_enhanced_prompt with a full history.
+
+Usage:
+    python -m benchmarks.token_counting [--messages 2000] [--tokenizer tokenizer.json]
+"""
+
+import argparse
+import random
+import time
+from functools import lru_cache
+
+from bot.memory import ConversationMemory
+from bot.memory_store import InProcessMemoryStore
+from bot.tokens import TokenCounter
+
+SAMPLES = [
+    "こんにちは！",
+    "東京の人口はどれくらい？",
+    "Pythonのリスト内包表記とは何か、なぜ速いのかを説明して",
+    "来週の会議の議事録を要約して。議題は予算と採用と新製品の発表日程について。",
+    "How do I reverse a linked list in place?",
+    "```python\nfor i in range(10): print(i)\n```\nこのコードの出力は？",
+    "ダイヤモンドはY座標-59付近で最もよく見つかります。ブランチマイニングがおすすめです。",
+    "ありがとう😊 助かった！",
+]
+
+
+def _corpus(count: int):
+    rng = random.Random(0)
+    # Unique texts, so the uncached runs never hit the cache
+    return [f"{rng.choice(SAMPLES)} #{i}" * rng.randint(1, 4) for i in range(count)]
+
+
+def _per_second(func, texts, rounds: int = 5) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            func(text)
+    return rounds * len(texts) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--tokenizer", default="", help="tokenizer.json of the model")
+    args = parser.parse_args()
+
+    texts = _corpus(args.messages)
+    estimate = TokenCounter()
+    counters = [("len // 4", lambda text: len(text) // 4), ("estimate", estimate._count)]
+    if args.tokenizer:
+        tokenizer = TokenCounter(tokenizer_file=args.tokenizer)
+        if not tokenizer.exact:
+            raise SystemExit(f"Could not load {args.tokenizer} (pip install tokenizers)")
+        counters.append(("tokenizer", tokenizer._count))
+
+    print(f"{len(texts)} messages, {sum(map(len, texts))} characters\n")
+    print(f"{'counter':<12} {'uncached/s':>12} {'cached/s':>12} {'tokens':>8}")
+    for label, count in counters:
+        uncached = _per_second(count, texts)
+        cached_count = lru_cache(maxsize=len(texts))(count)
+        for text in texts:
+            cached_count(text)
+        hits = _per_second(cached_count, texts)
+        total = sum(count(text) for text in texts)
+        print(f"{label:<12} {uncached:>12,.0f} {hits:>12,.0f} {total:>8}")
+
+    memory = ConversationMemory(memory_file="", store=InProcessMemoryStore())
+    for i, text in enumerate(texts[: memory.MAX_MESSAGES]):
+        memory.add_message(1, "user" if i % 2 == 0 else "assistant", text)
+    memory.learned_facts = [{"fact": text} for text in texts[-5:]]
+    rounds = 2000
+    start = time.perf_counter()
+    for _ in range(rounds):
+        memory.get_enhanced_prompt(1, "次の質問です")
+    elapsed = (time.perf_counter() - start) / rounds * 1e6
+    print(f"\nget_enhanced_prompt with full history: {elapsed:.1f} µs per prompt")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark VOICEVOX round trips: per-sentence vs batched synthesis.
+
+Runs against an in-process stub engine that adds a fixed latency per request, so
+no real VOICEVOX is needed.
+
+Usage:
+    python -m benchmarks.voicevox_batch [--sentences 8] [--latency-ms 20]
+"""
+
+import argparse
+import io
+import json
+import threading
+import time
+import wave
+import zipfile
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from bot.audio_cache import AudioCache
+from bot.voicevox_client import VOICEVOXClient
+
+
+def _silent_wav(samples: int = 2400) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(24000)
+        wav.writeframes(b"\x00\x00" * samples)
+    return buffer.getvalue()
+
+
+class StubEngine:
+    """Minimal VOICEVOX lookalike that counts requests per endpoint."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.requests: Counter = Counter()
+        engine = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                path = urlparse(self.path).path
+                engine.requests[path] += 1
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                time.sleep(engine.latency)
+
+                if path == "/audio_query":
+                    self._reply("application/json", json.dumps({"speedScale": 1.0}).encode())
+                elif path == "/synthesis":
+                    self._reply("audio/wav", _silent_wav())
+                elif path == "/multi_synthesis":
+                    archive = io.BytesIO()
+                    with zipfile.ZipFile(archive, "w") as zf:
+                        for i, _ in enumerate(json.loads(body), 1):
+                            zf.writestr(f"{i:03}.wav", _silent_wav())
+                    self._reply("application/zip", archive.getvalue())
+                else:
+                    self.send_error(404)
+
+            def _reply(self, content_type: str, data: bytes):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.host = f"http://127.0.0.1:{self.server.server_port}"
+
+
+def _client(engine: StubEngine) -> VOICEVOXClient:
+    return VOICEVOXClient(host=engine.host, cache=AudioCache(memory_bytes=64 * 1024 * 1024))
+
+
+def _measure(engine: StubEngine, label: str, run):
+    engine.requests.clear()
+    start = time.perf_counter()
+    run()
+    elapsed = (time.perf_counter() - start) * 1000
+    total = sum(engine.requests.values())
+    detail = ", ".join(f"{path} x{count}" for path, count in sorted(engine.requests.items()))
+    print(f"{label:<38} {total:>4} requests {elapsed:>8.1f} ms  ({detail})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sentences", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    engine = StubEngine(args.latency_ms / 1000)
+    texts = [f"これはテスト用の文その{i}なのだ。" for i in range(args.sentences)]
+    print(f"{args.sentences} sentences, {args.latency_ms:.0f} ms per engine request\n")
+
+    client = _client(engine)
+    _measure(engine, "per-sentence synthesize", lambda: [client.synthesize(t) for t in texts])
+
+    client = _client(engine)
+    _measure(engine, "synthesize_batch (cold query cache)", lambda: client.synthesize_batch(texts))
+
+    # Same texts at a new speed: audio cache misses, audio queries are reused
+    _measure(
+        engine,
+        "synthesize_batch (speed change)",
+        lambda: client.synthesize_batch(texts, speed=1.4),
+    )
+    _measure(
+        engine,
+        "per-sentence (speed change)",
+        lambda: [client.synthesize(t, speed=1.6) for t in texts],
+    )
+
+    engine.server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
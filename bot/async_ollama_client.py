@@ -0,0 +1,178 @@
+"""Async Ollama API client with a pooled HTTP session."""
+
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Dict, Optional
+
+import aiohttp
+
+from bot.ollama_client import METRIC_KEYS
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncOllamaClient:
+    """
+    Ollama client for async servers.
+
+    One instance is meant to be shared for the lifetime of the application: the
+    aiohttp session keeps connections to Ollama alive between requests. Responses and
+    error messages match OllamaClient.
+    """
+
+    def __init__(self, host: str, model: str, timeout: int = 180, max_connections: int = 32):
+        """
+        Initialize async Ollama client.
+
+        Args:
+            host: Ollama API host URL
+            model: Model name to use
+            timeout: Request timeout in seconds
+            max_connections: Connection pool size
+        """
+        self.host = host
+        self.model = model
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.url = f"{host}/api/generate"
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def close(self):
+        """Close the HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def generate(
+        self,
+        prompt: str,
+        metrics: Optional[Dict] = None,
+        model: Optional[str] = None,
+        options: Optional[Dict] = None,
+    ) -> str:
+        """
+        Generate response from Ollama.
+
+        Args:
+            prompt: User input prompt
+            metrics: Optional dict filled with the response's counters (see METRIC_KEYS)
+            model: Model to use instead of the client's default
+            options: Ollama generation options (num_predict, num_ctx, ...)
+
+        Returns:
+            Generated response text
+        """
+        full_prompt = Config.get_full_prompt(prompt)
+
+        try:
+            async with self._get_session().post(
+                self.url, json=self._payload(full_prompt, False, model, options)
+            ) as response:
+                response.raise_for_status()
+                data = await response.json(content_type=None)
+                if metrics is not None:
+                    metrics.update({k: data[k] for k in METRIC_KEYS if k in data})
+                return data.get("response", "モデルから応答がありませんでした。")
+
+        except asyncio.TimeoutError:
+            logger.error("Ollama request timed out.")
+            return (
+                "⏳ モデルの応答がタイムアウトしました。サーバーが起動しているか確認してください。"
+            )
+
+        except aiohttp.ClientConnectorError:
+            logger.error(f"Could not connect to Ollama at {self.host}")
+            return f"⚠️ Ollamaサーバーに接続できません ({self.host})"
+
+        except aiohttp.ClientError as e:
+            logger.error(f"Ollama request failed: {e}")
+            return "⚠️ Ollama APIとの通信に失敗しました。"
+
+        except Exception as e:
+            logger.exception(f"Unexpected error in generate: {e}")
+            return "❌ 予期しないエラーが発生しました。"
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        metrics: Optional[Dict] = None,
+        model: Optional[str] = None,
+        options: Optional[Dict] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Generate response from Ollama with streaming.
+
+        Args:
+            prompt: User input prompt
+            metrics: Optional dict filled with the final chunk's counters
+                (eval_count, eval_duration, prompt_eval_count, total_duration)
+            model: Model to use instead of the client's default
+            options: Ollama generation options (num_predict, num_ctx, ...)
+
+        Yields:
+            Response chunks as they arrive
+        """
+        full_prompt = Config.get_full_prompt(prompt)
+
+        try:
+            async with self._get_session().post(
+                self.url, json=self._payload(full_prompt, True, model, options)
+            ) as response:
+                response.raise_for_status()
+                async for line in response.content:
+                    if not line.strip():
+                        continue
+                    try:
+                        data = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if data.get("response"):
+                        yield data["response"]
+                    if data.get("done") and metrics is not None:
+                        metrics.update({k: data[k] for k in METRIC_KEYS if k in data})
+
+        except asyncio.TimeoutError:
+            logger.error("Ollama streaming request timed out.")
+            yield "⏳ モデルの応答がタイムアウトしました。"
+
+        except aiohttp.ClientConnectorError:
+            logger.error(f"Could not connect to Ollama at {self.host}")
+            yield f"⚠️ Ollamaサーバーに接続できません ({self.host})"
+
+        except Exception as e:
+            logger.exception(f"Unexpected error in generate_stream: {e}")
+            yield "❌ 予期しないエラーが発生しました。"
+
+    def _payload(
+        self, prompt: str, stream: bool, model: Optional[str], options: Optional[Dict]
+    ) -> Dict:
+        payload = {"model": model or self.model, "prompt": prompt, "stream": stream}
+        if options:
+            payload["options"] = options
+        return payload
+
+    async def health_check(self) -> bool:
+        """
+        Check if Ollama server is healthy.
+
+        Returns:
+            True if server is healthy, False otherwise
+        """
+        try:
+            async with self._get_session().get(
+                f"{self.host}/api/tags", timeout=aiohttp.ClientTimeout(total=5)
+            ) as response:
+                return response.status == 200
+        except Exception as e:
+            logger.error(f"Health check failed: {e}")
+            return False
@@ -0,0 +1,146 @@
+"""Bounded-memory ingestion of Discord attachments."""
+
+import asyncio
+import binascii
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import aiohttp
+import discord
+
+logger = logging.getLogger(__name__)
+
+
+class AttachmentTooLargeError(Exception):
+    """Raised when an attachment exceeds the configured size limit."""
+
+
+def base64_length(size: int) -> int:
+    """Length of the base64 encoding of `size` bytes."""
+    return 4 * ((size + 2) // 3)
+
+
+class ImageBuffer:
+    """
+    Attachment bytes laid out so they can be base64-encoded in place.
+
+    The buffer is allocated at the size of the base64 output and the raw bytes are
+    written to its tail. Encoding walks front to back and never overtakes unread
+    input, so raw and encoded data share one allocation.
+    """
+
+    ENCODE_CHUNK = 3 * 16384  # Multiple of 3 so only the final chunk is padded
+
+    def __init__(self, size: int):
+        self._buffer = bytearray(base64_length(size))
+        self._offset = len(self._buffer) - size
+        self._capacity = size
+        self._encoded_length = 0
+        self.size = 0
+        self.encoded = False
+
+    def write(self, chunk: bytes):
+        """Append downloaded bytes, refusing to grow past the declared size."""
+        end = self.size + len(chunk)
+        if end > self._capacity:
+            raise AttachmentTooLargeError(f"Attachment exceeds declared size {self._capacity}")
+        start = self._offset + self.size
+        self._buffer[start : start + len(chunk)] = chunk
+        self.size = end
+
+    @property
+    def raw(self) -> memoryview:
+        """Raw image bytes (only valid before encoding)."""
+        if self.encoded:
+            raise ValueError("Buffer has already been base64-encoded")
+        return memoryview(self._buffer)[self._offset : self._offset + self.size]
+
+    def to_base64(self) -> memoryview:
+        """Encode the buffer in place and return the ASCII base64 payload."""
+        if not self.encoded:
+            view = memoryview(self._buffer)
+            out = 0
+            for start in range(0, self.size, self.ENCODE_CHUNK):
+                end = min(start + self.ENCODE_CHUNK, self.size)
+                encoded = binascii.b2a_base64(
+                    view[self._offset + start : self._offset + end], newline=False
+                )
+                view[out : out + len(encoded)] = encoded
+                out += len(encoded)
+            self._encoded_length = out
+            self.encoded = True
+        return memoryview(self._buffer)[: self._encoded_length]
+
+
+class AttachmentLoader:
+    """Stream attachments into capped buffers with a limit on in-flight downloads."""
+
+    def __init__(
+        self,
+        max_bytes: int,
+        max_concurrent: int = 2,
+        chunk_size: int = 64 * 1024,
+        timeout: int = 60,
+    ):
+        """
+        Initialize attachment loader.
+
+        Args:
+            max_bytes: Maximum accepted attachment size
+            max_concurrent: Maximum attachments held in memory at once
+            chunk_size: Download chunk size
+            timeout: Download timeout in seconds
+        """
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def check_size(self, attachment: discord.Attachment):
+        """Reject attachments over the limit before downloading anything."""
+        if attachment.size > self.max_bytes:
+            raise AttachmentTooLargeError(
+                f"{attachment.filename} is {attachment.size} bytes (limit {self.max_bytes})"
+            )
+
+    @asynccontextmanager
+    async def load(self, attachment: discord.Attachment) -> AsyncIterator[ImageBuffer]:
+        """
+        Download an attachment and hold its buffer for the duration of the block.
+
+        The concurrency slot is kept until the block exits, so the cap covers both
+        the download and whatever processing uses the buffer.
+        """
+        self.check_size(attachment)
+
+        async with self._semaphore:
+            yield await self._download(attachment)
+
+    async def _download(self, attachment: discord.Attachment) -> ImageBuffer:
+        session = await self._get_session()
+        async with session.get(attachment.url) as response:
+            response.raise_for_status()
+            if response.content_length and response.content_length > attachment.size:
+                raise AttachmentTooLargeError(
+                    f"{attachment.filename} sent {response.content_length} bytes, "
+                    f"expected {attachment.size}"
+                )
+
+            buffer = ImageBuffer(attachment.size)
+            async for chunk in response.content.iter_chunked(self.chunk_size):
+                buffer.write(chunk)
+
+        logger.debug(f"Downloaded attachment {attachment.filename} ({buffer.size} bytes)")
+        return buffer
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    async def close(self):
+        """Close the underlying HTTP session."""
+        if self._session and not self._session.closed:
+            await self._session.close()
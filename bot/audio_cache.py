@@ -0,0 +1,119 @@
+"""Two-tier cache for synthesized speech audio."""
+
+import hashlib
+import logging
+import os
+from typing import Optional
+
+from utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class AudioCache:
+    """In-memory and on-disk LRU cache of WAV data, both bounded by byte size."""
+
+    def __init__(self, memory_bytes: int, cache_dir: str = "", disk_bytes: int = 0):
+        """
+        Initialize audio cache.
+
+        Args:
+            memory_bytes: Maximum bytes of audio kept in memory
+            cache_dir: Directory for the disk tier (empty = memory only)
+            disk_bytes: Maximum bytes of audio kept on disk
+        """
+        self.memory = LRUCache(max_entries=0, max_bytes=memory_bytes)
+        self.cache_dir = cache_dir
+        # key -> file size; LRU order mirrors file access order
+        self.disk = LRUCache(max_entries=0, max_bytes=disk_bytes, sizeof=lambda size: size)
+        if self.cache_dir:
+            self._load_index()
+
+    @staticmethod
+    def make_key(text: str, speaker_id: int, speed: float) -> str:
+        """Build the cache key for an utterance."""
+        raw = f"{speaker_id}:{speed:.2f}:{text}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Get audio from memory, falling back to disk."""
+        audio = self.memory.get(key)
+        if audio is not None:
+            return audio
+        return self.load(key)
+
+    def get_memory(self, key: str) -> Optional[bytes]:
+        """Get audio from memory only (never blocks on disk)."""
+        return self.memory.get(key)
+
+    def on_disk(self, key: str) -> bool:
+        """Whether the disk tier holds audio for a key."""
+        return bool(self.cache_dir) and key in self.disk
+
+    def load(self, key: str) -> Optional[bytes]:
+        """Read audio from the disk tier and promote it to memory (blocking file I/O)."""
+        if not self.cache_dir or self.disk.get(key) is None:
+            return None
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+            os.utime(path)
+        except OSError as e:
+            logger.warning(f"Failed to read cached audio {key}: {e}")
+            self.disk.pop(key)
+            return None
+
+        self.memory.put(key, audio)
+        return audio
+
+    def put(self, key: str, audio: bytes):
+        """Store audio in both tiers."""
+        self.memory.put(key, audio)
+        if not self.cache_dir:
+            return
+
+        path = self._path(key)
+        temp_path = f"{path}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(audio)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write cached audio {key}: {e}")
+            return
+
+        self._remove_files(self.disk.put(key, len(audio)))
+
+    def get_stats(self) -> dict:
+        """Get cache statistics."""
+        return {"memory": self.memory.get_stats(), "disk": self.disk.get_stats()}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def _remove_files(self, evicted: list):
+        for key, _ in evicted:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def _load_index(self):
+        """Rebuild the disk index from existing files, oldest access first."""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            files = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_file() and entry.name.endswith(".wav"):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+        except OSError as e:
+            logger.error(f"Failed to load audio cache index: {e}")
+            return
+
+        for _, key, size in sorted(files):
+            self._remove_files(self.disk.put(key, size))
+
+        logger.info(f"Loaded {len(self.disk)} cached audio files")
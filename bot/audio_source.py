@@ -0,0 +1,131 @@
+"""In-process audio decoding and playback sources for discord.py."""
+
+import io
+import logging
+import wave
+from typing import List, Tuple
+
+import discord
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; VoiceManager falls back to FFmpeg
+    np = None
+
+logger = logging.getLogger(__name__)
+
+SAMPLING_RATE = discord.opus.Encoder.SAMPLING_RATE  # 48 kHz
+CHANNELS = discord.opus.Encoder.CHANNELS  # Stereo
+FRAME_SIZE = discord.opus.Encoder.FRAME_SIZE  # Bytes of PCM per 20 ms frame
+SAMPLES_PER_FRAME = discord.opus.Encoder.SAMPLES_PER_FRAME
+
+# WAV sample width (bytes) -> numpy dtype
+_SAMPLE_TYPES = {1: "u1", 2: "<i2", 4: "<i4"}
+
+
+def is_available() -> bool:
+    """Whether in-process decoding can be used instead of FFmpeg."""
+    return np is not None
+
+
+def parse_wav(data: bytes) -> Tuple[bytes, int, int, int]:
+    """
+    Parse WAV data.
+
+    Returns:
+        (PCM frames, sample rate, channels, sample width in bytes)
+    """
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        frames = wav.readframes(wav.getnframes())
+        return frames, wav.getframerate(), wav.getnchannels(), wav.getsampwidth()
+
+
+def wav_to_pcm(data: bytes) -> bytes:
+    """
+    Convert WAV data to the 48 kHz stereo 16-bit PCM discord.py expects.
+
+    Resampling uses vectorized linear interpolation, which is plenty for speech.
+    """
+    frames, rate, channels, width = parse_wav(data)
+    if width not in _SAMPLE_TYPES:
+        raise ValueError(f"Unsupported WAV sample width: {width}")
+
+    samples = np.frombuffer(frames, dtype=_SAMPLE_TYPES[width]).astype(np.float32)
+    if width == 1:
+        samples = (samples - 128.0) * 256.0
+    elif width == 4:
+        samples /= 65536.0
+    samples = samples.reshape(-1, channels)
+
+    # Downmix or upmix to stereo
+    if channels == 1:
+        samples = np.repeat(samples, CHANNELS, axis=1)
+    elif channels > CHANNELS:
+        samples = samples[:, :CHANNELS]
+
+    if rate != SAMPLING_RATE and len(samples):
+        out_length = int(round(len(samples) * SAMPLING_RATE / rate))
+        positions = np.arange(out_length, dtype=np.float64) * (rate / SAMPLING_RATE)
+        source_positions = np.arange(len(samples), dtype=np.float64)
+        samples = np.stack(
+            [np.interp(positions, source_positions, samples[:, c]) for c in range(CHANNELS)],
+            axis=1,
+        )
+
+    return np.clip(samples, -32768, 32767).astype("<i2").tobytes()
+
+
+class PCMBufferSource(discord.AudioSource):
+    """Audio source that plays 48 kHz stereo PCM straight from memory."""
+
+    def __init__(self, pcm: bytes):
+        # Pad to a whole number of frames so every read is a full frame
+        remainder = len(pcm) % FRAME_SIZE
+        if remainder:
+            pcm += b"\x00" * (FRAME_SIZE - remainder)
+        self._view = memoryview(pcm)
+        self._position = 0
+
+    def read(self) -> bytes:
+        frame = self._view[self._position : self._position + FRAME_SIZE]
+        self._position += FRAME_SIZE
+        return bytes(frame)
+
+    def is_opus(self) -> bool:
+        return False
+
+
+def encode_opus(pcm: bytes) -> List[bytes]:
+    """
+    Encode 48 kHz stereo PCM into a sequence of 20 ms Opus packets.
+
+    Raises:
+        discord.opus.OpusNotLoaded: If libopus is unavailable
+    """
+    encoder = discord.opus.Encoder()
+    remainder = len(pcm) % FRAME_SIZE
+    if remainder:
+        pcm += b"\x00" * (FRAME_SIZE - remainder)
+    view = memoryview(pcm)
+    return [
+        encoder.encode(bytes(view[start : start + FRAME_SIZE]), SAMPLES_PER_FRAME)
+        for start in range(0, len(pcm), FRAME_SIZE)
+    ]
+
+
+class OpusFrameSource(discord.AudioSource):
+    """Audio source that passes pre-encoded Opus packets straight to discord.py."""
+
+    def __init__(self, frames: List[bytes]):
+        self._frames = frames
+        self._index = 0
+
+    def read(self) -> bytes:
+        if self._index >= len(self._frames):
+            return b""
+        frame = self._frames[self._index]
+        self._index += 1
+        return frame
+
+    def is_opus(self) -> bool:
+        return True
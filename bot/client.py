@@ -1,15 +1,24 @@
 """Discord bot client."""
 
+import asyncio
 import logging
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import AsyncIterator, Dict, Optional, Tuple, Union
 
 import discord
 from discord.ext import commands
 
+from bot.attachments import AttachmentLoader
 from bot.export_manager import ExportManager
 from bot.memory import ConversationMemory
 from bot.model_manager import ModelManager
 from bot.ollama_client import OllamaClient
+from bot.overload import GenerationPlan, create_overload_controller
+from bot.quota import QuotaExceededError, QuotaManager, create_quota_manager
+from bot.router import create_model_router
 from bot.stats_tracker import StatsTracker
+from bot.templates import get_profile
 from bot.vision import VisionClient
 from bot.voice_manager import VoiceManager
 from config import Config
@@ -48,17 +57,121 @@ class OllamaBot(commands.Bot):
         self.vision = VisionClient(host=Config.OLLAMA_HOST, timeout=Config.REQUEST_TIMEOUT)
         logger.info("👁️ Vision client initialized")
 
+        self.attachments = AttachmentLoader(
+            max_bytes=Config.MAX_ATTACHMENT_SIZE_MB * 1024 * 1024,
+            max_concurrent=Config.MAX_CONCURRENT_ATTACHMENTS,
+        )
+
         self.voice_manager = VoiceManager()
         logger.info("🎤 Voice manager initialized")
 
+        self.quota = create_quota_manager()
+        logger.info("🪙 Quota manager initialized")
+
+        self.overload = create_overload_controller()
+        self.router = create_model_router()
+
         # Per-user template selection
         self.user_templates = {}
 
+    @asynccontextmanager
+    async def metered(
+        self, source: Union[discord.Interaction, discord.Message]
+    ) -> AsyncIterator[Optional[Dict]]:
+        """
+        Charge a generation request to its author's quotas.
+
+        Reserves tokens in the user, guild and global buckets (refusing with the wait
+        time when one is empty) and defers interactions. The block gets None when the
+        request was refused or the interaction expired, and should then return;
+        otherwise it gets a metrics dict whose eval_count settles the reservation when
+        the block exits.
+
+        Args:
+            source: The slash command interaction or the message mentioning the bot
+        """
+        interaction = isinstance(source, discord.Interaction)
+        user = source.user if interaction else source.author
+        guild_id = source.guild.id if source.guild else None
+
+        try:
+            reservation = self.quota.reserve(QuotaManager.discord_scopes(user.id, guild_id))
+        except QuotaExceededError as e:
+            if interaction:
+                await source.response.send_message(e.message, ephemeral=True)
+            else:
+                await source.reply(e.message, mention_author=True)
+            yield None
+            return
+
+        metrics: Dict = {}
+        try:
+            if interaction:
+                try:
+                    await source.response.defer(ephemeral=False)
+                except discord.errors.NotFound:
+                    logger.error("Interaction expired before defer")
+                    yield None
+                    return
+            yield metrics
+        finally:
+            reservation.settle(metrics.get("eval_count", 0))
+
+    async def generate_reply(
+        self,
+        prompt: str,
+        text: str,
+        metrics: Dict,
+        template: Optional[str] = None,
+        depth: int = 0,
+    ) -> Tuple[str, GenerationPlan]:
+        """
+        Generate a reply for the current load.
+
+        While Ollama is overloaded the request is degraded to a cheaper tier (or
+        answered with a canned reply); otherwise it goes to the template's model if one
+        is configured, or to the small model first when the input looks simple.
+
+        Args:
+            prompt: Full prompt sent to Ollama
+            text: The user's raw input
+            metrics: Dict filled with Ollama's counters
+            template: Template the prompt was rendered with, if any
+            depth: Number of stored messages in the conversation
+
+        Returns:
+            The reply and the plan it was generated under (append plan.notice to it)
+        """
+        profile = get_profile(template) if template else None
+        with self.overload.admit(text) as plan:
+            model, options = plan.model, plan.options
+            if profile is not None:
+                # The template's output and context budget applies at every tier
+                model = plan.model or profile.model or None
+                options = profile.options(text, plan.options)
+            reply = plan.canned or await self.router.generate(
+                partial(asyncio.to_thread, self.ollama.generate, prompt),
+                metrics,
+                text,
+                template=template,
+                depth=depth,
+                model=model,
+                options=options,
+            )
+        return reply, plan
+
     async def setup_hook(self):
         """Setup hook called when bot is ready."""
         await self.tree.sync()
         logger.info("Command tree synced")
 
+    async def close(self):
+        """Release shared resources before shutting down."""
+        await self.attachments.close()
+        self.quota.close()
+        self.vision.close()
+        await super().close()
+
     async def on_ready(self):
         """Called when bot successfully connects to Discord."""
         logger.info(f"✅ Logged in as {self.user}")
@@ -80,5 +193,7 @@ class OllamaBot(commands.Bot):
 
         if self.voice_manager.voicevox.is_available():
             logger.info("🎤 VOICEVOX is available")
+            warmed = await asyncio.to_thread(self.voice_manager.prewarm)
+            logger.info(f"🎤 Prewarmed {warmed} fixed phrases into the TTS cache")
         else:
             logger.warning("⚠️ VOICEVOX not found. Voice features will be unavailable.")
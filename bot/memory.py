@@ -1,10 +1,15 @@
 """Memory and learning system for the bot."""
 
+import asyncio
 import json
 import logging
 import os
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from bot.memory_store import create_memory_store
+from bot.tokens import get_token_counter
+from config import Config
 
 logger = logging.getLogger(__name__)
 
@@ -12,9 +17,18 @@ logger = logging.getLogger(__name__)
 class ConversationMemory:
     """Manages conversation history and learning from interactions."""
 
-    def __init__(self, memory_file: str = "bot_memory.json"):
+    MAX_MESSAGES = 10
+
+    def __init__(self, memory_file: str = "bot_memory.json", store=None):
+        """
+        Initialize memory.
+
+        Args:
+            memory_file: JSON file for learned facts
+            store: Conversation store (defaults to the one selected by MEMORY_DB_PATH)
+        """
         self.memory_file = memory_file
-        self.conversations: Dict[int, List[Dict]] = {}  # user_id -> messages
+        self.store = store if store is not None else create_memory_store()  # user key -> messages
         self.learned_facts: List[Dict] = []  # Things learned from all users
         self.load_memory()
 
@@ -39,27 +53,77 @@ class ConversationMemory:
         except Exception as e:
             logger.error(f"Failed to save memory: {e}")
 
-    def add_message(self, user_id: int, role: str, content: str):
-        """Add a message to conversation history."""
-        if user_id not in self.conversations:
-            self.conversations[user_id] = []
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        """
+        Call a memory method from the event loop.
 
-        self.conversations[user_id].append(
-            {"role": role, "content": content, "timestamp": datetime.now().isoformat()}
-        )
+        The shared SQLite store may wait on another process's writes, so with it the
+        call runs on a worker thread.
+        """
+        if self.store.BLOCKING:
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+
+    async def build_prompt(self, user_id: Union[int, str], question: str) -> Tuple[str, int]:
+        """
+        Build the enhanced prompt for a question from the event loop.
+
+        Returns:
+            (prompt, stored messages in the user's conversation for routing)
+        """
+
+        def read() -> Tuple[str, int]:
+            return self.get_enhanced_prompt(user_id, question), len(self.get_context(user_id))
+
+        return await self.run(read)
+
+    async def record_exchange(self, user_id: Union[int, str], question: str, reply: str):
+        """Add a question and its reply to the history from the event loop."""
+
+        def write():
+            self.add_message(user_id, "user", question)
+            self.add_message(user_id, "assistant", reply)
+
+        await self.run(write)
 
+    @staticmethod
+    def minecraft_key(player: str) -> str:
+        """Memory key for a Minecraft player (Discord users are keyed by user ID)."""
+        return f"minecraft:{player}"
+
+    def _key(self, user_id: Union[int, str]) -> str:
+        return self.store.resolve(str(user_id))
+
+    def add_message(self, user_id: Union[int, str], role: str, content: str):
+        """Add a message to conversation history."""
         # Keep only last 10 messages per user
-        if len(self.conversations[user_id]) > 10:
-            self.conversations[user_id] = self.conversations[user_id][-10:]
+        self.store.append(
+            self._key(user_id),
+            {"role": role, "content": content, "timestamp": datetime.now().isoformat()},
+            self.MAX_MESSAGES,
+        )
 
-    def get_context(self, user_id: int) -> List[Dict]:
+    def get_context(self, user_id: Union[int, str]) -> List[Dict]:
         """Get conversation context for a user."""
-        return self.conversations.get(user_id, [])
+        return self.store.get(self._key(user_id))
 
-    def clear_context(self, user_id: int):
+    def clear_context(self, user_id: Union[int, str]):
         """Clear conversation history for a user."""
-        if user_id in self.conversations:
-            del self.conversations[user_id]
+        self.store.clear(self._key(user_id))
+
+    def link_identity(self, alias: str, user_id: Union[int, str]):
+        """
+        Share one conversation history between two identities.
+
+        Args:
+            alias: Key that should follow another identity (e.g. minecraft_key(player))
+            user_id: Identity whose history the alias uses (e.g. a Discord user ID)
+        """
+        self.store.link(alias, str(user_id))
+
+    def unlink_identity(self, alias: str):
+        """Give a linked alias its own history again."""
+        self.store.unlink(alias)
 
     def learn_fact(self, fact: str, source: str = "user"):
         """Learn a new fact from conversations."""
@@ -77,27 +141,75 @@ class ConversationMemory:
         """Get recent learned facts."""
         return [f["fact"] for f in self.learned_facts[-limit:]]
 
-    def get_enhanced_prompt(self, user_id: int, question: str) -> str:
-        """Get enhanced prompt with context and learned facts."""
-        parts = []
+    def get_enhanced_prompt(
+        self, user_id: Union[int, str], question: str, budget: Optional[int] = None
+    ) -> str:
+        """
+        Get enhanced prompt with context and learned facts, within a token budget.
+
+        The question always goes in (cut only if it alone exceeds the budget). Then, while
+        they fit: the latest exchange, learned facts, and the older history, newest first.
+        Each history message is cut to PROMPT_MESSAGE_TOKENS.
+
+        Args:
+            user_id: Conversation to use
+            question: The user's input
+            budget: Tokens for the whole prompt including the system prompt
+                (defaults to PROMPT_TOKEN_BUDGET)
+
+        Returns:
+            Prompt text
+        """
+        counter = get_token_counter()
+        budget = budget or Config.PROMPT_TOKEN_BUDGET
+        # One extra token per line for the newline
+        remaining = budget - counter.count(Config.get_full_prompt("")) - 1
+
+        question_line = f"新しい質問: {question}"
+        if counter.count(question_line) + 1 > remaining:
+            question_line = counter.truncate(question_line, max(remaining - 1, 1))
+        remaining -= counter.count(question_line) + 1
+
+        facts = [f"- {fact}" for fact in self.get_learned_facts(3)]
+        history = [
+            f"{'あなた' if msg['role'] == 'assistant' else 'ユーザー'}: "
+            f"{counter.truncate(msg['content'], Config.PROMPT_MESSAGE_TOKENS)}"
+            for msg in self.get_context(user_id)[-3:]  # Last 3 messages
+        ]
+        sections = {
+            "facts": ("これまでの会話で学んだこと:", facts, set()),
+            "history": ("最近の会話履歴:", history, set()),
+        }
+
+        # Candidates by priority: latest exchange, facts, older history (newest first)
+        candidates = [("history", i) for i in range(len(history) - 1, len(history) - 3, -1)]
+        candidates += [("facts", i) for i in reversed(range(len(facts)))]
+        candidates += [("history", i) for i in range(len(history) - 3, -1, -1)]
+        history_full = False
+        for section, index in candidates:
+            if index < 0 or (section == "history" and history_full):
+                continue
+            header, lines, chosen = sections[section]
+            overhead = 1 if chosen else counter.count(header) + 3  # Header and blank line
+            cost = counter.count(lines[index]) + overhead
+            if cost > remaining and section == "history":
+                # Keep the history contiguous: cut this message and skip older ones
+                history_full = True
+                if remaining - overhead < 16:
+                    continue
+                lines[index] = counter.truncate(lines[index], remaining - overhead)
+                cost = counter.count(lines[index]) + overhead
+            if cost <= remaining:
+                chosen.add(index)
+                remaining -= cost
 
-        # Add learned facts
-        if self.learned_facts:
-            recent_facts = self.get_learned_facts(3)
-            parts.append("これまでの会話で学んだこと:")
-            parts.extend(f"- {fact}" for fact in recent_facts)
-            parts.append("")
-
-        # Add conversation history
-        context = self.get_context(user_id)
-        if context:
-            parts.append("最近の会話履歴:")
-            for msg in context[-3:]:  # Last 3 messages
-                role = "あなた" if msg["role"] == "assistant" else "ユーザー"
-                parts.append(f"{role}: {msg['content'][:100]}")
-            parts.append("")
-
-        parts.append(f"新しい質問: {question}")
+        parts = []
+        for header, lines, chosen in sections.values():
+            if chosen:
+                parts.append(header)
+                parts.extend(lines[i] for i in sorted(chosen))
+                parts.append("")
+        parts.append(question_line)
 
         return "\n".join(parts)
 
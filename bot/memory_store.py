@@ -0,0 +1,168 @@
+"""Storage backends for per-user conversation history."""
+
+import logging
+import sqlite3
+import threading
+from typing import Dict, List
+
+from config import Config
+from utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class InProcessMemoryStore:
+    """Conversation history held in this process, evicting the least recently active users."""
+
+    # Calls never wait on I/O, so they can run on the event loop
+    BLOCKING = False
+
+    def __init__(self, max_keys: int = 1000):
+        """
+        Initialize store.
+
+        Args:
+            max_keys: Maximum number of users (and identity links) kept (0 = unlimited)
+        """
+        self.conversations = LRUCache(max_entries=max_keys)
+        self.links = LRUCache(max_entries=max_keys)
+
+    def __len__(self) -> int:
+        return len(self.conversations)
+
+    def append(self, key: str, message: Dict, max_messages: int):
+        """Add a message, keeping only the last max_messages for the key."""
+        messages = self.conversations.get(key) or []
+        messages.append(message)
+        self.conversations.put(key, messages[-max_messages:])
+
+    def get(self, key: str) -> List[Dict]:
+        return list(self.conversations.get(key) or [])
+
+    def clear(self, key: str):
+        self.conversations.pop(key)
+
+    def link(self, alias: str, canonical: str):
+        self.links.put(alias, canonical)
+
+    def unlink(self, alias: str):
+        self.links.pop(alias)
+
+    def resolve(self, key: str) -> str:
+        """Map a linked alias to the identity whose history it shares."""
+        return self.links.get(key, key)
+
+    def close(self):
+        pass
+
+
+class SQLiteMemoryStore:
+    """
+    Conversation history in a local SQLite file.
+
+    Several processes (the Discord bot and the bridge API) can open the same file and
+    see each other's history and identity links. Each user keeps at most
+    max_messages rows, and users beyond max_keys are pruned by last activity.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            key TEXT NOT NULL,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            timestamp TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS messages_key ON messages (key, id);
+        CREATE TABLE IF NOT EXISTS links (
+            alias TEXT PRIMARY KEY,
+            canonical TEXT NOT NULL
+        );
+    """
+
+    # Calls can wait up to the busy timeout on another process's lock; async callers
+    # should run them in a thread
+    BLOCKING = True
+
+    # Prune idle users every this many appends
+    PRUNE_INTERVAL = 64
+
+    def __init__(self, path: str, max_keys: int = 1000):
+        """
+        Initialize store.
+
+        Args:
+            path: SQLite database file
+            max_keys: Maximum number of users kept (0 = unlimited)
+        """
+        self.path = path
+        self.max_keys = max_keys
+        self._appends = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(self._SCHEMA)
+        logger.info(f"Using shared memory store: {path}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(DISTINCT key) FROM messages").fetchone()[0]
+
+    def append(self, key: str, message: Dict, max_messages: int):
+        """Add a message, keeping only the last max_messages for the key."""
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO messages (key, role, content, timestamp) VALUES (?, ?, ?, ?)",
+                (key, message["role"], message["content"], message["timestamp"]),
+            )
+            self._db.execute(
+                "DELETE FROM messages WHERE key = ? AND id NOT IN "
+                "(SELECT id FROM messages WHERE key = ? ORDER BY id DESC LIMIT ?)",
+                (key, key, max_messages),
+            )
+            self._appends += 1
+            if self.max_keys and self._appends % self.PRUNE_INTERVAL == 0:
+                self._db.execute(
+                    "DELETE FROM messages WHERE key IN (SELECT key FROM messages "
+                    "GROUP BY key ORDER BY MAX(id) DESC LIMIT -1 OFFSET ?)",
+                    (self.max_keys,),
+                )
+
+    def get(self, key: str) -> List[Dict]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT role, content, timestamp FROM messages WHERE key = ? ORDER BY id",
+                (key,),
+            ).fetchall()
+        return [{"role": role, "content": content, "timestamp": ts} for role, content, ts in rows]
+
+    def clear(self, key: str):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM messages WHERE key = ?", (key,))
+
+    def link(self, alias: str, canonical: str):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO links (alias, canonical) VALUES (?, ?)", (alias, canonical)
+            )
+
+    def unlink(self, alias: str):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM links WHERE alias = ?", (alias,))
+
+    def resolve(self, key: str) -> str:
+        """Map a linked alias to the identity whose history it shares."""
+        with self._lock:
+            row = self._db.execute("SELECT canonical FROM links WHERE alias = ?", (key,)).fetchone()
+        return row[0] if row else key
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def create_memory_store():
+    """Create the store selected by MEMORY_DB_PATH (empty = in-process only)."""
+    if Config.MEMORY_DB_PATH:
+        return SQLiteMemoryStore(Config.MEMORY_DB_PATH, max_keys=Config.MEMORY_MAX_USERS)
+    return InProcessMemoryStore(max_keys=Config.MEMORY_MAX_USERS)
@@ -1,6 +1,7 @@
 """Ollama API client."""
 
 import logging
+from typing import Dict, Optional
 
 import requests
 
@@ -8,6 +9,9 @@ from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Counters copied from Ollama's final response into a caller's metrics dict
+METRIC_KEYS = ("eval_count", "eval_duration", "prompt_eval_count", "total_duration")
+
 
 class OllamaClient:
     """Client for interacting with Ollama API."""
@@ -26,12 +30,21 @@ class OllamaClient:
         self.timeout = timeout
         self.url = f"{host}/api/generate"
 
-    def generate(self, prompt: str) -> str:
+    def generate(
+        self,
+        prompt: str,
+        metrics: Optional[Dict] = None,
+        model: Optional[str] = None,
+        options: Optional[Dict] = None,
+    ) -> str:
         """
         Generate response from Ollama.
 
         Args:
             prompt: User input prompt
+            metrics: Optional dict filled with the response's counters (see METRIC_KEYS)
+            model: Model to use instead of the client's default
+            options: Ollama generation options (num_predict, num_ctx, ...)
 
         Returns:
             Generated response text
@@ -41,11 +54,14 @@ class OllamaClient:
         try:
             response = requests.post(
                 self.url,
-                json={"model": self.model, "prompt": full_prompt, "stream": False},
+                json=self._payload(full_prompt, False, model, options),
                 timeout=self.timeout,
             )
             response.raise_for_status()
-            return response.json().get("response", "モデルから応答がありませんでした。")
+            data = response.json()
+            if metrics is not None:
+                metrics.update({k: data[k] for k in METRIC_KEYS if k in data})
+            return data.get("response", "モデルから応答がありませんでした。")
 
         except requests.exceptions.Timeout:
             logger.error("Ollama request timed out.")
@@ -65,6 +81,14 @@ class OllamaClient:
             logger.exception(f"Unexpected error in generate: {e}")
             return "❌ 予期しないエラーが発生しました。"
 
+    def _payload(
+        self, prompt: str, stream: bool, model: Optional[str], options: Optional[Dict]
+    ) -> Dict:
+        payload = {"model": model or self.model, "prompt": prompt, "stream": stream}
+        if options:
+            payload["options"] = options
+        return payload
+
     def health_check(self) -> bool:
         """
         Check if Ollama server is healthy.
@@ -79,12 +103,21 @@ class OllamaClient:
             logger.error(f"Health check failed: {e}")
             return False
 
-    def generate_stream(self, prompt: str):
+    def generate_stream(
+        self,
+        prompt: str,
+        metrics: Optional[Dict] = None,
+        model: Optional[str] = None,
+        options: Optional[Dict] = None,
+    ):
         """
         Generate response from Ollama with streaming.
 
         Args:
             prompt: User input prompt
+            metrics: Optional dict filled with the final chunk's counters (see METRIC_KEYS)
+            model: Model to use instead of the client's default
+            options: Ollama generation options (num_predict, num_ctx, ...)
 
         Yields:
             Response chunks as they arrive
@@ -96,7 +129,7 @@ class OllamaClient:
         try:
             response = requests.post(
                 self.url,
-                json={"model": self.model, "prompt": full_prompt, "stream": True},
+                json=self._payload(full_prompt, True, model, options),
                 timeout=self.timeout,
                 stream=True,
             )
@@ -108,6 +141,8 @@ class OllamaClient:
                         data = json.loads(line)
                         if "response" in data:
                             yield data["response"]
+                        if data.get("done") and metrics is not None:
+                            metrics.update({k: data[k] for k in METRIC_KEYS if k in data})
                     except json.JSONDecodeError:
                         continue
 
@@ -0,0 +1,229 @@
+"""Load-adaptive degradation of generation requests."""
+
+import logging
+import re
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Replies for greetings and thanks when the controller is at its last tier
+CANNED_REPLIES = {
+    "こんにちは": "こんにちは！😊 いま混み合っているので、短いお返事で失礼します。",
+    "こんばんは": "こんばんは！🌙 いま混み合っているので、短いお返事で失礼します。",
+    "おはよう": "おはようございます！☀️ いま混み合っているので、短いお返事で失礼します。",
+    "おはようございます": "おはようございます！☀️ いま混み合っているので、短いお返事で失礼します。",
+    "おやすみ": "おやすみなさい！🌙",
+    "おやすみなさい": "おやすみなさい！🌙",
+    "ありがとう": "どういたしまして！😊",
+    "ありがとうございます": "どういたしまして！😊",
+    "よろしく": "こちらこそよろしくお願いします！",
+    "よろしくお願いします": "こちらこそよろしくお願いします！",
+    "やあ": "やあ！😊 いま混み合っているので、短いお返事で失礼します。",
+    "hi": "Hi! 😊",
+    "hello": "Hello! 😊",
+    "thanks": "You're welcome! 😊",
+}
+
+_TRIVIAL_STRIP = re.compile(r"[\s!?！？。、.,〜~…笑]+")
+
+_TIER_NOTICES = {
+    "short": "回答を短くしています",
+    "compact": "回答と参照する文脈を短くしています",
+    "fallback": "軽量モデルで回答しています",
+    "canned": "定型文で回答しています",
+}
+
+
+class GenerationPlan:
+    """How one request is served under the current load."""
+
+    def __init__(
+        self,
+        tier: str,
+        model: Optional[str] = None,
+        options: Optional[Dict] = None,
+        canned: Optional[str] = None,
+    ):
+        self.tier = tier
+        self.model = model
+        self.options = options or {}
+        self.canned = canned
+
+    @property
+    def degraded(self) -> bool:
+        return self.tier != "full"
+
+    @property
+    def notice(self) -> str:
+        """Discord subtext telling the user the reply was degraded ("" at full tier)."""
+        if not self.degraded:
+            return ""
+        return f"\n-# ⚡ 混雑中のため{_TIER_NOTICES.get(self.tier, self.tier)}"
+
+
+class OverloadController:
+    """
+    Steps generation down to cheaper tiers while Ollama is overloaded.
+
+    Load is the number of admitted requests still running (queued or generating) and
+    the p95 latency of recently finished ones. Tiers, cheapest last:
+
+    - full: requests as they are
+    - short: num_predict capped
+    - compact: num_ctx reduced as well
+    - fallback: the fallback model (skipped when none is configured)
+    - canned: greetings and thanks answered from CANNED_REPLIES without Ollama;
+      anything else is served like the tier before
+
+    The controller climbs one tier per step interval while overloaded and drops one
+    tier per cooldown once load is well below the thresholds, so it does not flap.
+    """
+
+    def __init__(
+        self,
+        slo_ms: float = 20000,
+        queue_depth: int = 4,
+        num_predict: int = 256,
+        num_ctx: int = 2048,
+        fallback_model: str = "",
+        window: float = 60.0,
+        step_interval: float = 2.0,
+        cooldown: float = 10.0,
+    ):
+        """
+        Initialize controller.
+
+        Args:
+            slo_ms: Target p95 latency in milliseconds (0 = ignore latency)
+            queue_depth: Requests in flight above which load counts as too high (0 = ignore)
+            num_predict: Output token cap from the "short" tier on
+            num_ctx: Context window from the "compact" tier on
+            fallback_model: Smaller model for the "fallback" tier (empty = no such tier)
+            window: Seconds of finished requests used for the latency percentile
+            step_interval: Minimum seconds between escalations
+            cooldown: Seconds to stay at a tier before stepping back down
+        """
+        self.slo = slo_ms / 1000
+        self.queue_depth = queue_depth
+        self.window = window
+        self.step_interval = step_interval
+        self.cooldown = cooldown
+
+        short = {"num_predict": num_predict}
+        compact = {**short, "num_ctx": num_ctx}
+        self.tiers: List[Tuple[str, Optional[str], Dict]] = [
+            ("full", None, {}),
+            ("short", None, short),
+            ("compact", None, compact),
+        ]
+        if fallback_model:
+            self.tiers.append(("fallback", fallback_model, compact))
+        self.tiers.append(("canned", *self.tiers[-1][1:]))
+
+        self.level = 0
+        self.in_flight = 0
+        self.served: Counter = Counter()
+        self._latencies: Deque[Tuple[float, float]] = deque()  # (finished, seconds)
+        self._last_change = time.monotonic()
+
+    @property
+    def tier(self) -> str:
+        return self.tiers[self.level][0]
+
+    @contextmanager
+    def admit(self, text: str) -> Iterator[GenerationPlan]:
+        """
+        Plan a request for the current load and track it until the block exits.
+
+        Args:
+            text: The user's raw input (used to spot trivial messages)
+
+        Yields:
+            The plan: use plan.canned as the reply if set, otherwise generate with
+            plan.model and plan.options
+        """
+        self._evaluate()
+        plan = self._plan(text)
+        self.in_flight += 1
+        started = time.monotonic()
+        try:
+            yield plan
+        finally:
+            finished = time.monotonic()
+            self.in_flight -= 1
+            self.served[plan.tier] += 1
+            if plan.canned is None:
+                self._latencies.append((finished, finished - started))
+            if plan.degraded:
+                logger.info(f"Served with {plan.tier} tier in {(finished - started) * 1000:.0f} ms")
+            self._evaluate()
+
+    def _plan(self, text: str) -> GenerationPlan:
+        name, model, options = self.tiers[self.level]
+        if name == "canned":
+            reply = CANNED_REPLIES.get(_TRIVIAL_STRIP.sub("", text).lower())
+            if reply is not None:
+                return GenerationPlan(name, canned=reply)
+            name = self.tiers[self.level - 1][0]
+        return GenerationPlan(name, model, dict(options))
+
+    def p95(self) -> Optional[float]:
+        """p95 latency in seconds over the window, or None with too few samples."""
+        cutoff = time.monotonic() - self.window
+        while self._latencies and self._latencies[0][0] < cutoff:
+            self._latencies.popleft()
+        if len(self._latencies) < 5:
+            return None
+        latencies = sorted(seconds for _, seconds in self._latencies)
+        return latencies[int(0.95 * (len(latencies) - 1))]
+
+    def _evaluate(self):
+        now = time.monotonic()
+        since_change = now - self._last_change
+        p95 = self.p95()
+        deep = bool(self.queue_depth) and self.in_flight > self.queue_depth
+        slow = bool(self.slo) and p95 is not None and p95 > self.slo
+        calm = (not self.queue_depth or self.in_flight <= self.queue_depth // 2) and (
+            not self.slo or p95 is None or p95 < 0.7 * self.slo
+        )
+
+        if (deep or slow) and self.level < len(self.tiers) - 1:
+            if since_change >= self.step_interval:
+                self.level += 1
+                self._last_change = now
+                logger.warning(
+                    f"Overloaded ({self.in_flight} in flight, p95 "
+                    f"{p95 * 1000 if p95 else 0:.0f} ms): degrading to {self.tier}"
+                )
+        elif calm and self.level > 0 and since_change >= self.cooldown:
+            self.level -= 1
+            self._last_change = now
+            logger.info(f"Load dropped: restoring {self.tier} tier")
+
+    def get_stats(self) -> Dict:
+        p95 = self.p95()
+        return {
+            "tier": self.tier,
+            "in_flight": self.in_flight,
+            "p95_ms": round(p95 * 1000) if p95 is not None else None,
+            "served": dict(self.served),
+        }
+
+
+def create_overload_controller() -> OverloadController:
+    """Create the controller configured by the OVERLOAD_* settings."""
+    return OverloadController(
+        slo_ms=Config.OVERLOAD_SLO_MS,
+        queue_depth=Config.OVERLOAD_QUEUE_DEPTH,
+        num_predict=Config.OVERLOAD_NUM_PREDICT,
+        num_ctx=Config.OVERLOAD_NUM_CTX,
+        fallback_model=Config.OVERLOAD_FALLBACK_MODEL,
+        window=Config.OVERLOAD_WINDOW,
+        step_interval=Config.OVERLOAD_STEP_INTERVAL,
+        cooldown=Config.OVERLOAD_COOLDOWN,
+    )
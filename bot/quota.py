@@ -0,0 +1,304 @@
+"""Hierarchical token-bucket quotas charged with the tokens Ollama generates."""
+
+import logging
+import math
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+from utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+_LEVEL_NAMES = {"user": "あなた", "guild": "このサーバー", "global": "Bot全体"}
+
+Scope = Tuple[str, str]  # (level, bucket key)
+
+
+class QuotaExceededError(Exception):
+    """Raised when a request is refused because one of its quota buckets is empty."""
+
+    def __init__(self, level: str, retry_after: float):
+        self.level = level
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(f"{level} quota exhausted, retry in {self.retry_after}s")
+
+    @property
+    def message(self) -> str:
+        """User-facing explanation."""
+        name = _LEVEL_NAMES.get(self.level, self.level)
+        return (
+            f"⏳ {name}の利用上限に達しました。約{self.retry_after}秒後にもう一度お試しください。"
+        )
+
+
+class _Bucket:
+    __slots__ = ("level", "tokens", "updated", "pending")
+
+    def __init__(self, level: str, tokens: float, updated: float):
+        self.level = level
+        self.tokens = tokens
+        self.updated = updated
+        self.pending = 0.0  # Charged since the last flush
+
+
+class Reservation:
+    """Tokens held for an admitted request until its real cost is known."""
+
+    def __init__(self, manager: "QuotaManager", scopes: List[Scope], tokens: int):
+        self.manager = manager
+        self.scopes = scopes
+        self.tokens = tokens
+        self.settled = False
+
+    def settle(self, eval_count: int):
+        """
+        Replace the held tokens with the tokens actually generated.
+
+        Args:
+            eval_count: Ollama's eval_count for the request (0 if nothing was generated)
+        """
+        if self.settled:
+            return
+        self.settled = True
+        self.manager._charge(self.scopes, eval_count - self.tokens)
+
+
+class QuotaManager:
+    """
+    Token buckets per user, guild and globally, refilled continuously.
+
+    Admission happens in memory: a request is let in while every bucket in its scope
+    still has tokens, and holds a small reservation so concurrent requests cannot all
+    slip through. Once generation ends the reservation is settled with Ollama's
+    eval_count, which may push a bucket into debt that refilling pays back.
+
+    With a database path, a background thread writes charges behind in batches as
+    atomic updates, so bucket state survives restarts and processes sharing the file
+    (the bot and the bridge API) draw from the same global bucket. Admission and
+    settlement never wait on the database's write lock.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS buckets (
+            key TEXT PRIMARY KEY,
+            tokens REAL NOT NULL,
+            updated REAL NOT NULL
+        );
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, Tuple[float, float]],
+        reserve_tokens: int = 256,
+        path: str = "",
+        flush_interval: float = 5.0,
+        max_buckets: int = 10000,
+    ):
+        """
+        Initialize quota manager.
+
+        Args:
+            limits: Level -> (capacity, tokens per hour); missing or 0 means unlimited
+            reserve_tokens: Tokens held per admitted request until it is settled
+            path: SQLite file for bucket state (empty = memory only)
+            flush_interval: Seconds between writes of accumulated charges
+            max_buckets: Maximum number of buckets kept in memory
+        """
+        self.limits = {
+            level: (capacity, per_hour / 3600)
+            for level, (capacity, per_hour) in limits.items()
+            if capacity > 0 and per_hour > 0
+        }
+        self.reserve_tokens = reserve_tokens
+        self.path = path
+        self.flush_interval = flush_interval
+        self._buckets = LRUCache(max_entries=max_buckets)
+        self._orphans: List[Tuple[str, _Bucket]] = []  # Evicted with unflushed charges
+        self._lock = threading.Lock()
+
+        self.admitted = 0
+        self.throttled = 0
+        self.charged_tokens = 0
+
+        # Writes happen on the flusher thread; bucket loads read through their own
+        # connection, which WAL never blocks behind a writer
+        self._db: Optional[sqlite3.Connection] = None
+        self._reader: Optional[sqlite3.Connection] = None
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if path:
+            self._db = sqlite3.connect(path, timeout=5, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(self._SCHEMA)
+            self._reader = sqlite3.connect(path, timeout=5, check_same_thread=False)
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="quota-flush", daemon=True
+            )
+            self._flusher.start()
+            logger.info(f"Persisting quota buckets to {path}")
+
+    @staticmethod
+    def discord_scopes(user_id: int, guild_id: Optional[int] = None) -> List[Scope]:
+        """Scopes for a Discord request (direct messages have no guild level)."""
+        scopes = [("user", f"user:{user_id}")]
+        if guild_id is not None:
+            scopes.append(("guild", f"guild:{guild_id}"))
+        scopes.append(("global", "global"))
+        return scopes
+
+    @staticmethod
+    def minecraft_scopes(player: str) -> List[Scope]:
+        """Scopes for a bridge request: the player, all Minecraft servers, then global."""
+        return [("user", f"minecraft:{player}"), ("guild", "minecraft"), ("global", "global")]
+
+    def check(self, scopes: List[Scope]):
+        """
+        Refuse a request early without reserving anything (reserve() still decides).
+
+        Raises:
+            QuotaExceededError: If any bucket in the scope is empty
+        """
+        with self._lock:
+            self._check([scope for scope in scopes if scope[0] in self.limits], time.time())
+
+    def reserve(self, scopes: List[Scope]) -> Reservation:
+        """
+        Admit a request and hold reserve_tokens in each of its buckets.
+
+        Raises:
+            QuotaExceededError: If any bucket in the scope is empty
+        """
+        scopes = [scope for scope in scopes if scope[0] in self.limits]
+        now = time.time()
+        with self._lock:
+            self._check(scopes, now)
+            self._apply(scopes, self.reserve_tokens, now)
+            self.admitted += 1
+        return Reservation(self, scopes, self.reserve_tokens)
+
+    def _check(self, scopes: List[Scope], now: float):
+        for level, key in scopes:
+            bucket = self._bucket(level, key, now)
+            if bucket.tokens <= 0:
+                self.throttled += 1
+                raise QuotaExceededError(level, -bucket.tokens / self.limits[level][1])
+
+    def _charge(self, scopes: List[Scope], tokens: int):
+        with self._lock:
+            self._apply(scopes, tokens, time.time())
+
+    def _apply(self, scopes: List[Scope], tokens: int, now: float):
+        for level, key in scopes:
+            bucket = self._bucket(level, key, now)
+            bucket.tokens -= tokens
+            bucket.pending += tokens
+        self.charged_tokens += tokens
+
+    def _bucket(self, level: str, key: str, now: float) -> _Bucket:
+        capacity, rate = self.limits[level]
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._load(level, key, capacity, now)
+            evicted = self._buckets.put(key, bucket)
+            self._orphans.extend(entry for entry in evicted if entry[1].pending)
+        # Refill for the time since the last touch
+        bucket.tokens = min(capacity, bucket.tokens + (now - bucket.updated) * rate)
+        bucket.updated = now
+        return bucket
+
+    def _load(self, level: str, key: str, capacity: float, now: float) -> _Bucket:
+        if self._reader is not None:
+            row = self._reader.execute(
+                "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+            ).fetchone()
+            if row:
+                return _Bucket(level, row[0], row[1])
+        return _Bucket(level, capacity, now)
+
+    def _flush_loop(self):
+        while not self._stop.wait(max(self.flush_interval, 0.1)):
+            self._flush()
+
+    def _flush(self):
+        """Write accumulated charges and pick up charges made by other processes."""
+        # Snapshot under the lock, write without it so admission never waits on SQLite
+        with self._lock:
+            entries = [(key, bucket, bucket.pending) for key, bucket in self._orphans]
+            entries += [
+                (key, bucket, bucket.pending)
+                for key, bucket in self._buckets.items()
+                if bucket.pending
+            ]
+            orphans, self._orphans = self._orphans, []
+        if not entries:
+            return
+
+        now = time.time()
+        rows = []
+        for key, bucket, sent in entries:
+            capacity, rate = self.limits[bucket.level]
+            rows.append((key, capacity - sent, now, capacity, rate, sent))
+        try:
+            with self._db:
+                # Refill and charge in one statement so concurrent writers never lose charges
+                self._db.executemany(
+                    "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET "
+                    "tokens = MIN(?, tokens + (excluded.updated - updated) * ?) - ?, "
+                    "updated = excluded.updated",
+                    rows,
+                )
+            stored = [
+                self._db.execute(
+                    "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+                ).fetchone()
+                for key, _, _ in entries
+            ]
+        except sqlite3.Error as e:
+            logger.error(f"Failed to persist quota buckets: {e}")
+            with self._lock:
+                self._orphans.extend(orphans)
+            return
+
+        with self._lock:
+            for (key, bucket, sent), (tokens, updated) in zip(entries, stored):
+                # Keep charges made while writing on top of the shared state
+                bucket.pending -= sent
+                bucket.tokens, bucket.updated = tokens - bucket.pending, updated
+
+    def get_stats(self) -> Dict:
+        return {
+            "buckets": len(self._buckets),
+            "admitted": self.admitted,
+            "throttled": self.throttled,
+            "charged_tokens": self.charged_tokens,
+        }
+
+    def close(self):
+        """Stop the flusher, write pending charges and close the database."""
+        if self._db is None:
+            return
+        self._stop.set()
+        self._flusher.join()
+        self._flush()
+        self._db.close()
+        self._reader.close()
+        self._db = self._reader = None
+
+
+def create_quota_manager() -> QuotaManager:
+    """Create the quota manager configured by the QUOTA_* settings."""
+    return QuotaManager(
+        limits={
+            "user": (Config.QUOTA_USER_BURST, Config.QUOTA_USER_TOKENS_PER_HOUR),
+            "guild": (Config.QUOTA_GUILD_BURST, Config.QUOTA_GUILD_TOKENS_PER_HOUR),
+            "global": (Config.QUOTA_GLOBAL_BURST, Config.QUOTA_GLOBAL_TOKENS_PER_HOUR),
+        },
+        reserve_tokens=Config.QUOTA_RESERVE_TOKENS,
+        path=Config.QUOTA_DB_PATH,
+        flush_interval=Config.QUOTA_FLUSH_INTERVAL,
+        max_buckets=Config.QUOTA_MAX_BUCKETS,
+    )
@@ -0,0 +1,199 @@
+"""Model cascade: answer simple requests with a small model, escalate the rest."""
+
+import logging
+import re
+import time
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Templates whose requests always go to the large model
+LARGE_TEMPLATES = {"coding", "debug", "teacher", "business"}
+
+# Requests asking for reasoning rather than small talk
+_COMPLEX_WORDS = re.compile(
+    r"なぜ|どうして|説明|比較|違い|手順|方法|設計|実装|分析|計算|証明|まとめ|"
+    r"\b(why|how|explain|compare|implement|design)\b",
+    re.IGNORECASE,
+)
+_CODE = re.compile(
+    r"```|^\s*(def|class|import|from|function|const|let|var|public|#include)\b|"
+    r"Traceback|Error:|=>|[{};]\s*$",
+    re.MULTILINE,
+)
+# Signs that the small model could not handle the request
+_UNSURE = re.compile(
+    r"わかりません|分かりません|答えられません|お答えできません|情報がありません|"
+    r"I (don't|do not) know|I'm not sure|I am not sure",
+    re.IGNORECASE,
+)
+_CLIENT_ERRORS = ("⏳", "⚠️", "❌")
+
+# generate(metrics, model, options) -> reply,
+# e.g. partial(asyncio.to_thread, ollama.generate, prompt)
+Generate = Callable[[Dict, Optional[str], Optional[Dict]], Awaitable[str]]
+
+
+class Route:
+    """Model choice for one request."""
+
+    def __init__(self, name: str, model: str, reason: str):
+        self.name = name  # "small", "large", "escalated" or "default"
+        self.model = model
+        self.reason = reason
+
+
+class ModelRouter:
+    """
+    Routes requests between a small fast model and the large model.
+
+    Cheap local features (length, code, template, conversation depth and wording)
+    send requests that clearly need the large model straight to it. Everything else
+    is answered by the small model first; if that answer is empty, an error or says it
+    does not know, the request is escalated to the large model. Latency and tokens
+    are recorded per route.
+    """
+
+    def __init__(
+        self,
+        small_model: str,
+        large_model: str,
+        simple_max_chars: int = 80,
+        max_depth: int = 6,
+    ):
+        """
+        Initialize router.
+
+        Args:
+            small_model: Fast model for simple requests (empty = routing disabled)
+            large_model: Model for complex requests and escalations
+            simple_max_chars: Longer inputs go to the large model
+            max_depth: Conversations with this many stored messages go to the large model
+        """
+        self.small_model = small_model
+        self.large_model = large_model
+        self.simple_max_chars = simple_max_chars
+        self.max_depth = max_depth
+        self.stats: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {"requests": 0, "seconds": 0.0, "tokens": 0}
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.small_model) and self.small_model != self.large_model
+
+    def route(
+        self,
+        text: str,
+        template: Optional[str] = None,
+        depth: int = 0,
+        model: Optional[str] = None,
+    ) -> Route:
+        """
+        Choose a model for a request.
+
+        Args:
+            text: The user's raw input
+            template: Prompt template in use, if any
+            depth: Number of stored messages in the conversation
+            model: Model already forced by the caller (e.g. the overload fallback)
+        """
+        if model:
+            return Route("default", model, "forced")
+        if not self.enabled:
+            return Route("default", self.large_model, "routing disabled")
+
+        if template in LARGE_TEMPLATES:
+            reason = f"template {template}"
+        elif _CODE.search(text):
+            reason = "code"
+        elif len(text) > self.simple_max_chars:
+            reason = f"{len(text)} chars"
+        elif depth >= self.max_depth:
+            reason = f"depth {depth}"
+        elif _COMPLEX_WORDS.search(text):
+            reason = "complex wording"
+        else:
+            return Route("small", self.small_model, "simple")
+        return Route("large", self.large_model, reason)
+
+    @staticmethod
+    def needs_escalation(reply: str) -> bool:
+        """Whether a small-model reply should be redone by the large model."""
+        reply = reply.strip()
+        return not reply or reply.startswith(_CLIENT_ERRORS) or bool(_UNSURE.search(reply[:200]))
+
+    async def generate(
+        self,
+        generate: Generate,
+        metrics: Dict,
+        text: str,
+        template: Optional[str] = None,
+        depth: int = 0,
+        model: Optional[str] = None,
+        options: Optional[Dict] = None,
+    ) -> str:
+        """
+        Generate a reply through the cascade.
+
+        Args:
+            generate: Callable running one generation (see Generate)
+            metrics: Dict filled with the final counters; eval_count covers every
+                attempt and "route" names the route that produced the reply
+            text, template, depth, model: As for route()
+            options: Ollama generation options for every attempt
+
+        Returns:
+            Generated reply
+        """
+        route = self.route(text, template, depth, model)
+        started = time.monotonic()
+        attempt: Dict = {}
+        reply = await generate(attempt, route.model, options)
+        tokens = attempt.get("eval_count", 0)
+
+        if route.name == "small" and self.needs_escalation(reply):
+            logger.info(f"Escalating to {self.large_model}: small model reply was inadequate")
+            route = Route("escalated", self.large_model, "small model unsure")
+            attempt = {}
+            reply = await generate(attempt, route.model, options)
+            tokens += attempt.get("eval_count", 0)
+
+        metrics.update(attempt)
+        metrics["eval_count"] = tokens
+        metrics["route"] = route.name
+        self.record(route, time.monotonic() - started, tokens)
+        return reply
+
+    def record(self, route: Route, seconds: float, tokens: int):
+        """Add a finished request to the per-route statistics."""
+        stats = self.stats[route.name]
+        stats["requests"] += 1
+        stats["seconds"] += seconds
+        stats["tokens"] += tokens
+        logger.debug(f"Route {route.name} ({route.model}, {route.reason}): {seconds:.2f}s")
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Requests, average latency and average generated tokens per route."""
+        return {
+            name: {
+                "requests": stats["requests"],
+                "avg_ms": round(stats["seconds"] / stats["requests"] * 1000),
+                "avg_tokens": round(stats["tokens"] / stats["requests"]),
+            }
+            for name, stats in self.stats.items()
+            if stats["requests"]
+        }
+
+
+def create_model_router() -> ModelRouter:
+    """Create the router configured by the ROUTER_* settings."""
+    return ModelRouter(
+        small_model=Config.ROUTER_SMALL_MODEL,
+        large_model=Config.OLLAMA_MODEL,
+        simple_max_chars=Config.ROUTER_SIMPLE_MAX_CHARS,
+        max_depth=Config.ROUTER_MAX_DEPTH,
+    )
@@ -7,6 +7,8 @@ from collections import Counter
 from datetime import datetime
 from typing import Dict
 
+from bot.tokens import get_token_counter
+
 logger = logging.getLogger(__name__)
 
 
@@ -62,15 +64,14 @@ class StatsTracker:
             self.stats["questions_by_user"].get(user_key, 0) + 1
         )
 
-        # Estimate tokens (rough: 1 token ≈ 4 chars)
-        self.stats["total_tokens_estimate"] += len(question) // 4
+        self.stats["total_tokens_estimate"] += get_token_counter().count(question)
 
         self.save_stats()
 
     def record_response(self, response: str):
         """Record a bot response."""
         self.stats["total_responses"] += 1
-        self.stats["total_tokens_estimate"] += len(response) // 4
+        self.stats["total_tokens_estimate"] += get_token_counter().count(response)
         self.save_stats()
 
     def get_summary(self) -> Dict:
@@ -1,8 +1,14 @@
 """Prompt templates for different use cases."""
 
-from typing import Dict
+from typing import Dict, List, Optional
 
-TEMPLATES: Dict[str, Dict[str, str]] = {
+from bot.tokens import get_token_counter
+from config import Config
+
+# Each template declares its generation profile next to the prompt:
+# num_predict caps the reply, temperature sets sampling, optional "stop" adds stop
+# sequences. num_ctx is sized per request and the model comes from TEMPLATE_MODELS.
+TEMPLATES: Dict[str, Dict] = {
     "coding": {
         "name": "💻 コーディング支援",
         "description": "プログラミングに関する質問に特化",
@@ -12,6 +18,8 @@ TEMPLATES: Dict[str, Dict[str, str]] = {
 
 ユーザーの質問:
 {prompt}""",
+        "num_predict": 1024,
+        "temperature": 0.2,
     },
     "translation": {
         "name": "🌐 翻訳モード",
@@ -24,6 +32,8 @@ TEMPLATES: Dict[str, Dict[str, str]] = {
 
 翻訳対象:
 {prompt}""",
+        "num_predict": 768,
+        "temperature": 0.3,
     },
     "creative": {
         "name": "✨ 創作モード",
@@ -34,6 +44,8 @@ TEMPLATES: Dict[str, Dict[str, str]] = {
 
 創作リクエスト:
 {prompt}""",
+        "num_predict": 1024,
+        "temperature": 0.9,
     },
     "summary": {
         "name": "📝 要約モード",
@@ -46,6 +58,8 @@ TEMPLATES: Dict[str, Dict[str, str]] = {
 
 要約対象:
 {prompt}""",
+        "num_predict": 384,
+        "temperature": 0.3,
     },
     "teacher": {
         "name": "👨‍🏫 教師モード",
@@ -59,6 +73,8 @@ TEMPLATES: Dict[str, Dict[str, str]] = {
 
 教えるテーマ:
 {prompt}""",
+        "num_predict": 1024,
+        "temperature": 0.5,
     },
     "business": {
         "name": "💼 ビジネスモード",
@@ -71,6 +87,8 @@ TEMPLATES: Dict[str, Dict[str, str]] = {
 
 ビジネス文書作成:
 {prompt}""",
+        "num_predict": 512,
+        "temperature": 0.4,
     },
     "debug": {
         "name": "🐛 デバッグモード",
@@ -84,6 +102,8 @@ TEMPLATES: Dict[str, Dict[str, str]] = {
 
 デバッグ対象:
 {prompt}""",
+        "num_predict": 1024,
+        "temperature": 0.2,
     },
     "brainstorm": {
         "name": "💡 ブレインストーミング",
@@ -97,23 +117,95 @@ TEMPLATES: Dict[str, Dict[str, str]] = {
 
 ブレインストーミングテーマ:
 {prompt}""",
+        "num_predict": 768,
+        "temperature": 0.9,
     },
 }
 
 
-def get_template(template_name: str) -> Dict[str, str]:
+class TemplateProfile:
+    """
+    A template compiled once at import: prompt prefix/suffix and generation options.
+
+    Rendering concatenates the precompiled pieces instead of formatting the template on
+    every request, and options() sizes num_ctx to the rendered prompt plus the output
+    cap. num_ctx is rounded up to a power of two so Ollama, which reloads the model when
+    the context size changes, only ever sees a few distinct sizes.
+    """
+
+    def __init__(self, key: str, template: Dict):
+        self.key = key
+        self.prefix, self.suffix = template["system_prompt"].split("{prompt}")
+        self.num_predict: int = template["num_predict"]
+        self.temperature: float = template["temperature"]
+        self.model: str = Config.TEMPLATE_MODELS.get(key, "")
+        # The model tends to continue the prompt format by echoing the input heading
+        heading = self.prefix.rstrip().rsplit("\n", 1)[-1]
+        self.stop: List[str] = [f"\n{heading}", *template.get("stop", [])]
+        # Tokens of everything but the user's text, including the bot's system prompt
+        self.fixed_tokens = get_token_counter().count(
+            Config.get_full_prompt(self.prefix + self.suffix)
+        )
+
+    def render(self, prompt: str) -> str:
+        """Put the user's prompt into the template."""
+        return self.prefix + prompt + self.suffix
+
+    def options(self, prompt: str, overrides: Optional[Dict] = None) -> Dict:
+        """
+        Ollama options for one request.
+
+        Args:
+            prompt: The user's prompt (before rendering)
+            overrides: Options from elsewhere (e.g. the overload tier); their
+                num_predict and num_ctx only ever lower the profile's
+
+        Returns:
+            Options with num_predict, num_ctx, temperature and stop
+        """
+        overrides = overrides or {}
+        prompt_tokens = self.fixed_tokens + get_token_counter().count(prompt)
+        num_predict = min(self.num_predict, overrides.get("num_predict", self.num_predict))
+
+        num_ctx = Config.TEMPLATE_MIN_CTX
+        while num_ctx < prompt_tokens + num_predict and num_ctx < Config.TEMPLATE_MAX_CTX:
+            num_ctx *= 2
+        num_ctx = min(num_ctx, Config.TEMPLATE_MAX_CTX, overrides.get("num_ctx", num_ctx))
+        # Shorten the reply rather than let the prompt be truncated
+        num_predict = max(64, min(num_predict, num_ctx - prompt_tokens))
+
+        return {
+            **overrides,
+            "num_predict": num_predict,
+            "num_ctx": num_ctx,
+            "temperature": self.temperature,
+            "stop": self.stop,
+        }
+
+
+PROFILES: Dict[str, TemplateProfile] = {
+    key: TemplateProfile(key, template) for key, template in TEMPLATES.items()
+}
+
+
+def get_template(template_name: str) -> Dict:
     """Get a prompt template by name."""
     return TEMPLATES.get(template_name, None)
 
 
-def list_templates() -> Dict[str, Dict[str, str]]:
+def get_profile(template_name: str) -> Optional[TemplateProfile]:
+    """Get a template's compiled profile by name."""
+    return PROFILES.get(template_name)
+
+
+def list_templates() -> Dict[str, Dict]:
     """List all available templates."""
     return TEMPLATES
 
 
 def apply_template(template_name: str, user_prompt: str) -> str:
     """Apply a template to user's prompt."""
-    template = get_template(template_name)
-    if template:
-        return template["system_prompt"].format(prompt=user_prompt)
+    profile = get_profile(template_name)
+    if profile:
+        return profile.render(user_prompt)
     return user_prompt
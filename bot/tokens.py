@@ -0,0 +1,126 @@
+"""Token counting for prompt budgets."""
+
+import logging
+import math
+import re
+from functools import lru_cache
+from typing import Optional
+
+from config import Config
+
+try:
+    from tokenizers import Tokenizer
+except ImportError:  # tokenizers is optional; counts fall back to the estimate
+    Tokenizer = None
+
+logger = logging.getLogger(__name__)
+
+# Estimated tokens per character by script. BPE vocabularies of current Ollama models
+# split Japanese into roughly one token per kanji and fewer for kana, and English into
+# about four characters per token; the weights lean high so budgets are not overrun.
+_KANA = re.compile(r"[\u3040-\u30ff\uff66-\uff9f]")
+_KANJI = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]")
+_WEIGHTS = {"kana": 0.8, "kanji": 1.2, "ascii": 0.3, "other": 1.5}
+
+
+def _char_weight(char: str) -> float:
+    if char < "\x80":
+        return _WEIGHTS["ascii"]
+    if _KANA.match(char):
+        return _WEIGHTS["kana"]
+    if _KANJI.match(char):
+        return _WEIGHTS["kanji"]
+    return _WEIGHTS["other"]
+
+
+class TokenCounter:
+    """
+    Counts and truncates text in model tokens.
+
+    With the model's tokenizer.json (and the optional tokenizers package) counts are
+    exact; otherwise they are estimated per script with _WEIGHTS. Either way results are
+    cached, since facts and history are re-counted on every request.
+    """
+
+    def __init__(self, tokenizer_file: str = "", cache_size: int = 4096):
+        """
+        Initialize counter.
+
+        Args:
+            tokenizer_file: tokenizer.json of the configured model (empty = estimate)
+            cache_size: Number of texts whose counts are kept
+        """
+        self.tokenizer = None
+        if tokenizer_file:
+            if Tokenizer is None:
+                logger.warning("TOKENIZER_FILE is set but tokenizers is not installed")
+            else:
+                try:
+                    self.tokenizer = Tokenizer.from_file(tokenizer_file)
+                    logger.info(f"Counting tokens with {tokenizer_file}")
+                except Exception as e:
+                    logger.error(f"Failed to load tokenizer {tokenizer_file}: {e}")
+        self.count = lru_cache(maxsize=cache_size)(self._count)
+
+    @property
+    def exact(self) -> bool:
+        return self.tokenizer is not None
+
+    def _count(self, text: str) -> int:
+        if self.tokenizer is not None:
+            return len(self.tokenizer.encode(text, add_special_tokens=False).ids)
+        if text.isascii():
+            return math.ceil(len(text) * _WEIGHTS["ascii"])
+        ascii_chars = len(text.encode("ascii", "ignore"))
+        kana = len(_KANA.findall(text))
+        kanji = len(_KANJI.findall(text))
+        other = len(text) - ascii_chars - kana - kanji
+        estimate = (
+            ascii_chars * _WEIGHTS["ascii"]
+            + kana * _WEIGHTS["kana"]
+            + kanji * _WEIGHTS["kanji"]
+            + other * _WEIGHTS["other"]
+        )
+        return math.ceil(estimate)
+
+    def truncate(self, text: str, max_tokens: int, ellipsis: str = "…") -> str:
+        """
+        Cut text to at most max_tokens tokens, ellipsis included.
+
+        Args:
+            text: Text to cut
+            max_tokens: Token limit
+            ellipsis: Appended when the text was cut
+
+        Returns:
+            The text itself if it fits, otherwise its longest fitting prefix plus ellipsis
+        """
+        if self.count(text) <= max_tokens:
+            return text
+        limit = max_tokens - self.count(ellipsis)
+        if limit <= 0:
+            return ""
+
+        if self.tokenizer is not None:
+            offsets = self.tokenizer.encode(text, add_special_tokens=False).offsets
+            return text[: offsets[limit - 1][1]] + ellipsis
+
+        used = 0.0
+        for end, char in enumerate(text):
+            used += _char_weight(char)
+            if used > limit:
+                return text[:end] + ellipsis
+        return text
+
+
+_counter: Optional[TokenCounter] = None
+
+
+def get_token_counter() -> TokenCounter:
+    """Get the process-wide token counter configured by TOKENIZER_FILE."""
+    global _counter
+    if _counter is None:
+        _counter = TokenCounter(
+            tokenizer_file=Config.TOKENIZER_FILE, cache_size=Config.TOKEN_CACHE_SIZE
+        )
+    return _counter
@@ -0,0 +1,213 @@
+"""Shared TTS synthesis scheduler over a pool of VOICEVOX engines."""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from bot.audio_cache import AudioCache
+from bot.voicevox_client import VOICEVOXClient
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class SynthesisJob:
+    """A pending synthesis request."""
+
+    __slots__ = ("guild_id", "texts", "character", "speed", "deadline", "future")
+
+    def __init__(
+        self, guild_id: int, texts: List[str], character: str, speed: float, deadline: float
+    ):
+        self.guild_id = guild_id
+        self.texts = texts
+        self.character = character
+        self.speed = speed
+        self.deadline = deadline
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class EngineState:
+    """Load and latency bookkeeping for one VOICEVOX engine."""
+
+    def __init__(self, client: VOICEVOXClient, concurrency: int):
+        self.client = client
+        self.concurrency = concurrency
+        self.in_flight = 0
+        self.completed = 0
+        self.failures = 0
+        self.latencies: deque = deque(maxlen=200)  # seconds, most recent last
+
+    @property
+    def free_slots(self) -> int:
+        return self.concurrency - self.in_flight
+
+    @property
+    def average_latency(self) -> float:
+        return sum(self.latencies) / len(self.latencies) if self.latencies else 0.0
+
+    def get_stats(self) -> Dict:
+        latencies = sorted(self.latencies)
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+        return {
+            "host": self.client.host,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failures": self.failures,
+            "avg_ms": round(self.average_latency * 1000),
+            "p95_ms": round(p95 * 1000),
+        }
+
+
+class SynthesisScheduler:
+    """
+    Central synthesis queue shared by every guild's voice worker.
+
+    Each guild has its own queue and only the head of each queue is eligible, so a
+    chatty guild cannot monopolize the engines. Among those heads the job with the
+    earliest deadline runs first; deadlines grow with text length, so short
+    utterances overtake long ones while waiting jobs still age towards the front.
+    """
+
+    def __init__(
+        self,
+        hosts: List[str],
+        concurrency_per_engine: int = 2,
+        base_deadline: float = 1.0,
+        seconds_per_char: float = 0.02,
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            hosts: VOICEVOX engine URLs
+            concurrency_per_engine: Maximum simultaneous requests per engine
+            base_deadline: Deadline offset applied to every job (seconds)
+            seconds_per_char: Additional deadline per character of text
+        """
+        self.cache = AudioCache(
+            memory_bytes=Config.TTS_CACHE_MEMORY_MB * 1024 * 1024,
+            cache_dir=Config.TTS_CACHE_DIR,
+            disk_bytes=Config.TTS_CACHE_DISK_MB * 1024 * 1024,
+        )
+        self.engines = [
+            EngineState(VOICEVOXClient(host=host, cache=self.cache), concurrency_per_engine)
+            for host in hosts
+        ]
+        self.base_deadline = base_deadline
+        self.seconds_per_char = seconds_per_char
+        self._queues: Dict[int, deque] = {}  # guild_id -> pending jobs in order
+        self._tasks: set = set()
+
+    @property
+    def primary(self) -> VOICEVOXClient:
+        """Client for non-synthesis calls (health checks, speaker lists, prewarm)."""
+        return self.engines[0].client
+
+    async def synthesize(
+        self, guild_id: int, text: str, character: str, speed: float
+    ) -> Optional[bytes]:
+        """
+        Queue a synthesis request and wait for its audio.
+
+        Returns:
+            Audio data (WAV format) or None
+        """
+        return (await self.synthesize_batch(guild_id, [text], character, speed))[0]
+
+    async def synthesize_batch(
+        self, guild_id: int, texts: List[str], character: str, speed: float
+    ) -> List[Optional[bytes]]:
+        """
+        Queue several texts as one job (one engine round trip) and wait for the audio.
+
+        Returns:
+            Audio data (WAV format) or None for each text
+        """
+        speaker_id = VOICEVOXClient.get_speaker_id(character)
+        keys = [AudioCache.make_key(text, speaker_id, speed) for text in texts]
+        results = [self.cache.get_memory(key) for key in keys]
+
+        # A cold disk would stall playback in every guild; read the disk tier off the loop
+        on_disk = [
+            i for i, audio in enumerate(results) if audio is None and self.cache.on_disk(keys[i])
+        ]
+        if on_disk:
+            loaded = await asyncio.to_thread(lambda: [self.cache.load(keys[i]) for i in on_disk])
+            for i, audio in zip(on_disk, loaded):
+                results[i] = audio
+
+        missing = [i for i, audio in enumerate(results) if audio is None]
+        if not missing:
+            return results
+
+        pending = [texts[i] for i in missing]
+        chars = sum(len(text) for text in pending)
+        deadline = time.monotonic() + self.base_deadline + self.seconds_per_char * chars
+        job = SynthesisJob(guild_id, pending, character, speed, deadline)
+        self._queues.setdefault(guild_id, deque()).append(job)
+        self._dispatch()
+
+        for i, audio in zip(missing, await job.future):
+            results[i] = audio
+        return results
+
+    def cancel_guild(self, guild_id: int):
+        """Drop a guild's pending jobs (e.g. on disconnect)."""
+        for job in self._queues.pop(guild_id, ()):
+            job.future.cancel()
+
+    def get_stats(self) -> List[Dict]:
+        """Per-engine load and latency statistics."""
+        return [engine.get_stats() for engine in self.engines]
+
+    def _dispatch(self):
+        """Start as many eligible jobs as there are free engine slots."""
+        while self._queues:
+            engine = max(self.engines, key=lambda e: (e.free_slots, -e.average_latency))
+            if engine.free_slots <= 0:
+                return
+
+            # Earliest deadline among each guild's oldest job
+            guild_id = min(self._queues, key=lambda gid: self._queues[gid][0].deadline)
+            queue = self._queues[guild_id]
+            job = queue.popleft()
+            if not queue:
+                del self._queues[guild_id]
+
+            if job.future.cancelled():
+                continue
+
+            engine.in_flight += 1
+            task = asyncio.create_task(self._run(engine, job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, engine: EngineState, job: SynthesisJob):
+        start = time.perf_counter()
+        try:
+            if len(job.texts) == 1:
+                audio = [
+                    await asyncio.to_thread(
+                        engine.client.synthesize, job.texts[0], job.character, job.speed
+                    )
+                ]
+            else:
+                audio = await asyncio.to_thread(
+                    engine.client.synthesize_batch, job.texts, job.character, job.speed
+                )
+            if any(data is None for data in audio):
+                engine.failures += 1
+            if not job.future.done():
+                job.future.set_result(audio)
+        except Exception as e:
+            engine.failures += 1
+            if not job.future.done():
+                job.future.set_exception(e)
+        finally:
+            engine.latencies.append(time.perf_counter() - start)
+            engine.completed += 1
+            engine.in_flight -= 1
+            self._dispatch()
@@ -1,51 +1,111 @@
 """Vision capabilities using LLaVA model."""
 
 import base64
+import json
 import logging
-from typing import Optional
+from typing import Dict, Optional, Union
 
 import requests
 
+from bot.attachments import ImageBuffer
+from bot.ollama_client import METRIC_KEYS
+from bot.vision_cache import VisionCache
+from config import Config
+
 logger = logging.getLogger(__name__)
 
 
+class _JSONImageBody:
+    """File-like request body that streams a base64 image without copying it."""
+
+    def __init__(self, fields: dict, image_base64: memoryview):
+        # Serialize everything except the image, then splice the payload in
+        head = json.dumps({**fields, "images": []}, ensure_ascii=False)[:-3]
+        self._parts = [(head + '["').encode("utf-8"), image_base64, b'"]}']
+        self._length = sum(len(part) for part in self._parts)
+        self._index = 0
+        self._position = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1):
+        while self._index < len(self._parts):
+            part = self._parts[self._index]
+            if self._position < len(part):
+                end = len(part) if size < 0 else self._position + size
+                chunk = part[self._position : end]
+                self._position += len(chunk)
+                return chunk
+            self._index += 1
+            self._position = 0
+        return b""
+
+
 class VisionClient:
     """Client for image analysis using LLaVA."""
 
-    def __init__(self, host: str, timeout: int = 180):
+    def __init__(self, host: str, timeout: int = 180, model: str = "llava"):
         self.host = host
         self.timeout = timeout
+        self.model = model
         self.url = f"{host}/api/generate"
+        self.cache = VisionCache(
+            max_entries=Config.VISION_CACHE_SIZE, cache_file=Config.VISION_CACHE_FILE
+        )
 
     def analyze_image(
-        self, image_data: bytes, prompt: str = "この画像について詳しく説明してください。"
+        self,
+        image_data: Union[bytes, ImageBuffer],
+        prompt: str = "この画像について詳しく説明してください。",
+        metrics: Optional[Dict] = None,
     ) -> str:
         """
         Analyze an image using LLaVA model.
 
         Args:
-            image_data: Image file bytes
+            image_data: Image file bytes, or a downloaded attachment buffer
             prompt: Question about the image
+            metrics: Optional dict filled with the response's counters (untouched on a
+                cache hit)
 
         Returns:
             Analysis result
         """
-        # Convert image to base64
-        image_base64 = base64.b64encode(image_data).decode("utf-8")
+        raw = image_data.raw if isinstance(image_data, ImageBuffer) else image_data
+        cache_key = self.cache.make_key(raw, prompt, self.model)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            logger.info("Vision cache hit")
+            return cached
+
+        # Convert image to base64 (attachment buffers are encoded in place)
+        if isinstance(image_data, ImageBuffer):
+            image_base64 = image_data.to_base64()
+        else:
+            image_base64 = memoryview(base64.b64encode(image_data))
+
+        body = _JSONImageBody(
+            {"model": self.model, "prompt": prompt, "stream": False}, image_base64
+        )
 
         try:
             response = requests.post(
                 self.url,
-                json={
-                    "model": "llava",
-                    "prompt": prompt,
-                    "images": [image_base64],
-                    "stream": False,
-                },
+                data=body,
+                headers={"Content-Type": "application/json"},
                 timeout=self.timeout,
             )
             response.raise_for_status()
-            return response.json().get("response", "画像の分析ができませんでした。")
+            data = response.json()
+            if metrics is not None:
+                metrics.update({k: data[k] for k in METRIC_KEYS if k in data})
+            result = data.get("response")
+            if not result:
+                return "画像の分析ができませんでした。"
+
+            self.cache.put(cache_key, result)
+            return result
 
         except requests.exceptions.Timeout:
             logger.error("Vision request timed out.")
@@ -65,6 +125,10 @@ class VisionClient:
             logger.exception(f"Unexpected error in analyze_image: {e}")
             return "❌ 予期しないエラーが発生しました。"
 
+    def close(self):
+        """Persist cached results that have not been saved yet."""
+        self.cache.close()
+
     def is_llava_available(self) -> bool:
         """Check if LLaVA model is available."""
         try:
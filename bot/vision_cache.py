@@ -0,0 +1,185 @@
+"""Content-addressed cache for vision analysis results."""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+from datetime import datetime
+from typing import Optional, Tuple
+
+from utils.lru_cache import LRUCache
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; fall back to exact byte hashing
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# (model, normalized prompt, image hash)
+CacheKey = Tuple[str, str, str]
+
+# Side of the dHash grid: 16x16 = 256 bits, enough to tell text screenshots apart
+HASH_SIZE = 16
+HASH_BITS = HASH_SIZE * HASH_SIZE
+# Hashes with fewer set (or unset) bits than this come from near-uniform images, which
+# look alike at thumbnail size however different their content is
+MIN_DETAIL_BITS = HASH_BITS // 8
+
+
+def perceptual_hash(image_data: bytes) -> str:
+    """
+    Compute a 256-bit difference hash (dHash) of an image, prefixed with its size.
+
+    The image is reduced to a 17x16 grayscale thumbnail and each bit records whether
+    a pixel is brighter than its right neighbour, so re-encodes of the same picture
+    produce the same (or a very close) hash. Images too uniform for the hash to tell
+    apart (dark screenshots with little text) get a content hash instead.
+
+    Args:
+        image_data: Image file bytes
+
+    Returns:
+        "WxH:" plus the hex hash, or a "sha256:" content hash if the image cannot be
+        decoded or has too little detail
+    """
+    if Image is not None:
+        try:
+            with Image.open(io.BytesIO(image_data)) as image:
+                size = image.size
+                pixels = list(
+                    image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS).getdata()
+                )
+            bits = 0
+            for row in range(HASH_SIZE):
+                for col in range(HASH_SIZE):
+                    left = pixels[row * (HASH_SIZE + 1) + col]
+                    right = pixels[row * (HASH_SIZE + 1) + col + 1]
+                    bits = (bits << 1) | (left > right)
+            set_bits = bin(bits).count("1")
+            if min(set_bits, HASH_BITS - set_bits) >= MIN_DETAIL_BITS:
+                return f"{size[0]}x{size[1]}:{bits:0{HASH_BITS // 4}x}"
+        except Exception as e:
+            logger.debug(f"Perceptual hash failed, using content hash: {e}")
+
+    return "sha256:" + hashlib.sha256(image_data).hexdigest()
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Normalize a prompt so trivially different spellings share a cache entry."""
+    prompt = unicodedata.normalize("NFKC", prompt).strip().lower()
+    return re.sub(r"\s+", " ", prompt)
+
+
+def hamming_distance(hash_a: str, hash_b: str) -> int:
+    """Number of differing bits between two perceptual hashes (HASH_BITS if incomparable)."""
+    size_a, _, bits_a = hash_a.rpartition(":")
+    size_b, _, bits_b = hash_b.rpartition(":")
+    # Content hashes, images of different sizes and hashes of another width never match
+    if size_a != size_b or size_a == "sha256" or len(bits_a) != len(bits_b):
+        return 0 if hash_a == hash_b else HASH_BITS
+    return bin(int(bits_a, 16) ^ int(bits_b, 16)).count("1")
+
+
+class VisionCache:
+    """LRU cache of vision results keyed by perceptual hash, prompt and model."""
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        cache_file: str = "",
+        max_distance: int = 8,
+        save_delay: float = 5.0,
+    ):
+        """
+        Initialize vision cache.
+
+        Args:
+            max_entries: Maximum number of cached results
+            cache_file: JSON file to persist results to (empty = memory only)
+            max_distance: Maximum Hamming distance (of HASH_BITS) treated as the same image
+            save_delay: Seconds new results are collected before the file is rewritten
+        """
+        self.cache_file = cache_file
+        self.max_distance = max_distance
+        self.save_delay = save_delay
+        self.entries = LRUCache(max_entries=max_entries)
+        # Analyses run on worker threads; one writer at a time, one pending save at most
+        self._save_lock = threading.Lock()
+        self._save_timer: Optional[threading.Timer] = None
+        self.load_cache()
+
+    def make_key(self, image_data: bytes, prompt: str, model: str) -> CacheKey:
+        """Build the cache key for an analysis request."""
+        return (model, normalize_prompt(prompt), perceptual_hash(image_data))
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        """Look up a result, tolerating small perceptual hash differences."""
+        result = self.entries.get(key)
+        if result is not None or self.max_distance <= 0:
+            return result
+
+        model, prompt, image_hash = key
+        for (cached_model, cached_prompt, cached_hash), cached in reversed(self.entries.items()):
+            if cached_model != model or cached_prompt != prompt:
+                continue
+            if hamming_distance(image_hash, cached_hash) <= self.max_distance:
+                # Promote the matching entry so it survives eviction
+                return self.entries.get((cached_model, cached_prompt, cached_hash))
+        return None
+
+    def put(self, key: CacheKey, result: str):
+        """Store a result and schedule a save if disk-backed."""
+        self.entries.put(key, result)
+        if not self.cache_file:
+            return
+        with self._save_lock:
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(self.save_delay, self.save_cache)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def close(self):
+        """Write results still waiting for a scheduled save."""
+        timer = self._save_timer
+        if timer is not None:
+            timer.cancel()
+            self.save_cache()
+
+    def load_cache(self):
+        """Load cached results from file."""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for entry in data.get("entries", []):
+                key = (entry["model"], entry["prompt"], entry["hash"])
+                self.entries.put(key, entry["result"])
+            logger.info(f"Loaded {len(self.entries)} cached vision results")
+        except Exception as e:
+            logger.error(f"Failed to load vision cache: {e}")
+
+    def save_cache(self):
+        """Save cached results to file, least recently used first."""
+        if not self.cache_file:
+            return
+        with self._save_lock:
+            self._save_timer = None
+            temp_path = f"{self.cache_file}.tmp"
+            try:
+                entries = [
+                    {"model": model, "prompt": prompt, "hash": image_hash, "result": result}
+                    for (model, prompt, image_hash), result in self.entries.items()
+                ]
+                data = {"entries": entries, "last_updated": datetime.now().isoformat()}
+                # Replace the file in one step so a crash never leaves it truncated
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+                os.replace(temp_path, self.cache_file)
+            except Exception as e:
+                logger.error(f"Failed to save vision cache: {e}")
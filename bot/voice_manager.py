@@ -5,27 +5,52 @@ import io
 import logging
 import os
 import shutil
-import tempfile
-from typing import Dict, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 import discord
 
+from bot import audio_source
+from bot.tts_scheduler import SynthesisScheduler
+from bot.voice_queue import VoiceQueue, VoiceRequest
 from bot.voicevox_client import VOICEVOXClient
 from config import Config
+from utils.lru_cache import LRUCache
+from utils.sentence_splitter import SentenceSplitter, split_sentences
 
 logger = logging.getLogger(__name__)
 
+# (text, character, speed)
+UtteranceKey = Tuple[str, str, float]
+
 
 class VoiceManager:
     """Manage voice channel connections and TTS."""
 
+    # Phrases the bot says on its own; prewarmed into the audio cache at startup
+    FIXED_PHRASES = ("よろしくなのだ！", "またなのだ！", "声を変更したのだ")
+
     def __init__(self):
-        self.voicevox = VOICEVOXClient()
+        self.tts_scheduler = SynthesisScheduler(
+            Config.VOICEVOX_HOSTS, concurrency_per_engine=Config.VOICEVOX_ENGINE_CONCURRENCY
+        )
+        self.voicevox = self.tts_scheduler.primary
         self.voice_clients: Dict[int, discord.VoiceClient] = {}  # guild_id -> VoiceClient
-        self.voice_queues: Dict[int, asyncio.Queue] = {}  # guild_id -> Queue
+        self.voice_queues: Dict[int, VoiceQueue] = {}  # guild_id -> Queue of sentences
+        self.audio_queues: Dict[int, asyncio.Queue] = {}  # guild_id -> Queue of synthesized audio
+        self.voice_tasks: Dict[int, List[asyncio.Task]] = {}  # guild_id -> pipeline tasks
         self.current_character: Dict[int, str] = {}  # guild_id -> character
-        self.temp_dir = tempfile.gettempdir()
-        self.ffmpeg_path = self._get_ffmpeg_path()
+        # Ready-to-send Opus packets for hot phrases, and play counts to find them
+        self.opus_cache = LRUCache(
+            max_entries=0,
+            max_bytes=Config.OPUS_CACHE_MB * 1024 * 1024,
+            sizeof=lambda frames: sum(len(frame) for frame in frames),
+        )
+        self.play_counts = LRUCache(max_entries=4096)
+        if audio_source.is_available():
+            logger.info("Decoding TTS audio in-process; FFmpeg is not required")
+            self.ffmpeg_path = ""
+        else:
+            self.ffmpeg_path = self._get_ffmpeg_path()
 
     def _get_ffmpeg_path(self) -> str:
         """Get FFmpeg path from config or auto-detect."""
@@ -47,6 +72,56 @@ class VoiceManager:
         logger.warning("FFmpeg not found. Voice features may not work.")
         return "ffmpeg"
 
+    async def _prepare_audio(
+        self, guild_id: int, texts: List[str], character: str, speed: float
+    ) -> List[Optional[discord.AudioSource]]:
+        """Synthesize and decode utterances, serving hot phrases as cached Opus."""
+        keys = [(text, character, round(speed, 2)) for text in texts]
+        sources: List[Optional[discord.AudioSource]] = [None] * len(texts)
+        missing = []
+        for i, key in enumerate(keys):
+            frames = self.opus_cache.get(key)
+            if frames is not None:
+                sources[i] = audio_source.OpusFrameSource(frames)
+            else:
+                missing.append(i)
+
+        if missing:
+            # One scheduler job (and one engine round trip) for all misses
+            audio = await self.tts_scheduler.synthesize_batch(
+                guild_id, [texts[i] for i in missing], character, speed
+            )
+            for i, audio_data in zip(missing, audio):
+                if audio_data:
+                    sources[i] = await asyncio.to_thread(
+                        self._make_audio_source, keys[i], audio_data
+                    )
+        return sources
+
+    def _make_audio_source(self, key: UtteranceKey, audio_data: bytes) -> discord.AudioSource:
+        """Build a playable source from WAV data without touching the disk."""
+        if not audio_source.is_available():
+            # Without numpy, let FFmpeg read the WAV from a pipe
+            return discord.FFmpegPCMAudio(
+                io.BytesIO(audio_data), pipe=True, executable=self.ffmpeg_path
+            )
+
+        pcm = audio_source.wav_to_pcm(audio_data)
+        if self._is_hot(key):
+            try:
+                frames = audio_source.encode_opus(pcm)
+            except discord.opus.OpusNotLoaded:
+                return audio_source.PCMBufferSource(pcm)
+            self.opus_cache.put(key, frames)
+            return audio_source.OpusFrameSource(frames)
+        return audio_source.PCMBufferSource(pcm)
+
+    def _is_hot(self, key: UtteranceKey) -> bool:
+        """Whether an utterance is repeated often enough to keep pre-encoded."""
+        count = self.play_counts.get(key, 0) + 1
+        self.play_counts.put(key, count)
+        return key[0] in self.FIXED_PHRASES or count >= Config.OPUS_CACHE_MIN_PLAYS
+
     async def join_voice_channel(
         self, channel: discord.VoiceChannel, guild_id: int
     ) -> Optional[discord.VoiceClient]:
@@ -59,13 +134,23 @@ class VoiceManager:
             # Connect to new channel
             voice_client = await channel.connect()
             self.voice_clients[guild_id] = voice_client
-            self.voice_queues[guild_id] = asyncio.Queue()
+            self.voice_queues[guild_id] = VoiceQueue(
+                maxsize=Config.VOICE_QUEUE_MAXSIZE,
+                policy=Config.VOICE_QUEUE_POLICY,
+                max_age=Config.VOICE_QUEUE_MAX_AGE,
+                coalesce_chars=Config.VOICE_COALESCE_CHARS,
+            )
+            # Bounded so synthesis runs at most TTS_LOOKAHEAD sentences ahead of playback
+            self.audio_queues[guild_id] = asyncio.Queue(maxsize=Config.TTS_LOOKAHEAD)
             self.current_character[guild_id] = "zundamon_normal"
 
             logger.info(f"Joined voice channel: {channel.name} in guild {guild_id}")
 
-            # Start playing queue
-            asyncio.create_task(self._process_voice_queue(guild_id))
+            # Start synthesis and playback pipeline
+            self.voice_tasks[guild_id] = [
+                asyncio.create_task(self._synthesize_voice_queue(guild_id)),
+                asyncio.create_task(self._process_voice_queue(guild_id)),
+            ]
 
             return voice_client
 
@@ -74,22 +159,27 @@ class VoiceManager:
             return None
 
     async def disconnect(self, guild_id: int):
-        """Disconnect from voice channel."""
-        if guild_id in self.voice_clients:
-            try:
-                await self.voice_clients[guild_id].disconnect()
-                del self.voice_clients[guild_id]
-                if guild_id in self.voice_queues:
-                    del self.voice_queues[guild_id]
-                if guild_id in self.current_character:
-                    del self.current_character[guild_id]
-                logger.info(f"Disconnected from voice channel in guild {guild_id}")
-            except Exception as e:
-                logger.error(f"Error disconnecting: {e}")
+        """Disconnect from voice channel and stop the guild's voice workers."""
+        voice_client = self.voice_clients.pop(guild_id, None)
+        if voice_client is None:
+            return
+
+        for task in self.voice_tasks.pop(guild_id, []):
+            task.cancel()
+        self.tts_scheduler.cancel_guild(guild_id)
+        self.voice_queues.pop(guild_id, None)
+        self.audio_queues.pop(guild_id, None)
+        self.current_character.pop(guild_id, None)
+
+        try:
+            await voice_client.disconnect()
+            logger.info(f"Disconnected from voice channel in guild {guild_id}")
+        except Exception as e:
+            logger.error(f"Error disconnecting: {e}")
 
     async def speak(self, guild_id: int, text: str, speed: float = 1.2):
         """
-        Add text to voice queue for speaking.
+        Add text to voice queue for speaking, one sentence at a time.
 
         Args:
             guild_id: Guild ID
@@ -104,58 +194,117 @@ class VoiceManager:
             logger.warning(f"No voice queue for guild {guild_id}")
             return
 
-        # Truncate long text
-        if len(text) > 200:
-            text = text[:200] + "、以下略"
+        # Add to queue sentence by sentence so playback can start on the first one
+        character = self.current_character.get(guild_id, "zundamon_normal")
+        request = VoiceRequest()
+        for sentence in split_sentences(text, max_length=Config.TTS_MAX_SENTENCE_LENGTH):
+            self.voice_queues[guild_id].put(sentence, character, speed, request)
+
+    async def speak_stream(
+        self, guild_id: int, chunks: AsyncIterator[str], speed: float = 1.2
+    ) -> str:
+        """
+        Speak streamed text, queueing each sentence as soon as it is complete.
+
+        Args:
+            guild_id: Guild ID
+            chunks: Async iterator of text chunks (e.g. LLM tokens)
+            speed: Speech speed
 
-        # Add to queue
+        Returns:
+            The full streamed text
+        """
+        splitter = SentenceSplitter(max_length=Config.TTS_MAX_SENTENCE_LENGTH)
         character = self.current_character.get(guild_id, "zundamon_normal")
-        await self.voice_queues[guild_id].put((text, character, speed))
+        request = VoiceRequest()
+        parts = []
+
+        async for chunk in chunks:
+            parts.append(chunk)
+            for sentence in splitter.feed(chunk):
+                self._queue_sentence(guild_id, sentence, character, speed, request)
+
+        for sentence in splitter.flush():
+            self._queue_sentence(guild_id, sentence, character, speed, request)
+
+        return "".join(parts)
+
+    def _queue_sentence(
+        self, guild_id: int, sentence: str, character: str, speed: float, request: VoiceRequest
+    ):
+        # The guild may have disconnected while the stream was running
+        queue = self.voice_queues.get(guild_id)
+        if queue is not None:
+            queue.put(sentence, character, speed, request)
+
+    async def _synthesize_voice_queue(self, guild_id: int):
+        """Synthesize queued sentences ahead of playback (runs until cancelled)."""
+        text_queue = self.voice_queues[guild_id]
+        audio_queue = self.audio_queues[guild_id]
+        while True:
+            # Sleeps until something is queued
+            text, character, speed = await text_queue.get()
+            texts = [text]
+
+            # While audio is already playing there is slack, so batch the backlog into
+            # one round trip; when idle, synthesize the head alone for the fastest start
+            voice_client = self.voice_clients.get(guild_id)
+            if not audio_queue.empty() or (voice_client and voice_client.is_playing()):
+                texts += text_queue.take_following(character, speed, Config.TTS_BATCH_SIZE - 1)
 
-    async def _process_voice_queue(self, guild_id: int):
-        """Process voice queue and play audio."""
-        while guild_id in self.voice_clients:
             try:
-                # Get next item from queue
-                text, character, speed = await asyncio.wait_for(
-                    self.voice_queues[guild_id].get(), timeout=1.0
-                )
-
-                # Synthesize speech
-                audio_data = await asyncio.to_thread(
-                    self.voicevox.synthesize, text, character, speed
-                )
+                # Synthesize and decode speech ahead of playback
+                sources = await self._prepare_audio(guild_id, texts, character, speed)
+            except Exception as e:
+                logger.error(f"Error in voice synthesis: {e}")
+                continue
 
-                if not audio_data:
+            for source in sources:
+                if source is None:
                     logger.error("Failed to synthesize speech")
                     continue
 
-                # Save to temp file
-                temp_file = os.path.join(self.temp_dir, f"tts_{guild_id}.wav")
-                with open(temp_file, "wb") as f:
-                    f.write(audio_data)
+                # Waits while the lookahead buffer is full
+                await audio_queue.put(source)
 
-                # Play audio with configured FFmpeg path
-                voice_client = self.voice_clients[guild_id]
-                if not voice_client.is_playing():
-                    audio_source = discord.FFmpegPCMAudio(temp_file, executable=self.ffmpeg_path)
-                    voice_client.play(audio_source)
+    async def _process_voice_queue(self, guild_id: int):
+        """Play synthesized audio in order (runs until cancelled)."""
+        audio_queue = self.audio_queues[guild_id]
+        while True:
+            source = await audio_queue.get()
+            voice_client = self.voice_clients.get(guild_id)
+            if voice_client is None:
+                return
+            try:
+                await self._play(voice_client, source)
+            except Exception as e:
+                logger.error(f"Error in voice queue processing: {e}")
 
-                    # Wait for playback to finish
-                    while voice_client.is_playing():
-                        await asyncio.sleep(0.1)
+    @staticmethod
+    async def _play(voice_client: discord.VoiceClient, source: discord.AudioSource):
+        """Play a source and wait for the player's completion callback."""
+        loop = asyncio.get_running_loop()
+        finished = loop.create_future()
+
+        def resolve(error: Optional[Exception]):
+            if finished.done():
+                return
+            if error:
+                finished.set_exception(error)
+            else:
+                finished.set_result(None)
 
-                # Clean up temp file
-                try:
-                    os.remove(temp_file)
-                except Exception:
-                    pass
+        # `after` runs on the player thread, so hop back onto the event loop
+        voice_client.play(source, after=lambda error: loop.call_soon_threadsafe(resolve, error))
+        try:
+            await finished
+        except asyncio.CancelledError:
+            voice_client.stop()
+            raise
 
-            except asyncio.TimeoutError:
-                continue
-            except Exception as e:
-                logger.error(f"Error in voice queue processing: {e}")
-                await asyncio.sleep(1)
+    def prewarm(self) -> int:
+        """Synthesize fixed phrases for every character so they play from cache."""
+        return self.voicevox.prewarm(self.FIXED_PHRASES, VOICEVOXClient.CHARACTERS, speed=1.2)
 
     def set_character(self, guild_id: int, character: str):
         """Set current character for guild."""
@@ -169,6 +318,11 @@ class VoiceManager:
         """Check if connected to voice in guild."""
         return guild_id in self.voice_clients
 
+    def get_queue_stats(self, guild_id: int) -> Optional[dict]:
+        """Get voice queue metrics for a guild."""
+        queue = self.voice_queues.get(guild_id)
+        return queue.get_stats() if queue is not None else None
+
     def get_current_character(self, guild_id: int) -> str:
         """Get current character for guild."""
         return self.current_character.get(guild_id, "zundamon_normal")
@@ -0,0 +1,218 @@
+"""Bounded per-guild utterance queue with backpressure policies."""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("drop_oldest", "drop_newest")
+
+
+class VoiceRequest:
+    """One reply (or one /speak text) whose sentences are queued, kept and dropped together."""
+
+    __slots__ = ("enqueued_at", "queued", "started", "dropped", "merged_into")
+
+    def __init__(self):
+        self.enqueued_at: Optional[float] = None  # When its first sentence was queued
+        self.queued = 0  # Sentences waiting in the queue
+        self.started = False  # A sentence was handed out for synthesis
+        self.dropped = False
+        self.merged_into: Optional["VoiceRequest"] = None  # Set when coalesced into another
+
+
+class _Utterance:
+    __slots__ = ("text", "character", "speed", "request", "enqueued_at")
+
+    def __init__(self, text: str, character: str, speed: float, request: VoiceRequest):
+        self.text = text
+        self.character = character
+        self.speed = speed
+        self.request = request
+        self.enqueued_at = time.monotonic()
+
+
+class VoiceQueue:
+    """
+    Queue of text waiting for synthesis that keeps voice latency bounded.
+
+    Sentences are queued individually so playback can start on the first one, but
+    limits apply to whole requests (a reply, or one /speak text), so a reply is either
+    read in full or not at all.
+
+    - Overflow: when `maxsize` requests are waiting, either the oldest waiting request
+      or the incoming one is dropped.
+    - Coalescing: a short text that starts a new request is merged into the previous
+      text when it has the same voice (e.g. several /speak commands), so they cost one
+      synthesis call; the two requests are then kept or dropped together. Sentences of
+      one request are never merged back together.
+    - Expiry: requests that waited longer than `max_age` since their first sentence
+      was queued are discarded instead of being synthesized.
+
+    Requests already being read are never dropped or expired, however long they are.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 20,
+        policy: str = "drop_oldest",
+        max_age: float = 60.0,
+        coalesce_chars: int = 40,
+    ):
+        """
+        Initialize voice queue.
+
+        Args:
+            maxsize: Maximum requests waiting besides those being read
+            policy: Overflow policy ("drop_oldest" or "drop_newest")
+            max_age: Seconds a request may wait before it is dropped (0 = never)
+            coalesce_chars: Merge adjacent texts while the result stays this short (0 = off)
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown voice queue policy: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.max_age = max_age
+        self.coalesce_chars = coalesce_chars
+        self._items: deque = deque()
+        self._waiting: Dict[VoiceRequest, None] = {}  # Requests with queued sentences, in order
+        self._not_empty = asyncio.Event()
+
+        # Metrics
+        self.dropped = 0
+        self.expired = 0
+        self.coalesced = 0
+        self._waits: deque = deque(maxlen=100)  # seconds items spent queued
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, text: str, character: str, speed: float, request: Optional[VoiceRequest] = None):
+        """
+        Queue text for synthesis without blocking.
+
+        Args:
+            text: Text to speak
+            character: Voice character
+            speed: Speech speed
+            request: The request the text belongs to; pass the same one for every
+                sentence of a reply (None = a standalone text)
+        """
+        request = _resolve(request or VoiceRequest())
+        if request.dropped:
+            # The rest of a reply that was already dropped
+            return
+
+        now = time.monotonic()
+        last = self._items[-1] if self._items else None
+        if (
+            last is not None
+            and self.coalesce_chars
+            and request.enqueued_at is None
+            and last.character == character
+            and last.speed == speed
+            and len(last.text) + len(text) <= self.coalesce_chars
+        ):
+            last.text += text
+            request.merged_into = last.request
+            self.coalesced += 1
+            return
+
+        if request.enqueued_at is None:
+            request.enqueued_at = now
+        if not request.started and request not in self._waiting:
+            if sum(not r.started for r in self._waiting) >= self.maxsize:
+                self.dropped += 1
+                if self.policy == "drop_newest":
+                    logger.debug(f"Voice queue full, dropped new text: {text[:20]}")
+                    request.dropped = True
+                    return
+                oldest = next(r for r in self._waiting if not r.started)
+                self._drop(oldest)
+                logger.debug("Voice queue full, dropped the oldest request")
+
+        self._items.append(_Utterance(text, character, speed, request))
+        request.queued += 1
+        self._waiting[request] = None
+        self._not_empty.set()
+
+    async def get(self) -> Tuple[str, str, float]:
+        """Wait for the next fresh item and return (text, character, speed)."""
+        while True:
+            while not self._items:
+                self._not_empty.clear()
+                await self._not_empty.wait()
+
+            head = self._items[0]
+            if self._is_stale(head.request):
+                self.expired += 1
+                age = time.monotonic() - head.request.enqueued_at
+                logger.debug(f"Dropped stale voice request after {age:.1f}s: {head.text[:20]}")
+                self._drop(head.request)
+                continue
+
+            return self._pop()
+
+    def take_following(self, character: str, speed: float, limit: int) -> List[str]:
+        """
+        Take up to `limit` fresh texts from the front that use the given voice, so they
+        can join a single batched synthesis call.
+        """
+        texts = []
+        while len(texts) < limit and self._items:
+            head = self._items[0]
+            if head.character != character or head.speed != speed:
+                break
+            if self._is_stale(head.request):
+                # Leave stale requests for get() to account for and discard
+                break
+            texts.append(self._pop()[0])
+        return texts
+
+    def get_stats(self) -> Dict:
+        """Queue depth, drop counters and recent wait times."""
+        oldest = time.monotonic() - self._items[0].enqueued_at if self._items else 0.0
+        waits = self._waits
+        return {
+            "size": len(self._items),
+            "requests": len(self._waiting),
+            "dropped": self.dropped,
+            "expired": self.expired,
+            "coalesced": self.coalesced,
+            "oldest_age_s": round(oldest, 1),
+            "avg_wait_ms": round(sum(waits) / len(waits) * 1000) if waits else 0,
+            "max_wait_ms": round(max(waits) * 1000) if waits else 0,
+        }
+
+    def _pop(self) -> Tuple[str, str, float]:
+        item = self._items.popleft()
+        request = item.request
+        request.queued -= 1
+        if not request.queued:
+            self._waiting.pop(request, None)
+        request.started = True
+        self._waits.append(time.monotonic() - item.enqueued_at)
+        return item.text, item.character, item.speed
+
+    def _is_stale(self, request: VoiceRequest) -> bool:
+        return (
+            bool(self.max_age)
+            and not request.started
+            and time.monotonic() - request.enqueued_at > self.max_age
+        )
+
+    def _drop(self, request: VoiceRequest):
+        """Discard every queued sentence of a request, and any it gets later."""
+        request.dropped = True
+        request.queued = 0
+        self._waiting.pop(request, None)
+        self._items = deque(item for item in self._items if item.request is not request)
+
+
+def _resolve(request: VoiceRequest) -> VoiceRequest:
+    while request.merged_into is not None:
+        request = request.merged_into
+    return request
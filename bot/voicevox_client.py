@@ -1,11 +1,15 @@
 """VOICEVOX TTS client for voice synthesis."""
 
+import io
 import logging
-from typing import Optional
+import zipfile
+from typing import Iterable, List, Optional
 
 import requests
 
+from bot.audio_cache import AudioCache
 from config import Config
+from utils.lru_cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
@@ -23,16 +27,29 @@ class VOICEVOXClient:
         "tsumugi_normal": 8,  # 春日部つむぎ（ノーマル）
     }
 
-    def __init__(self, host: str = None, timeout: int = 30):
+    def __init__(self, host: str = None, timeout: int = 30, cache: Optional[AudioCache] = None):
         """
         Initialize VOICEVOX client.
 
         Args:
             host: VOICEVOX API host (uses Config.VOICEVOX_HOST if None)
             timeout: Request timeout
+            cache: Audio cache to use (shared between engines of a pool)
         """
         self.host = host or Config.VOICEVOX_HOST
         self.timeout = timeout
+        self.cache = cache or AudioCache(
+            memory_bytes=Config.TTS_CACHE_MEMORY_MB * 1024 * 1024,
+            cache_dir=Config.TTS_CACHE_DIR,
+            disk_bytes=Config.TTS_CACHE_DISK_MB * 1024 * 1024,
+        )
+        # (text, speaker_id) -> audio query; speed changes only need /synthesis
+        self.query_cache = LRUCache(max_entries=Config.TTS_QUERY_CACHE_SIZE)
+
+    @classmethod
+    def get_speaker_id(cls, character: str) -> int:
+        """Get the VOICEVOX speaker ID for a character (defaults to ずんだもん)."""
+        return cls.CHARACTERS.get(character, 3)
 
     def is_available(self) -> bool:
         """Check if VOICEVOX is running."""
@@ -57,20 +74,16 @@ class VOICEVOXClient:
         Returns:
             Audio data (WAV format) or None
         """
-        speaker_id = self.CHARACTERS.get(character, 3)
+        speaker_id = self.get_speaker_id(character)
 
-        try:
-            # Step 1: Generate audio query
-            query_response = requests.post(
-                f"{self.host}/audio_query",
-                params={"text": text, "speaker": speaker_id},
-                timeout=self.timeout,
-            )
-            query_response.raise_for_status()
-            query_data = query_response.json()
+        cache_key = AudioCache.make_key(text, speaker_id, speed)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-            # Adjust speed
-            query_data["speedScale"] = speed
+        try:
+            # Step 1: Generate audio query (reused across speeds)
+            query_data = self._get_audio_query(text, speaker_id, speed)
 
             # Step 2: Synthesize audio
             synthesis_response = requests.post(
@@ -81,6 +94,7 @@ class VOICEVOXClient:
             )
             synthesis_response.raise_for_status()
 
+            self.cache.put(cache_key, synthesis_response.content)
             return synthesis_response.content
 
         except requests.exceptions.ConnectionError:
@@ -93,6 +107,95 @@ class VOICEVOXClient:
             logger.exception(f"VOICEVOX synthesis failed: {e}")
             return None
 
+    def synthesize_batch(
+        self, texts: List[str], character: str = "zundamon_normal", speed: float = 1.0
+    ) -> List[Optional[bytes]]:
+        """
+        Synthesize several texts with a single /multi_synthesis round trip.
+
+        Cached texts are served locally; the rest are sent together. Falls back to
+        one /synthesis call per text if the engine lacks /multi_synthesis.
+
+        Args:
+            texts: Texts to synthesize, in playback order
+            character: Character name
+            speed: Speech speed (0.5 - 2.0)
+
+        Returns:
+            Audio data (WAV format) or None for each text
+        """
+        speaker_id = self.get_speaker_id(character)
+        results: List[Optional[bytes]] = [None] * len(texts)
+        missing = []
+        for i, text in enumerate(texts):
+            results[i] = self.cache.get(AudioCache.make_key(text, speaker_id, speed))
+            if results[i] is None:
+                missing.append(i)
+
+        if len(missing) <= 1:
+            for i in missing:
+                results[i] = self.synthesize(texts[i], character, speed)
+            return results
+
+        try:
+            queries = [self._get_audio_query(texts[i], speaker_id, speed) for i in missing]
+            response = requests.post(
+                f"{self.host}/multi_synthesis",
+                params={"speaker": speaker_id},
+                json=queries,
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+
+            # The engine returns a zip of numbered WAV files in request order
+            with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+                names = sorted(archive.namelist())
+                if len(names) != len(missing):
+                    raise ValueError(f"Expected {len(missing)} files, got {len(names)}")
+                for i, name in zip(missing, names):
+                    results[i] = archive.read(name)
+                    self.cache.put(AudioCache.make_key(texts[i], speaker_id, speed), results[i])
+            return results
+
+        except requests.exceptions.ConnectionError:
+            logger.error(f"Could not connect to VOICEVOX at {self.host}")
+            return results
+        except Exception as e:
+            logger.warning(f"VOICEVOX multi synthesis failed, falling back: {e}")
+            for i in missing:
+                results[i] = self.synthesize(texts[i], character, speed)
+            return results
+
+    def _get_audio_query(self, text: str, speaker_id: int, speed: float) -> dict:
+        """Get an audio query from cache or /audio_query, with speed applied."""
+        query_data = self.query_cache.get((text, speaker_id))
+        if query_data is None:
+            query_response = requests.post(
+                f"{self.host}/audio_query",
+                params={"text": text, "speaker": speaker_id},
+                timeout=self.timeout,
+            )
+            query_response.raise_for_status()
+            query_data = query_response.json()
+            self.query_cache.put((text, speaker_id), query_data)
+
+        # Adjust speed on a copy so the cached query stays untouched
+        return {**query_data, "speedScale": speed}
+
+    def prewarm(self, phrases: Iterable[str], characters: Iterable[str], speed: float) -> int:
+        """
+        Synthesize fixed phrases ahead of time so they are served from cache.
+
+        Returns:
+            Number of phrases now available in cache
+        """
+        phrases = list(phrases)
+        warmed = 0
+        for character in characters:
+            results = self.synthesize_batch(phrases, character, speed)
+            warmed += sum(audio is not None for audio in results)
+        return warmed
+
     def get_speakers(self) -> list:
         """Get list of available speakers."""
         try:
@@ -0,0 +1,5 @@
+"""Support modules for the Minecraft bridge API."""
+
+from bridge.telemetry import PlayerTable, encode_frame
+
+__all__ = ["PlayerTable", "encode_frame"]
@@ -0,0 +1,109 @@
+"""Wire encodings for the bridge WebSocket, negotiated per connection."""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional; connections fall back to JSON
+    msgpack = None
+
+# WebSocket subprotocol a client offers to switch the connection to MessagePack
+MSGPACK_SUBPROTOCOL = "mcbridge.msgpack.v1"
+
+# Compact frames replace the "type" value and well-known keys with small integers.
+# Unknown types and keys pass through as strings, so new fields need no protocol bump.
+TYPE_KEY = 0
+TYPE_TAGS = {
+    # Minecraft -> bridge
+    "chat": 1,
+    "player_join": 2,
+    "player_leave": 3,
+    # Bridge -> Minecraft
+    "chat_response": 16,
+    "chat_delta": 17,
+    "chat_done": 18,
+    "player_event": 19,
+    "server_broadcast": 20,
+}
+FIELD_TAGS = {
+    "player": 1,
+    "message": 2,
+    "response": 3,
+    "text": 4,
+    "event": 5,
+    "stream": 6,
+    "tokens": 7,
+    "prompt_tokens": 8,
+    "tokens_per_second": 9,
+    "first_token_ms": 10,
+    "total_ms": 11,
+    "name": 12,
+    "uuid": 13,
+    "location": 14,
+    "health": 15,
+    "gamemode": 16,
+    "retry_after": 17,
+    "tier": 18,
+}
+_TYPE_NAMES = {tag: name for name, tag in TYPE_TAGS.items()}
+_FIELD_NAMES = {tag: name for name, tag in FIELD_TAGS.items()}
+
+Frame = Union[str, bytes]
+
+
+class JSONCodec:
+    """Default text encoding (same bytes as WebSocket.send_json)."""
+
+    name = "json"
+    binary = False
+
+    @staticmethod
+    def encode(message: Dict) -> str:
+        return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+    @staticmethod
+    def decode(frame: Frame) -> Dict:
+        return json.loads(frame)
+
+
+class MsgPackCodec:
+    """MessagePack maps with integer type and field tags."""
+
+    name = "msgpack"
+    binary = True
+
+    @staticmethod
+    def encode(message: Dict) -> bytes:
+        compact: Dict[Any, Any] = {}
+        for key, value in message.items():
+            if key == "type":
+                compact[TYPE_KEY] = TYPE_TAGS.get(value, value)
+            else:
+                compact[FIELD_TAGS.get(key, key)] = value
+        return msgpack.packb(compact, use_bin_type=True)
+
+    @staticmethod
+    def decode(frame: Frame) -> Dict:
+        compact = msgpack.unpackb(frame, raw=False, strict_map_key=False)
+        if not isinstance(compact, dict):
+            raise ValueError("Expected a MessagePack map")
+        message = {}
+        for key, value in compact.items():
+            if key == TYPE_KEY:
+                message["type"] = _TYPE_NAMES.get(value, value)
+            else:
+                message[_FIELD_NAMES.get(key, key)] = value
+        return message
+
+
+def negotiate(offered: List[str]) -> Tuple[Any, Optional[str]]:
+    """
+    Pick the codec for a connection from the subprotocols its client offered.
+
+    Returns:
+        (codec, subprotocol to accept or None for plain JSON)
+    """
+    if msgpack is not None and MSGPACK_SUBPROTOCOL in offered:
+        return MsgPackCodec, MSGPACK_SUBPROTOCOL
+    return JSONCodec, None
@@ -0,0 +1,236 @@
+"""Pluggable backends for bridge state shared between uvicorn workers."""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+from bridge.telemetry import PlayerTable
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+Deliver = Callable[[str], None]
+
+
+class LocalStateBackend:
+    """Keeps broadcasts and player state inside this process (single worker)."""
+
+    def __init__(self, players: PlayerTable):
+        self.players = players
+        self._deliver: Optional[Deliver] = None
+        self._local_connections: Callable[[], int] = lambda: 0
+
+    async def start(self, deliver: Deliver, local_connections: Callable[[], int]):
+        """
+        Start the backend.
+
+        Args:
+            deliver: Sends a serialized broadcast to this worker's connections
+            local_connections: Returns this worker's connection count
+        """
+        self._deliver = deliver
+        self._local_connections = local_connections
+
+    async def close(self):
+        pass
+
+    async def publish(self, text: str):
+        """Broadcast a serialized message to every connected server."""
+        self._deliver(text)
+
+    async def get_player(self, name: str) -> Optional[Dict]:
+        return self.players.get(name)
+
+    async def player_count(self) -> int:
+        return len(self.players)
+
+    async def connection_count(self) -> int:
+        return self._local_connections()
+
+
+class SQLiteStateBackend(LocalStateBackend):
+    """
+    Shares bridge state between workers through a local SQLite file.
+
+    - Broadcasts are delivered locally at once and appended to a table that the
+      other workers poll, so they reach servers connected to any worker.
+    - Telemetry is still ingested into this worker's PlayerTable; changed players are
+      flushed to the shared table periodically, so only the latest state is written.
+    - Each worker records its connection count in a heartbeat row.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS broadcasts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            origin TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            created REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS players (
+            name TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            updated REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS workers (
+            id TEXT PRIMARY KEY,
+            connections INTEGER NOT NULL,
+            updated REAL NOT NULL
+        );
+    """
+
+    # Broadcast rows older than this are deleted; workers count as gone after this
+    RETENTION = 60.0
+
+    def __init__(
+        self,
+        path: str,
+        players: PlayerTable,
+        poll_interval: float = 0.05,
+        flush_interval: float = 0.5,
+    ):
+        """
+        Initialize backend.
+
+        Args:
+            path: SQLite database file shared by the workers
+            players: This worker's telemetry table (created with track_changes=True)
+            poll_interval: Seconds between checks for other workers' broadcasts
+            flush_interval: Seconds between player state flushes and heartbeats
+        """
+        super().__init__(players)
+        self.path = path
+        self.poll_interval = poll_interval
+        self.flush_interval = flush_interval
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(self._SCHEMA)
+        self._last_id = 0
+        self._tasks: List[asyncio.Task] = []
+
+    def _query(self, sql: str, params=()) -> List[tuple]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def _write(self, sql: str, params=()):
+        with self._lock, self._db:
+            self._db.execute(sql, params)
+
+    async def start(self, deliver: Deliver, local_connections: Callable[[], int]):
+        await super().start(deliver, local_connections)
+        self._last_id = self._query("SELECT COALESCE(MAX(id), 0) FROM broadcasts")[0][0]
+        self._tasks = [
+            asyncio.create_task(self._poll_loop()),
+            asyncio.create_task(self._flush_loop()),
+        ]
+        logger.info(f"Sharing bridge state via {self.path} (worker {self.worker_id})")
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        try:
+            await self._flush()
+            self._write("DELETE FROM workers WHERE id = ?", (self.worker_id,))
+        finally:
+            with self._lock:
+                self._db.close()
+
+    async def publish(self, text: str):
+        self._deliver(text)
+        await asyncio.to_thread(
+            self._write,
+            "INSERT INTO broadcasts (origin, payload, created) VALUES (?, ?, ?)",
+            (self.worker_id, text, time.time()),
+        )
+
+    async def get_player(self, name: str) -> Optional[Dict]:
+        # Players updated through this worker are fresher than the last flush
+        player = self.players.get(name)
+        if player is not None:
+            return player
+        rows = await asyncio.to_thread(
+            self._query, "SELECT data FROM players WHERE name = ?", (name,)
+        )
+        return json.loads(rows[0][0]) if rows else None
+
+    async def player_count(self) -> int:
+        rows = await asyncio.to_thread(self._query, "SELECT COUNT(*) FROM players")
+        return max(rows[0][0], len(self.players))
+
+    async def connection_count(self) -> int:
+        rows = await asyncio.to_thread(
+            self._query,
+            "SELECT COALESCE(SUM(connections), 0) FROM workers WHERE id != ? AND updated > ?",
+            (self.worker_id, time.time() - self.RETENTION),
+        )
+        return rows[0][0] + self._local_connections()
+
+    async def _poll_loop(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                rows = await asyncio.to_thread(
+                    self._query,
+                    "SELECT id, origin, payload FROM broadcasts WHERE id > ? ORDER BY id",
+                    (self._last_id,),
+                )
+            except sqlite3.Error as e:
+                logger.error(f"Failed to poll shared broadcasts: {e}")
+                continue
+            for row_id, origin, payload in rows:
+                self._last_id = row_id
+                if origin != self.worker_id:
+                    self._deliver(payload)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self._flush()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to flush shared bridge state: {e}")
+
+    async def _flush(self):
+        # Snapshot on the event loop, where the table is updated; write in a thread
+        changed = self.players.drain_changes()
+        await asyncio.to_thread(self._write_flush, changed, self._local_connections())
+
+    def _write_flush(self, changed: List[Dict], connections: int):
+        now = time.time()
+        with self._lock, self._db:
+            if changed:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO players (name, data, updated) VALUES (?, ?, ?)",
+                    [(p["name"], json.dumps(p, ensure_ascii=False), now) for p in changed],
+                )
+            self._db.execute(
+                "INSERT OR REPLACE INTO workers (id, connections, updated) VALUES (?, ?, ?)",
+                (self.worker_id, connections, now),
+            )
+            self._db.execute("DELETE FROM broadcasts WHERE created < ?", (now - self.RETENTION,))
+            self._db.execute(
+                "DELETE FROM players WHERE name IN (SELECT name FROM players "
+                "ORDER BY updated DESC LIMIT -1 OFFSET ?)",
+                (self.players.max_players,),
+            )
+
+
+def create_state_backend(players: PlayerTable) -> LocalStateBackend:
+    """Create the backend selected by BRIDGE_STATE_BACKEND ("local" or "sqlite")."""
+    if Config.BRIDGE_STATE_BACKEND == "sqlite":
+        return SQLiteStateBackend(
+            Config.BRIDGE_STATE_DB,
+            players,
+            poll_interval=Config.BRIDGE_STATE_POLL_INTERVAL,
+        )
+    if Config.BRIDGE_STATE_BACKEND != "local":
+        raise ValueError(f"Unknown bridge state backend: {Config.BRIDGE_STATE_BACKEND}")
+    return LocalStateBackend(players)
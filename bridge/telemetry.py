@@ -0,0 +1,272 @@
+"""Compact storage and binary wire format for high-frequency player telemetry."""
+
+import logging
+import math
+import struct
+import time
+import uuid
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LOCATION_FIELDS = ("x", "y", "z", "yaw", "pitch")
+GAMEMODES = ("SURVIVAL", "CREATIVE", "ADVENTURE", "SPECTATOR")
+
+# Binary frame: header, then `count` records of
+#   name length (u8), name (UTF-8), uuid (16 bytes), x y z (f64), yaw pitch health (f32),
+#   gamemode index (u8, see GAMEMODES)
+FRAME_MAGIC = b"PT"
+FRAME_VERSION = 1
+_HEADER = struct.Struct("<2sBH")
+_RECORD = struct.Struct("<16sdddfffB")
+
+
+def encode_frame(players: Iterable[Dict]) -> bytes:
+    """
+    Encode player updates as a binary telemetry frame (reference for plugin authors).
+
+    Args:
+        players: Dicts shaped like PlayerInfo (name, uuid, location, health, gamemode)
+
+    Returns:
+        Frame bytes for a binary WebSocket message
+    """
+    parts = []
+    for player in players:
+        name = player["name"].encode("utf-8")
+        location = player.get("location", {})
+        gamemode = str(player.get("gamemode", "")).upper()
+        parts.append(bytes([len(name)]) + name)
+        parts.append(
+            _RECORD.pack(
+                uuid.UUID(player["uuid"]).bytes,
+                *(float(location.get(field, math.nan)) for field in LOCATION_FIELDS[:3]),
+                float(location.get("yaw", math.nan)),
+                float(location.get("pitch", math.nan)),
+                float(player.get("health", math.nan)),
+                GAMEMODES.index(gamemode) if gamemode in GAMEMODES else 255,
+            )
+        )
+    return _HEADER.pack(FRAME_MAGIC, FRAME_VERSION, len(parts) // 2) + b"".join(parts)
+
+
+class PlayerTable:
+    """
+    Latest known state of each Minecraft player, stored column by column.
+
+    Numeric fields live in typed arrays and each player owns one row, so an update
+    overwrites that row in place: repeated updates for a player coalesce to its latest
+    state without allocating. The least recently updated player is evicted when the
+    table is full. Updates are logged as a periodic summary instead of one line each.
+    """
+
+    def __init__(
+        self, max_players: int = 1000, log_interval: float = 10.0, track_changes: bool = False
+    ):
+        """
+        Initialize table.
+
+        Args:
+            max_players: Maximum number of players kept
+            log_interval: Seconds between update summaries in the log
+            track_changes: Remember updated players for drain_changes()
+        """
+        self.max_players = max_players
+        self.log_interval = log_interval
+        self._rows: "OrderedDict[str, int]" = OrderedDict()  # name -> row, LRU first
+        self._uuid: List = []  # str, or 16 raw bytes from binary frames
+        self._x = array("d")
+        self._y = array("d")
+        self._z = array("d")
+        self._yaw = array("f")
+        self._pitch = array("f")
+        self._health = array("f")
+        self._gamemode = array("B")  # index into self._modes
+        self._modes: List[str] = list(GAMEMODES)
+        self._changed: Optional[set] = set() if track_changes else None
+
+        # Rate-limited logging
+        self._updates = 0
+        self._rejected = 0
+        self._last_log = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._rows
+
+    def _row(self, name: str) -> int:
+        if self._changed is not None:
+            self._changed.add(name)
+        row = self._rows.get(name)
+        if row is not None:
+            self._rows.move_to_end(name)
+            return row
+
+        if len(self._rows) >= self.max_players:
+            _, row = self._rows.popitem(last=False)
+        else:
+            row = len(self._uuid)
+            self._uuid.append(None)
+            for column in (self._x, self._y, self._z, self._yaw, self._pitch, self._health):
+                column.append(math.nan)
+            self._gamemode.append(255)
+        self._rows[name] = row
+        return row
+
+    def _mode_index(self, gamemode: str) -> int:
+        gamemode = gamemode.upper()
+        try:
+            return self._modes.index(gamemode)
+        except ValueError:
+            if len(self._modes) >= 255:
+                return 255
+            self._modes.append(gamemode)
+            return len(self._modes) - 1
+
+    def update(
+        self,
+        name: str,
+        player_uuid: str,
+        location: Dict[str, float],
+        health: float,
+        gamemode: str,
+    ):
+        """Store one player's latest state (location keys besides LOCATION_FIELDS are dropped)."""
+        self._store(name, player_uuid, location, health, gamemode)
+        self._maybe_log()
+
+    def _store(
+        self, name: str, player_uuid: str, location: Dict[str, float], health, gamemode: str
+    ):
+        if not isinstance(name, str) or not name:
+            raise ValueError(f"Invalid player name: {name!r}")
+        # Convert everything first so a bad value leaves the table untouched
+        x, y, z, yaw, pitch = (float(location.get(field, math.nan)) for field in LOCATION_FIELDS)
+        health = float(health)
+        mode = self._mode_index(str(gamemode))
+
+        row = self._row(name)
+        self._uuid[row] = player_uuid
+        self._x[row] = x
+        self._y[row] = y
+        self._z[row] = z
+        self._yaw[row] = yaw
+        self._pitch[row] = pitch
+        self._health[row] = health
+        self._gamemode[row] = mode
+        self._updates += 1
+
+    def update_many(self, players: Iterable[Dict]) -> Tuple[int, int]:
+        """
+        Store a batch of PlayerInfo-shaped dicts; later entries for a player win.
+
+        Returns:
+            (accepted, rejected) counts
+        """
+        accepted = rejected = 0
+        for player in players:
+            try:
+                self._store(
+                    player["name"],
+                    str(player["uuid"]),
+                    player.get("location") or {},
+                    player.get("health", math.nan),
+                    player.get("gamemode", ""),
+                )
+                accepted += 1
+            except (KeyError, TypeError, ValueError, AttributeError):
+                rejected += 1
+        self._rejected += rejected
+        self._maybe_log()
+        return accepted, rejected
+
+    def apply_frame(self, data: bytes) -> int:
+        """
+        Apply a binary telemetry frame (see encode_frame).
+
+        Returns:
+            Number of player updates applied
+
+        Raises:
+            ValueError: If the frame is malformed
+        """
+        try:
+            magic, version, count = _HEADER.unpack_from(data)
+            if magic != FRAME_MAGIC or version != FRAME_VERSION:
+                raise ValueError(f"Unsupported telemetry frame {magic!r} v{version}")
+
+            offset = _HEADER.size
+            unpack = _RECORD.unpack_from
+            for _ in range(count):
+                name_length = data[offset]
+                name = bytes(data[offset + 1 : offset + 1 + name_length]).decode("utf-8")
+                offset += 1 + name_length
+                raw_uuid, x, y, z, yaw, pitch, health, mode = unpack(data, offset)
+                offset += _RECORD.size
+
+                row = self._row(name)
+                self._uuid[row] = raw_uuid
+                self._x[row] = x
+                self._y[row] = y
+                self._z[row] = z
+                self._yaw[row] = yaw
+                self._pitch[row] = pitch
+                self._health[row] = health
+                self._gamemode[row] = mode
+        except (struct.error, IndexError, UnicodeDecodeError) as e:
+            self._rejected += 1
+            raise ValueError(f"Malformed telemetry frame: {e}") from e
+
+        self._updates += count
+        self._maybe_log()
+        return count
+
+    def get(self, name: str) -> Optional[Dict]:
+        """Latest state of a player in PlayerInfo shape, or None if unknown."""
+        row = self._rows.get(name)
+        if row is None:
+            return None
+
+        player_uuid = self._uuid[row]
+        if isinstance(player_uuid, bytes):
+            player_uuid = str(uuid.UUID(bytes=player_uuid))
+        values = (self._x, self._y, self._z, self._yaw, self._pitch)
+        location = {
+            field: column[row]
+            for field, column in zip(LOCATION_FIELDS, values)
+            if not math.isnan(column[row])
+        }
+        health = self._health[row]
+        mode = self._gamemode[row]
+        return {
+            "name": name,
+            "uuid": player_uuid,
+            "location": location,
+            "health": None if math.isnan(health) else health,
+            "gamemode": self._modes[mode] if mode < len(self._modes) else "",
+        }
+
+    def drain_changes(self) -> List[Dict]:
+        """Latest state of players updated since the last call (needs track_changes)."""
+        if not self._changed:
+            return []
+        names, self._changed = self._changed, set()
+        return [player for player in map(self.get, names) if player is not None]
+
+    def _maybe_log(self):
+        now = time.monotonic()
+        elapsed = now - self._last_log
+        if elapsed < self.log_interval:
+            return
+        if self._updates or self._rejected:
+            logger.info(
+                f"Player telemetry: {self._updates} updates ({self._updates / elapsed:.0f}/s), "
+                f"{self._rejected} rejected, {len(self._rows)} players tracked"
+            )
+        self._updates = 0
+        self._rejected = 0
+        self._last_log = now
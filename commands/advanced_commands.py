@@ -3,11 +3,15 @@
 import asyncio
 import io
 import logging
+from typing import Optional
 
 import discord
 from discord import app_commands
 
-from bot.templates import apply_template, list_templates
+from bot.attachments import AttachmentTooLargeError
+from bot.templates import get_profile, list_templates
+from config import Config
+from utils.message_handler import send_long_message
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +34,7 @@ def setup_advanced_commands(bot):
         for key, template in templates.items():
             embed.add_field(
                 name=f"{template['name']} (`/use_template {key}`)",
-                value=template["description"],
+                value=f"{template['description']}\n-# 最大 {template['num_predict']} トークン",
                 inline=False,
             )
 
@@ -58,32 +62,33 @@ def setup_advanced_commands(bot):
             f"📝 Template: {template_name} | User: {interaction.user} | Q: {question[:30]}..."
         )
 
-        try:
-            await interaction.response.defer(ephemeral=False)
-        except discord.errors.NotFound:
-            return
+        async with bot.metered(interaction) as metrics:
+            if metrics is None:
+                return
 
-        try:
-            user_id = interaction.user.id
+            try:
+                user_id = interaction.user.id
 
-            # Apply template
-            enhanced_question = apply_template(template_name, question)
+                # Apply template
+                profile = get_profile(template_name)
+                enhanced_question = profile.render(question)
 
-            # Generate response
-            reply = await asyncio.to_thread(bot.ollama.generate, enhanced_question)
+                reply, plan = await bot.generate_reply(
+                    enhanced_question, question, metrics, template=template_name
+                )
 
-            # Save to history
-            bot.memory.add_message(user_id, "user", question)
-            bot.memory.add_message(user_id, "assistant", reply)
+                # Save to history
+                await bot.memory.record_exchange(user_id, question, reply)
 
-            # Track stats
-            bot.stats.record_question(user_id, question)
-            bot.stats.record_response(reply)
+                # Track stats
+                bot.stats.record_question(user_id, question)
+                bot.stats.record_response(reply)
 
-            await interaction.followup.send(f"**テンプレート:** {template_name}\n\n{reply}"[:2000])
-        except Exception as e:
-            logger.error(f"Error in use_template command: {e}")
-            await interaction.followup.send("❌ エラーが発生しました。")
+                content = f"**テンプレート:** {template_name}\n\n{reply}"
+                await interaction.followup.send(content[: 2000 - len(plan.notice)] + plan.notice)
+            except Exception as e:
+                logger.error(f"Error in use_template command: {e}")
+                await interaction.followup.send("❌ エラーが発生しました。")
 
     # モデル管理
     @bot.tree.command(name="list_models", description="利用可能なモデル一覧")
@@ -119,6 +124,15 @@ def setup_advanced_commands(bot):
         for key, value in summary.items():
             embed.add_field(name=key, value=str(value), inline=True)
 
+        # Model routing
+        routes = bot.router.get_stats()
+        if routes:
+            route_str = "\n".join(
+                f"`{name}`: {r['requests']}回 / 平均 {r['avg_ms']}ms / {r['avg_tokens']}トークン"
+                for name, r in routes.items()
+            )
+            embed.add_field(name="🔀 モデルルーティング", value=route_str, inline=False)
+
         # Top users
         top_users = bot.stats.get_top_users(3)
         if top_users:
@@ -132,7 +146,7 @@ def setup_advanced_commands(bot):
     async def export_chat_command(interaction: discord.Interaction):
         """Export conversation history."""
         user_id = interaction.user.id
-        conversation = bot.memory.get_context(user_id)
+        conversation = await bot.memory.run(bot.memory.get_context, user_id)
 
         if not conversation:
             await interaction.response.send_message("会話履歴がありません。", ephemeral=True)
@@ -169,40 +183,89 @@ def setup_advanced_commands(bot):
 
     # 画像分析
     @bot.tree.command(name="analyze_image", description="画像を分析（添付が必要）")
-    @app_commands.describe(question="画像についての質問（省略可）")
-    async def analyze_image_command(interaction: discord.Interaction, question: str = None):
-        """Analyze an attached image."""
+    @app_commands.describe(
+        image="分析する画像",
+        image2="追加の画像（省略可）",
+        image3="追加の画像（省略可）",
+        question="画像についての質問（省略可）",
+    )
+    async def analyze_image_command(
+        interaction: discord.Interaction,
+        image: Optional[discord.Attachment] = None,
+        image2: Optional[discord.Attachment] = None,
+        image3: Optional[discord.Attachment] = None,
+        question: str = None,
+    ):
+        """Analyze one or more attached images."""
+        attachments = [a for a in (image, image2, image3) if a is not None]
+        if not attachments and interaction.message:
+            attachments = list(interaction.message.attachments)
+
         # Check if image is attached
-        if not interaction.message or not interaction.message.attachments:
+        if not attachments:
             await interaction.response.send_message(
                 "⚠️ 画像を添付してください。メッセージに画像を添付してからコマンドを実行してください。",
                 ephemeral=True,
             )
             return
 
-        attachment = interaction.message.attachments[0]
-
-        # Check if it's an image
-        if not attachment.content_type or not attachment.content_type.startswith("image"):
+        # Check if they are images
+        if any(not a.content_type or not a.content_type.startswith("image") for a in attachments):
             await interaction.response.send_message(
                 "⚠️ 画像ファイルを添付してください。", ephemeral=True
             )
             return
 
+        # Reject oversized files before downloading anything
         try:
-            await interaction.response.defer(ephemeral=False)
-        except discord.errors.NotFound:
+            for attachment in attachments:
+                bot.attachments.check_size(attachment)
+        except AttachmentTooLargeError:
+            limit_mb = Config.MAX_ATTACHMENT_SIZE_MB
+            await interaction.response.send_message(
+                f"⚠️ 画像が大きすぎます（上限 {limit_mb}MB）。", ephemeral=True
+            )
             return
 
-        try:
-            # Download image
-            image_data = await attachment.read()
-
-            # Analyze
-            prompt = question or "この画像について詳しく説明してください。"
-            result = await asyncio.to_thread(bot.vision.analyze_image, image_data, prompt)
-
-            await interaction.followup.send(f"🖼️ **画像分析結果:**\n\n{result}"[:2000])
-        except Exception as e:
-            logger.error(f"Error in analyze_image command: {e}")
-            await interaction.followup.send("❌ 画像分析に失敗しました。")
+        prompt = question or "この画像について詳しく説明してください。"
+
+        async with bot.metered(interaction) as metrics:
+            if metrics is None:
+                return
+
+            async def analyze(attachment: discord.Attachment) -> str:
+                image_metrics = {}
+                try:
+                    async with bot.attachments.load(attachment) as buffer:
+                        return await asyncio.to_thread(
+                            bot.vision.analyze_image, buffer, prompt, image_metrics
+                        )
+                except AttachmentTooLargeError:
+                    return "⚠️ 画像が大きすぎます。"
+                except Exception as e:
+                    logger.error(f"Error analyzing {attachment.filename}: {e}")
+                    return "❌ 画像分析に失敗しました。"
+                finally:
+                    # Cached analyses generate nothing and cost nothing
+                    metrics["eval_count"] = metrics.get("eval_count", 0) + image_metrics.get(
+                        "eval_count", 0
+                    )
+
+            try:
+                # Analyze concurrently; the loader caps how many are in flight
+                results = await asyncio.gather(*(analyze(a) for a in attachments))
+
+                if len(results) == 1:
+                    content = f"🖼️ **画像分析結果:**\n\n{results[0]}"
+                else:
+                    content = "\n\n".join(
+                        f"🖼️ **画像分析結果 ({i}/{len(results)}: {a.filename}):**\n{r}"
+                        for i, (a, r) in enumerate(zip(attachments, results), 1)
+                    )
+
+                await send_long_message(
+                    interaction=interaction, content=content, mention_user=False
+                )
+            except Exception as e:
+                logger.error(f"Error in analyze_image command: {e}")
+                await interaction.followup.send("❌ 画像分析に失敗しました。")
@@ -1,6 +1,5 @@
 """Event handlers for the bot."""
 
-import asyncio
 import logging
 
 import discord
@@ -40,31 +39,50 @@ def setup_events(bot):
 
             logger.info(f"📨 Mention | User: {message.author} | Input: {user_input[:50]}...")
 
-            async with message.channel.typing():
-                try:
-                    user_id = message.author.id
+            async with bot.metered(message) as metrics:
+                if metrics is None:
+                    return
+                async with message.channel.typing():
+                    try:
+                        user_id = message.author.id
+
+                        # Get enhanced prompt with history and learned facts
+                        enhanced_question, depth = await bot.memory.build_prompt(
+                            user_id, user_input
+                        )
+
+                        reply, plan = await bot.generate_reply(
+                            enhanced_question, user_input, metrics, depth=depth
+                        )
+
+                        # Save to conversation history
+                        await bot.memory.record_exchange(user_id, user_input, reply)
+
+                        # Try to learn from this interaction
+                        learned = LearningSystem.extract_learnable_info(user_input, reply)
+                        if learned:
+                            bot.memory.learn_fact(learned, source=f"user_{user_id}")
+                            logger.info(f"🧠 Learned: {learned[:50]}...")
+
+                        # mention_author=True to avoid mention loops
+                        await send_long_message(
+                            message=message, content=reply + plan.notice, mention_user=True
+                        )
+                    except Exception as e:
+                        logger.error(f"Error in mention handler: {e}")
+                        await message.reply("❌ エラーが発生しました。", mention_author=True)
 
-                    # Get enhanced prompt with history and learned facts
-                    enhanced_question = bot.memory.get_enhanced_prompt(user_id, user_input)
-
-                    # Generate response
-                    reply = await asyncio.to_thread(bot.ollama.generate, enhanced_question)
-
-                    # Save to conversation history
-                    bot.memory.add_message(user_id, "user", user_input)
-                    bot.memory.add_message(user_id, "assistant", reply)
-
-                    # Try to learn from this interaction
-                    learned = LearningSystem.extract_learnable_info(user_input, reply)
-                    if learned:
-                        bot.memory.learn_fact(learned, source=f"user_{user_id}")
-                        logger.info(f"🧠 Learned: {learned[:50]}...")
+    @bot.event
+    async def on_voice_state_update(
+        member: discord.Member, before: discord.VoiceState, after: discord.VoiceState
+    ):
+        """Stop voice workers when the bot is removed from a voice channel."""
+        if member.id != bot.user.id or after.channel is not None:
+            return
 
-                    # mention_author=True to avoid mention loops
-                    await send_long_message(message=message, content=reply, mention_user=True)
-                except Exception as e:
-                    logger.error(f"Error in mention handler: {e}")
-                    await message.reply("❌ エラーが発生しました。", mention_author=True)
+        if bot.voice_manager.is_connected(member.guild.id):
+            logger.info(f"Voice connection lost in guild {member.guild.id}")
+            await bot.voice_manager.disconnect(member.guild.id)
 
     @bot.event
     async def on_command_error(ctx: commands.Context, error: commands.CommandError):
@@ -1,6 +1,5 @@
 """Slash commands for the bot."""
 
-import asyncio
 import logging
 
 import discord
@@ -33,46 +32,48 @@ def setup_slash_commands(bot):
         """
         logger.info(f"💬 Slash Command | User: {interaction.user} | Question: {question[:50]}...")
 
-        # Defer immediately to prevent timeout
-        try:
-            await interaction.response.defer(ephemeral=False)
-        except discord.errors.NotFound:
-            logger.error("Interaction expired before defer")
-            return
+        # Refuse over-quota users before taking a generation slot, then defer
+        async with bot.metered(interaction) as metrics:
+            if metrics is None:
+                return
 
-        # Generate response with context
-        try:
-            user_id = interaction.user.id
-
-            # Get enhanced prompt with history and learned facts
-            enhanced_question = bot.memory.get_enhanced_prompt(user_id, question)
-
-            # Generate response
-            reply = await asyncio.to_thread(bot.ollama.generate, enhanced_question)
-
-            # Save to conversation history
-            bot.memory.add_message(user_id, "user", question)
-            bot.memory.add_message(user_id, "assistant", reply)
-
-            # Try to learn from this interaction
-            learned = LearningSystem.extract_learnable_info(question, reply)
-            if learned:
-                bot.memory.learn_fact(learned, source=f"user_{user_id}")
-                logger.info(f"🧠 Learned: {learned[:50]}...")
-
-            await send_long_message(interaction=interaction, content=reply, mention_user=True)
-        except Exception as e:
-            logger.error(f"Error in ask command: {e}")
+            # Generate response with context
             try:
-                await interaction.followup.send("❌ エラーが発生しました。もう一度お試しください。")
-            except Exception:
-                pass
+                user_id = interaction.user.id
+
+                # Get enhanced prompt with history and learned facts
+                enhanced_question, depth = await bot.memory.build_prompt(user_id, question)
+
+                reply, plan = await bot.generate_reply(
+                    enhanced_question, question, metrics, depth=depth
+                )
+
+                # Save to conversation history
+                await bot.memory.record_exchange(user_id, question, reply)
+
+                # Try to learn from this interaction
+                learned = LearningSystem.extract_learnable_info(question, reply)
+                if learned:
+                    bot.memory.learn_fact(learned, source=f"user_{user_id}")
+                    logger.info(f"🧠 Learned: {learned[:50]}...")
+
+                await send_long_message(
+                    interaction=interaction, content=reply + plan.notice, mention_user=True
+                )
+            except Exception as e:
+                logger.error(f"Error in ask command: {e}")
+                try:
+                    await interaction.followup.send(
+                        "❌ エラーが発生しました。もう一度お試しください。"
+                    )
+                except Exception:
+                    pass
 
     @bot.tree.command(name="reset", description="会話履歴をリセット")
     async def reset_command(interaction: discord.Interaction):
         """Reset conversation history for the user."""
         user_id = interaction.user.id
-        bot.memory.clear_context(user_id)
+        await bot.memory.run(bot.memory.clear_context, user_id)
 
         embed = discord.Embed(
             title="🔄 会話リセット",
@@ -2,11 +2,13 @@
 
 import asyncio
 import logging
+import time
 
 import discord
 from discord import app_commands
 
 from bot.memory import LearningSystem
+from utils.streaming import iterate_in_thread
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +36,10 @@ def setup_voice_commands(bot):
                 await interaction.followup.send(embed=embed, ephemeral=True)
                 return
 
-            voice_client = await channel.connect()
+            # Registers the guild and starts its voice workers
+            voice_client = await bot.voice_manager.join_voice_channel(channel, guild_id)
+            if voice_client is None:
+                raise RuntimeError("join_voice_channel failed")
             await bot.voice_manager.speak(guild_id, "よろしくなのだ！")
 
             embed = discord.Embed(
@@ -146,42 +151,61 @@ def setup_voice_commands(bot):
 
         logger.info(f"🎤 VC Ask | User: {interaction.user} | Q: {question[:50]}...")
 
-        try:
-            await interaction.response.defer(ephemeral=False)
-        except discord.errors.NotFound:
-            return
-
-        try:
-            user_id = interaction.user.id
-
-            # Get enhanced prompt
-            enhanced_question = bot.memory.get_enhanced_prompt(user_id, question)
-
-            # Generate response
-            reply = await asyncio.to_thread(bot.ollama.generate, enhanced_question)
-
-            # Save to history
-            bot.memory.add_message(user_id, "user", question)
-            bot.memory.add_message(user_id, "assistant", reply)
-
-            # Learn
-            learned = LearningSystem.extract_learnable_info(question, reply)
-            if learned:
-                bot.memory.learn_fact(learned, source=f"user_{user_id}")
-
-            # Track stats
-            bot.stats.record_question(user_id, question)
-            bot.stats.record_response(reply)
-
-            # Send text response
-            await interaction.followup.send(f"**質問:** {question}\n\n**回答:** {reply[:500]}...")
-
-            # Speak response
-            await bot.voice_manager.speak(guild_id, reply, speed=1.2)
+        async with bot.metered(interaction) as metrics:
+            if metrics is None:
+                return
 
-        except Exception as e:
-            logger.error(f"Error in vc_ask command: {e}")
-            await interaction.followup.send("❌ エラーが発生しました。")
+            try:
+                user_id = interaction.user.id
+
+                # Get enhanced prompt
+                enhanced_question, depth = await bot.memory.build_prompt(user_id, question)
+
+                with bot.overload.admit(question) as plan:
+                    if plan.canned:
+                        reply = plan.canned
+                        await bot.voice_manager.speak(guild_id, reply, speed=1.2)
+                    else:
+                        # Spoken replies cannot be redone, so route without escalation
+                        route = bot.router.route(question, depth=depth, model=plan.model)
+                        started = time.monotonic()
+
+                        # Stream the response into TTS so speech starts with the first sentence
+                        reply = await bot.voice_manager.speak_stream(
+                            guild_id,
+                            iterate_in_thread(
+                                bot.ollama.generate_stream,
+                                enhanced_question,
+                                metrics,
+                                route.model,
+                                plan.options,
+                            ),
+                            speed=1.2,
+                        )
+                        bot.router.record(
+                            route, time.monotonic() - started, metrics.get("eval_count", 0)
+                        )
+
+                # Save to history
+                await bot.memory.record_exchange(user_id, question, reply)
+
+                # Learn
+                learned = LearningSystem.extract_learnable_info(question, reply)
+                if learned:
+                    bot.memory.learn_fact(learned, source=f"user_{user_id}")
+
+                # Track stats
+                bot.stats.record_question(user_id, question)
+                bot.stats.record_response(reply)
+
+                # Send text response
+                await interaction.followup.send(
+                    f"**質問:** {question}\n\n**回答:** {reply[:500]}...{plan.notice}"
+                )
+
+            except Exception as e:
+                logger.error(f"Error in vc_ask command: {e}")
+                await interaction.followup.send("❌ エラーが発生しました。")
 
     @bot.tree.command(name="vc_status", description="VC接続状態を確認")
     async def vc_status_command(interaction: discord.Interaction):
@@ -194,6 +218,13 @@ def setup_voice_commands(bot):
         voicevox_status = "✅ 起動中" if bot.voice_manager.voicevox.is_available() else "❌ 停止中"
         embed.add_field(name="VOICEVOX", value=voicevox_status, inline=False)
 
+        # Engine pool latency
+        engine_lines = [
+            f"`{e['host']}` 処理中 {e['in_flight']} / 平均 {e['avg_ms']}ms / p95 {e['p95_ms']}ms"
+            for e in bot.voice_manager.tts_scheduler.get_stats()
+        ]
+        embed.add_field(name="合成エンジン", value="\n".join(engine_lines), inline=False)
+
         # Connection status
         if bot.voice_manager.is_connected(guild_id):
             voice_client = bot.voice_manager.voice_clients[guild_id]
@@ -202,6 +233,19 @@ def setup_voice_commands(bot):
 
             embed.add_field(name="接続状態", value=f"✅ {channel_name} に接続中", inline=False)
             embed.add_field(name="現在のキャラクター", value=character, inline=False)
+
+            queue_stats = bot.voice_manager.get_queue_stats(guild_id)
+            if queue_stats:
+                embed.add_field(
+                    name="読み上げキュー",
+                    value=(
+                        f"待機 {queue_stats['requests']}件 ({queue_stats['size']}文) / "
+                        f"平均待ち {queue_stats['avg_wait_ms']}ms\n"
+                        f"破棄 {queue_stats['dropped']}件 / 期限切れ {queue_stats['expired']}件 / "
+                        f"結合 {queue_stats['coalesced']}件"
+                    ),
+                    inline=False,
+                )
         else:
             embed.add_field(name="接続状態", value="❌ 未接続", inline=False)
 
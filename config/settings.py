@@ -1,10 +1,12 @@
 """Configuration settings for Ollama Discord Bot."""
 
 import os
-from dotenv import load_dotenv 
+
+from dotenv import load_dotenv
 
 load_dotenv()
 
+
 class Config:
     """Bot configuration settings."""
 
@@ -19,6 +21,26 @@ class Config:
     # VOICEVOX
     VOICEVOX_HOST: str = os.getenv("VOICEVOX_HOST", "http://localhost:50021")
     VOICEVOX_PATH: str = os.getenv("VOICEVOX_PATH", "")  # Optional: for auto-start
+    # Comma-separated engine pool for synthesis (defaults to VOICEVOX_HOST)
+    VOICEVOX_HOSTS: list = [
+        host.strip()
+        for host in os.getenv("VOICEVOX_HOSTS", VOICEVOX_HOST).split(",")
+        if host.strip()
+    ]
+    VOICEVOX_ENGINE_CONCURRENCY: int = int(os.getenv("VOICEVOX_ENGINE_CONCURRENCY", "2"))
+    TTS_CACHE_MEMORY_MB: int = int(os.getenv("TTS_CACHE_MEMORY_MB", "32"))
+    TTS_CACHE_DIR: str = os.getenv("TTS_CACHE_DIR", "tts_cache")  # Empty = memory only
+    TTS_CACHE_DISK_MB: int = int(os.getenv("TTS_CACHE_DISK_MB", "256"))
+    TTS_QUERY_CACHE_SIZE: int = int(os.getenv("TTS_QUERY_CACHE_SIZE", "1024"))
+    TTS_BATCH_SIZE: int = int(os.getenv("TTS_BATCH_SIZE", "4"))
+    OPUS_CACHE_MB: int = int(os.getenv("OPUS_CACHE_MB", "16"))
+    OPUS_CACHE_MIN_PLAYS: int = int(os.getenv("OPUS_CACHE_MIN_PLAYS", "2"))
+    VOICE_QUEUE_MAXSIZE: int = int(os.getenv("VOICE_QUEUE_MAXSIZE", "20"))
+    VOICE_QUEUE_POLICY: str = os.getenv("VOICE_QUEUE_POLICY", "drop_oldest")  # or drop_newest
+    VOICE_QUEUE_MAX_AGE: float = float(os.getenv("VOICE_QUEUE_MAX_AGE", "60"))  # 0 = never
+    VOICE_COALESCE_CHARS: int = int(os.getenv("VOICE_COALESCE_CHARS", "40"))  # 0 = off
+    TTS_LOOKAHEAD: int = int(os.getenv("TTS_LOOKAHEAD", "2"))
+    TTS_MAX_SENTENCE_LENGTH: int = int(os.getenv("TTS_MAX_SENTENCE_LENGTH", "120"))
 
     # FFmpeg
     FFMPEG_PATH: str = os.getenv("FFMPEG_PATH", "")  # Empty = auto-detect from PATH
@@ -29,6 +51,80 @@ class Config:
     USE_STREAMING: bool = os.getenv("USE_STREAMING", "true").lower() == "true"
     STREAMING_UPDATE_INTERVAL: int = int(os.getenv("STREAMING_UPDATE_INTERVAL", "30"))
 
+    # Outbound message pacing (requests per window, per channel / interaction webhook)
+    OUTBOUND_CHANNEL_LIMIT: int = int(os.getenv("OUTBOUND_CHANNEL_LIMIT", "5"))
+    OUTBOUND_CHANNEL_WINDOW: float = float(os.getenv("OUTBOUND_CHANNEL_WINDOW", "5"))
+    OUTBOUND_WEBHOOK_LIMIT: int = int(os.getenv("OUTBOUND_WEBHOOK_LIMIT", "5"))
+    OUTBOUND_WEBHOOK_WINDOW: float = float(os.getenv("OUTBOUND_WEBHOOK_WINDOW", "2"))
+
+    # Minecraft bridge API
+    BRIDGE_MAX_CONCURRENT_CHATS: int = int(os.getenv("BRIDGE_MAX_CONCURRENT_CHATS", "4"))
+    BRIDGE_MAX_TASKS_PER_CONNECTION: int = int(os.getenv("BRIDGE_MAX_TASKS_PER_CONNECTION", "64"))
+    BRIDGE_MAX_TASKS_PER_PLAYER: int = int(os.getenv("BRIDGE_MAX_TASKS_PER_PLAYER", "8"))
+    BRIDGE_SEND_QUEUE_SIZE: int = int(os.getenv("BRIDGE_SEND_QUEUE_SIZE", "256"))
+    BRIDGE_STREAM_INTERVAL: float = float(os.getenv("BRIDGE_STREAM_INTERVAL", "0.25"))
+    BRIDGE_STREAM_FLUSH_CHARS: int = int(os.getenv("BRIDGE_STREAM_FLUSH_CHARS", "48"))
+    BRIDGE_MAX_TRACKED_PLAYERS: int = int(os.getenv("BRIDGE_MAX_TRACKED_PLAYERS", "1000"))
+    BRIDGE_TELEMETRY_LOG_INTERVAL: float = float(os.getenv("BRIDGE_TELEMETRY_LOG_INTERVAL", "10"))
+    BRIDGE_WORKERS: int = int(os.getenv("BRIDGE_WORKERS", "1"))
+    BRIDGE_STATE_BACKEND: str = os.getenv("BRIDGE_STATE_BACKEND", "local")  # local / sqlite
+    BRIDGE_STATE_DB: str = os.getenv("BRIDGE_STATE_DB", "bridge_state.db")
+    BRIDGE_STATE_POLL_INTERVAL: float = float(os.getenv("BRIDGE_STATE_POLL_INTERVAL", "0.05"))
+
+    # Conversation memory (shared by the bot and the bridge when MEMORY_DB_PATH is set)
+    MEMORY_MAX_USERS: int = int(os.getenv("MEMORY_MAX_USERS", "1000"))
+    MEMORY_DB_PATH: str = os.getenv("MEMORY_DB_PATH", "")  # Empty = in-process only
+
+    # Generation quotas: token buckets charged with Ollama's eval_count (0 = unlimited)
+    QUOTA_USER_TOKENS_PER_HOUR: int = int(os.getenv("QUOTA_USER_TOKENS_PER_HOUR", "20000"))
+    QUOTA_USER_BURST: int = int(os.getenv("QUOTA_USER_BURST", "4000"))
+    QUOTA_GUILD_TOKENS_PER_HOUR: int = int(os.getenv("QUOTA_GUILD_TOKENS_PER_HOUR", "100000"))
+    QUOTA_GUILD_BURST: int = int(os.getenv("QUOTA_GUILD_BURST", "20000"))
+    QUOTA_GLOBAL_TOKENS_PER_HOUR: int = int(os.getenv("QUOTA_GLOBAL_TOKENS_PER_HOUR", "0"))
+    QUOTA_GLOBAL_BURST: int = int(os.getenv("QUOTA_GLOBAL_BURST", "0"))
+    QUOTA_RESERVE_TOKENS: int = int(os.getenv("QUOTA_RESERVE_TOKENS", "256"))
+    QUOTA_DB_PATH: str = os.getenv("QUOTA_DB_PATH", "")  # Empty = memory only
+    QUOTA_FLUSH_INTERVAL: float = float(os.getenv("QUOTA_FLUSH_INTERVAL", "5"))
+    QUOTA_MAX_BUCKETS: int = int(os.getenv("QUOTA_MAX_BUCKETS", "10000"))
+
+    # Overload degradation (tiers: full -> short -> compact -> fallback -> canned)
+    OVERLOAD_SLO_MS: float = float(os.getenv("OVERLOAD_SLO_MS", "20000"))  # 0 = ignore latency
+    OVERLOAD_QUEUE_DEPTH: int = int(os.getenv("OVERLOAD_QUEUE_DEPTH", "4"))  # 0 = ignore depth
+    OVERLOAD_NUM_PREDICT: int = int(os.getenv("OVERLOAD_NUM_PREDICT", "256"))
+    OVERLOAD_NUM_CTX: int = int(os.getenv("OVERLOAD_NUM_CTX", "2048"))
+    OVERLOAD_FALLBACK_MODEL: str = os.getenv("OVERLOAD_FALLBACK_MODEL", "")  # Empty = no tier
+    OVERLOAD_WINDOW: float = float(os.getenv("OVERLOAD_WINDOW", "60"))
+    OVERLOAD_STEP_INTERVAL: float = float(os.getenv("OVERLOAD_STEP_INTERVAL", "2"))
+    OVERLOAD_COOLDOWN: float = float(os.getenv("OVERLOAD_COOLDOWN", "10"))
+
+    # Model cascade (simple requests on a small model first; empty = always OLLAMA_MODEL)
+    ROUTER_SMALL_MODEL: str = os.getenv("ROUTER_SMALL_MODEL", "")
+    ROUTER_SIMPLE_MAX_CHARS: int = int(os.getenv("ROUTER_SIMPLE_MAX_CHARS", "80"))
+    ROUTER_MAX_DEPTH: int = int(os.getenv("ROUTER_MAX_DEPTH", "6"))
+
+    # Template profiles: "template=model" pairs overriding the model per template
+    TEMPLATE_MODELS: dict = {
+        name.strip(): model.strip()
+        for name, _, model in (
+            pair.partition("=") for pair in os.getenv("TEMPLATE_MODELS", "").split(",")
+        )
+        if model.strip()
+    }
+    TEMPLATE_MIN_CTX: int = int(os.getenv("TEMPLATE_MIN_CTX", "2048"))
+    TEMPLATE_MAX_CTX: int = int(os.getenv("TEMPLATE_MAX_CTX", "8192"))
+
+    # Prompt budget (tokens counted with the model's tokenizer.json when set)
+    TOKENIZER_FILE: str = os.getenv("TOKENIZER_FILE", "")  # Empty = estimate
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+    PROMPT_TOKEN_BUDGET: int = int(os.getenv("PROMPT_TOKEN_BUDGET", "1536"))
+    PROMPT_MESSAGE_TOKENS: int = int(os.getenv("PROMPT_MESSAGE_TOKENS", "128"))
+
+    # Vision
+    VISION_CACHE_SIZE: int = int(os.getenv("VISION_CACHE_SIZE", "256"))
+    VISION_CACHE_FILE: str = os.getenv("VISION_CACHE_FILE", "")  # Empty = memory only
+    MAX_ATTACHMENT_SIZE_MB: int = int(os.getenv("MAX_ATTACHMENT_SIZE_MB", "10"))
+    MAX_CONCURRENT_ATTACHMENTS: int = int(os.getenv("MAX_CONCURRENT_ATTACHMENTS", "2"))
+
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
 
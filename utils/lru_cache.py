@@ -0,0 +1,110 @@
+"""Thread-safe LRU cache bounded by entry count and/or total size."""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class LRUCache:
+    """Least-recently-used mapping shared by the bot's result caches."""
+
+    def __init__(
+        self,
+        max_entries: int = 128,
+        max_bytes: int = 0,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            max_entries: Maximum number of entries (0 = unlimited)
+            max_bytes: Maximum total size of values (0 = unlimited)
+            sizeof: Function returning the size of a value (defaults to len)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or len
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value and mark it as most recently used."""
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value without touching its recency or the hit counters."""
+        return self._data.get(key, default)
+
+    def put(self, key: Hashable, value: Any) -> List[Tuple[Hashable, Any]]:
+        """
+        Insert or replace a value.
+
+        Returns:
+            Entries evicted to make room, oldest first
+        """
+        size = self.sizeof(value) if self.max_bytes else 0
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = value
+            self.total_bytes += size
+            return self._evict()
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a value and return it."""
+        with self._lock:
+            if key not in self._data:
+                return default
+            return self._remove(key)
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Snapshot of entries, least recently used first."""
+        with self._lock:
+            return list(self._data.items())
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+            self.total_bytes = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache statistics."""
+        return {
+            "entries": len(self._data),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _remove(self, key: Hashable) -> Any:
+        value = self._data.pop(key)
+        if self.max_bytes:
+            self.total_bytes -= self.sizeof(value)
+        return value
+
+    def _evict(self) -> List[Tuple[Hashable, Any]]:
+        evicted = []
+        while self._data and (
+            (self.max_entries and len(self._data) > self.max_entries)
+            or (self.max_bytes and self.total_bytes > self.max_bytes)
+        ):
+            key = next(iter(self._data))
+            evicted.append((key, self._remove(key)))
+        return evicted
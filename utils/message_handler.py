@@ -1,16 +1,40 @@
 """Message handling utilities."""
 
 import asyncio
+import functools
 import logging
-from typing import Optional
+from typing import List, Optional
 
 import discord
 
 from config import Config
+from utils.message_scheduler import get_scheduler
 
 logger = logging.getLogger(__name__)
 
 
+def split_message(content: str, max_length: int) -> List[str]:
+    """
+    Split content into chunks of at most max_length characters.
+
+    Chunks break at the last newline (or space) in the second half of the window, so
+    parts stay readable and as few messages as possible are needed.
+    """
+    chunks = []
+    while len(content) > max_length:
+        window = content[:max_length]
+        cut = window.rfind("\n")
+        if cut < max_length // 2:
+            cut = window.rfind(" ")
+        if cut < max_length // 2:
+            cut = max_length
+        chunks.append(content[:cut])
+        content = content[cut:].lstrip("\n")
+    if content or not chunks:
+        chunks.append(content)
+    return chunks
+
+
 async def send_long_message(
     interaction: Optional[discord.Interaction] = None,
     message: Optional[discord.Message] = None,
@@ -20,33 +44,39 @@ async def send_long_message(
     """
     Send long messages by splitting them into chunks.
 
+    All chunks are handed to the outbound scheduler as one job, so they are paced to
+    the route's rate limit and arrive in order without other sends interleaving.
+
     Args:
         interaction: Discord interaction (for slash commands)
         message: Discord message (for mention replies)
         content: Message content to send
         mention_user: Whether to mention the user
     """
-    max_length = Config.MAX_RESPONSE_LENGTH
+    scheduler = get_scheduler()
+    chunks = split_message(content, Config.MAX_RESPONSE_LENGTH)
 
     if interaction:
-        for i, start in enumerate(range(0, len(content), max_length)):
-            chunk = content[start : start + max_length]
-
-            if mention_user and i == 0:
-                chunk = f"{interaction.user.mention} {chunk}"
-
-            try:
-                await interaction.followup.send(chunk)
-            except Exception as e:
-                logger.error(f"Failed to send followup message: {e}")
+        if mention_user:
+            chunks[0] = f"{interaction.user.mention} {chunks[0]}"
+        route = scheduler.webhook_route(interaction)
+        actions = [functools.partial(interaction.followup.send, chunk) for chunk in chunks]
+        try:
+            await scheduler.send(route, actions)
+        except Exception as e:
+            logger.error(f"Failed to send followup message: {e}")
 
     elif message:
-        for start in range(0, len(content), max_length):
-            chunk = content[start : start + max_length]
-            try:
-                await message.reply(chunk, mention_author=mention_user)
-            except Exception as e:
-                logger.error(f"Failed to send reply: {e}")
+        # Reply with the first chunk; the rest follow in the channel on the same bucket
+        route = scheduler.channel_route(message.channel)
+        actions = [
+            functools.partial(message.reply, chunks[0], mention_author=mention_user),
+            *(functools.partial(message.channel.send, chunk) for chunk in chunks[1:]),
+        ]
+        try:
+            await scheduler.send(route, actions)
+        except Exception as e:
+            logger.error(f"Failed to send reply: {e}")
 
 
 async def send_streaming_message(
@@ -62,11 +92,21 @@ async def send_streaming_message(
         stream_generator: Generator yielding response chunks
         mention_user: Whether to mention the user
     """
+    scheduler = get_scheduler()
+    route = scheduler.channel_route(message.channel)
     buffer = ""
     sent_message = None
     update_counter = 0
     last_update_length = 0
 
+    def schedule_edit(content: str) -> asyncio.Future:
+        # Edits that pile up behind the rate limit collapse into the newest content
+        return scheduler.edit(
+            route,
+            sent_message.id,
+            functools.partial(sent_message.edit, content=content[: Config.MAX_RESPONSE_LENGTH]),
+        )
+
     try:
         for chunk in stream_generator:
             buffer += chunk
@@ -80,16 +120,17 @@ async def send_streaming_message(
                     if sent_message is None:
                         # First message
                         content = f"{message.author.mention} {buffer}" if mention_user else buffer
-                        sent_message = await message.reply(content[: Config.MAX_RESPONSE_LENGTH])
-                        last_update_length = current_length
+                        (sent_message,) = await scheduler.send(
+                            route,
+                            [
+                                functools.partial(
+                                    message.reply, content[: Config.MAX_RESPONSE_LENGTH]
+                                )
+                            ],
+                        )
                     else:
-                        # Update existing message
-                        try:
-                            await sent_message.edit(content=buffer[: Config.MAX_RESPONSE_LENGTH])
-                            last_update_length = current_length
-                        except discord.errors.HTTPException:
-                            # If edit fails (rate limit), skip this update
-                            pass
+                        schedule_edit(buffer)
+                    last_update_length = current_length
 
                 update_counter = 0
 
@@ -98,11 +139,13 @@ async def send_streaming_message(
             if sent_message is None:
                 # No message sent yet (response was too short for interval)
                 content = f"{message.author.mention} {buffer}" if mention_user else buffer
-                await message.reply(content[: Config.MAX_RESPONSE_LENGTH])
+                await scheduler.send(
+                    route, [functools.partial(message.reply, content[: Config.MAX_RESPONSE_LENGTH])]
+                )
             else:
                 # Update with final content
                 try:
-                    await sent_message.edit(content=buffer[: Config.MAX_RESPONSE_LENGTH])
+                    await schedule_edit(buffer)
                 except Exception:
                     pass
 
@@ -110,6 +153,6 @@ async def send_streaming_message(
         logger.error(f"Error in streaming message: {e}")
         if sent_message:
             try:
-                await sent_message.edit(content=f"{buffer}\n\n❌ エラーが発生しました")
+                await schedule_edit(f"{buffer}\n\n❌ エラーが発生しました")
             except Exception:
                 pass
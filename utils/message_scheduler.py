@@ -0,0 +1,228 @@
+"""Rate-limit-aware scheduling of outbound Discord API calls."""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional
+
+import discord
+
+from config import Config
+from utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+Action = Callable[[], Awaitable[Any]]
+
+
+class TokenBucket:
+    """Token bucket that tells callers how long to wait instead of failing."""
+
+    def __init__(self, limit: int, window: float):
+        """
+        Initialize bucket.
+
+        Args:
+            limit: Requests allowed per window
+            window: Window length in seconds
+        """
+        self.capacity = limit
+        self.rate = limit / window
+        self.tokens = float(limit)
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take a token and return the seconds to wait before using it."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    @property
+    def full(self) -> bool:
+        """Whether the bucket has refilled to capacity (and so equals a fresh one)."""
+        elapsed = time.monotonic() - self.updated
+        return self.tokens + elapsed * self.rate >= self.capacity
+
+    def drain(self, retry_after: float):
+        """Empty the bucket after Discord reported a rate limit anyway."""
+        self.tokens = min(self.tokens, -retry_after * self.rate)
+
+
+class _Job:
+    __slots__ = ("actions", "edit_key", "future")
+
+    def __init__(self, actions: List[Action], edit_key: Optional[Hashable] = None):
+        self.actions = actions
+        self.edit_key = edit_key
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class _Route:
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+        self.jobs: Deque[_Job] = deque()
+        self.pending_edits: Dict[Hashable, _Job] = {}
+        self.worker: Optional[asyncio.Task] = None
+
+
+class OutboundScheduler:
+    """
+    Ordered, paced sender for Discord messages.
+
+    Calls are grouped by route (a channel, or an interaction's webhook) and each route
+    sends in submission order, pacing itself with a token bucket sized to Discord's
+    limits so requests are spaced out before Discord has to answer with 429s.
+    Pending edits to the same message are coalesced so only the latest content is sent.
+    Workers exist only while a route has pending work; the buckets of idle routes are
+    kept (bounded, least recently used first out) until they have refilled.
+    """
+
+    def __init__(
+        self,
+        channel_limit: int = 5,
+        channel_window: float = 5.0,
+        webhook_limit: int = 5,
+        webhook_window: float = 2.0,
+        idle_buckets: int = 4096,
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            channel_limit: Messages per window on one channel
+            channel_window: Channel window length in seconds
+            webhook_limit: Calls per window on one interaction webhook
+            webhook_window: Webhook window length in seconds
+            idle_buckets: Buckets of idle routes kept until they refill
+        """
+        self.channel_limit = (channel_limit, channel_window)
+        self.webhook_limit = (webhook_limit, webhook_window)
+        self._routes: Dict[str, _Route] = {}
+        self._idle_buckets = LRUCache(max_entries=idle_buckets)
+
+    @staticmethod
+    def channel_route(channel: discord.abc.Snowflake) -> str:
+        """Route key for messages sent to a channel."""
+        return f"channel:{channel.id}"
+
+    @staticmethod
+    def webhook_route(interaction: discord.Interaction) -> str:
+        """Route key for an interaction's followup webhook."""
+        return f"webhook:{interaction.id}"
+
+    async def send(self, route: str, actions: List[Action]) -> List[Any]:
+        """
+        Run API calls in order on a route, pacing each one.
+
+        The calls form one job, so nothing else on the route interleaves with them.
+        If a call fails, the remaining calls are skipped and the error is raised.
+
+        Returns:
+            Results of the calls
+        """
+        job = _Job(actions)
+        self._enqueue(route, job)
+        return await job.future
+
+    def edit(self, route: str, message_id: Hashable, action: Action) -> asyncio.Future:
+        """
+        Schedule a message edit, replacing any not-yet-sent edit of the same message.
+
+        Returns:
+            Future resolved when the (possibly newer) edit has been applied
+        """
+        state = self._route(route)
+        pending = state.pending_edits.get(message_id)
+        if pending is not None:
+            pending.actions = [action]
+            return pending.future
+
+        job = _Job([action], edit_key=message_id)
+        job.future.add_done_callback(_consume_exception)
+        state.pending_edits[message_id] = job
+        self._enqueue(route, job)
+        return job.future
+
+    def _route(self, route: str) -> _Route:
+        state = self._routes.get(route)
+        if state is None:
+            bucket = self._idle_buckets.pop(route)
+            if bucket is None:
+                limit, window = (
+                    self.webhook_limit if route.startswith("webhook:") else self.channel_limit
+                )
+                bucket = TokenBucket(limit, window)
+            state = self._routes[route] = _Route(bucket)
+        return state
+
+    def _enqueue(self, route: str, job: _Job):
+        state = self._route(route)
+        state.jobs.append(job)
+        if state.worker is None or state.worker.done():
+            state.worker = asyncio.create_task(self._drain(route, state))
+
+    async def _drain(self, route: str, state: _Route):
+        while state.jobs:
+            job = state.jobs.popleft()
+            if job.edit_key is not None:
+                state.pending_edits.pop(job.edit_key, None)
+
+            results = []
+            try:
+                for action in job.actions:
+                    results.append(await self._call(state.bucket, action))
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+                continue
+
+            if not job.future.done():
+                job.future.set_result(results)
+
+        # Forget the idle route, but keep its bucket until it has refilled so the
+        # next send is still paced against the calls just made
+        if self._routes.get(route) is state and not state.jobs:
+            del self._routes[route]
+            if not state.bucket.full:
+                self._idle_buckets.put(route, state.bucket)
+
+    @staticmethod
+    async def _call(bucket: TokenBucket, action: Action) -> Any:
+        delay = bucket.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        try:
+            return await action()
+        except discord.errors.RateLimited as e:
+            bucket.drain(e.retry_after)
+            raise
+        except discord.errors.HTTPException as e:
+            if e.status == 429:
+                retry_after = float(getattr(e.response, "headers", {}).get("Retry-After", 1))
+                bucket.drain(retry_after)
+            raise
+
+
+def _consume_exception(future: asyncio.Future):
+    # Intermediate edits are fire-and-forget; log failures instead of leaking them
+    if not future.cancelled() and future.exception() is not None:
+        logger.debug(f"Scheduled edit failed: {future.exception()}")
+
+
+_scheduler: Optional[OutboundScheduler] = None
+
+
+def get_scheduler() -> OutboundScheduler:
+    """Get the process-wide outbound scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = OutboundScheduler(
+            channel_limit=Config.OUTBOUND_CHANNEL_LIMIT,
+            channel_window=Config.OUTBOUND_CHANNEL_WINDOW,
+            webhook_limit=Config.OUTBOUND_WEBHOOK_LIMIT,
+            webhook_window=Config.OUTBOUND_WEBHOOK_WINDOW,
+        )
+    return _scheduler
@@ -0,0 +1,85 @@
+"""Sentence splitting for text-to-speech."""
+
+from typing import List, Optional
+
+# Characters that end a sentence
+SENTENCE_END = "。！？!?\n"
+# Characters that belong to the end of the preceding sentence
+TRAILING = "。！？!?…」』）)】\"'"
+# Preferred break points when a sentence is too long
+SOFT_BREAK = "、，,;；"
+
+
+class SentenceSplitter:
+    """
+    Incrementally split text into speakable sentences.
+
+    Text can be fed in arbitrary pieces (e.g. streamed LLM tokens). A sentence is
+    only emitted once the character after its terminator has arrived, so closing
+    brackets and repeated punctuation stay attached to it.
+    """
+
+    def __init__(self, max_length: int = 120):
+        """
+        Initialize splitter.
+
+        Args:
+            max_length: Sentences longer than this are broken at a soft break
+        """
+        self.max_length = max_length
+        self.buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Add text and return the sentences it completed."""
+        self.buffer += text
+        sentences = []
+        while True:
+            end = self._find_boundary()
+            if end is None:
+                break
+            sentence, self.buffer = self.buffer[:end], self.buffer[end:]
+            if is_speakable(sentence):
+                sentences.append(sentence.strip())
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Return whatever text remains as the final sentence."""
+        sentence, self.buffer = self.buffer, ""
+        return [sentence.strip()] if is_speakable(sentence) else []
+
+    def _find_boundary(self) -> Optional[int]:
+        buffer = self.buffer
+        for i, char in enumerate(buffer):
+            if i >= self.max_length:
+                # The sentence is too long: break it below instead
+                break
+            is_end = char in SENTENCE_END or (
+                char == "." and i + 1 < len(buffer) and buffer[i + 1].isspace()
+            )
+            if not is_end:
+                continue
+
+            end = i + 1
+            while end < len(buffer) and buffer[end] in TRAILING:
+                end += 1
+            # Wait for the next character unless the break is unambiguous
+            if end < len(buffer) or char == "\n":
+                return end
+            return None
+
+        if len(buffer) > self.max_length:
+            head = buffer[: self.max_length]
+            soft = max(head.rfind(char) for char in SOFT_BREAK)
+            return soft + 1 if soft > 0 else self.max_length
+        return None
+
+
+def is_speakable(text: str) -> bool:
+    """Whether text contains anything worth sending to TTS."""
+    return any(char.isalnum() for char in text)
+
+
+def split_sentences(text: str, max_length: int = 120) -> List[str]:
+    """Split complete text into speakable sentences."""
+    splitter = SentenceSplitter(max_length=max_length)
+    return splitter.feed(text) + splitter.flush()
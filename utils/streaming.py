@@ -0,0 +1,96 @@
+"""Helpers for consuming blocking streams from async code."""
+
+import asyncio
+import threading
+import time
+from typing import AsyncIterator, Callable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+async def iterate_in_thread(
+    generator_factory: Callable[..., Iterator[T]], *args, **kwargs
+) -> AsyncIterator[T]:
+    """
+    Run a blocking generator in a worker thread and yield its items as they arrive.
+
+    Args:
+        generator_factory: Callable returning a blocking iterator (e.g. generate_stream)
+        *args: Positional arguments for the callable
+        **kwargs: Keyword arguments for the callable
+
+    Yields:
+        Items produced by the generator
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+
+    def worker():
+        try:
+            for item in generator_factory(*args, **kwargs):
+                if stop.is_set():
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+        except BaseException as e:
+            loop.call_soon_threadsafe(queue.put_nowait, _Failure(e))
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, _DONE)
+
+    future = loop.run_in_executor(None, worker)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        # Let the worker stop early if the consumer went away
+        stop.set()
+        if future.done():
+            await future
+
+
+async def coalesce_chunks(
+    chunks: AsyncIterator[str], interval: float = 0.25, flush_chars: int = 48
+) -> AsyncIterator[str]:
+    """
+    Merge a token stream into fewer, larger pieces.
+
+    The first token is passed through immediately; after that text is held until
+    `interval` seconds have passed since the last piece, `flush_chars` characters are
+    buffered, or a newline arrives.
+
+    Args:
+        chunks: Stream of text chunks (e.g. tokens)
+        interval: Minimum seconds between pieces
+        flush_chars: Buffered characters that force a piece out early
+
+    Yields:
+        Coalesced text pieces
+    """
+    buffer = []
+    size = 0
+    last_flush = float("-inf")
+
+    async for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        now = time.monotonic()
+        if now - last_flush >= interval or size >= flush_chars or "\n" in chunk:
+            yield "".join(buffer)
+            buffer.clear()
+            size = 0
+            last_flush = now
+
+    if buffer:
+        yield "".join(buffer)